@@ -6,21 +6,19 @@
 """
 
 import pandas as pd
-import re
 from collections import Counter
-from janome.tokenizer import Tokenizer
 import numpy as np
 import json
+from scripts.utils.token_artifact import load_token_artifact
+from scripts.utils.token_filter import TokenFilter
 
 class DatasetAnalyzer:
     def __init__(self):
-        self.tokenizer = Tokenizer()
-        self.noise_words = {
-            'から', 'です', 'ありがとう', '東京高専', 'へ', 'みなさん', 
-            '今日', 'より', 'こと', '一番', 'ます', 'でし', 'まし',
-            'が', 'て', 'いる', 'た', 'の', 'に', 'は', 'を', 'で',
-            '入っ', 'し', 'なっ', 'っ', 'い', 'ん', 'る', 'れ'
-        }
+        # 形態素解析済みトークン（all_text_corpus.csv から事前作成）
+        self.artifact = load_token_artifact()
+        # 最適化スクリプトと同じフィルタ（設定ファイル token_filters.optimizer）。
+        # 語彙統計は元のテキストの形態素解析で集計するため、preprocess_pattern は適用しない
+        self.token_filter = TokenFilter.from_config('optimizer')
     
     def analyze_by_category(self, df):
         """カテゴリ別データ特性分析"""
@@ -45,24 +43,11 @@ class DatasetAnalyzer:
         all_words = []
         filtered_words = []
         
-        for text in texts:
-            text = str(text)
-            tokens = self.tokenizer.tokenize(text)
+        for tokens in self.artifact.lookup_tokens(texts):
+            all_words.extend(token.surface for token in tokens if len(token.surface) >= 1)
             
-            for token in tokens:
-                try:
-                    word = token.surface
-                    if len(word) >= 1:
-                        all_words.append(word)
-                        
-                    # フィルタリング済み語彙
-                    if (len(word) >= 2 and 
-                        word not in self.noise_words and
-                        not re.match(r'^[ぁ-ん]{1}$', word)):
-                        filtered_words.append(word)
-                        
-                except (AttributeError, IndexError):
-                    continue
+            # フィルタリング済み語彙
+            filtered_words.extend(self.token_filter.filter(tokens))
         
         # 語彙統計
         word_freq = Counter(filtered_words)
@@ -6,28 +6,28 @@
 """
 
 import pandas as pd
-import re
 from collections import Counter
-from janome.tokenizer import Tokenizer
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib import font_manager
+from scripts.utils.token_artifact import load_token_artifact
+from scripts.utils.token_filter import TokenFilter
+from scripts.utils.batch_renderer import RenderJob, save_batch
 
 # 日本語フォント設定
 plt.rcParams['font.family'] = ['DejaVu Sans', 'Hiragino Sans', 'Yu Gothic', 'Meiryo', 'Takao', 'IPAexGothic', 'IPAGothic', 'VL Gothic', 'Noto Sans CJK JP']
 
 class AdaptiveWordCloudOptimizer:
     def __init__(self):
-        self.tokenizer = Tokenizer()
+        # 共通ノイズ語除外・数字記号除去・表記ゆれ統一（設定ファイル token_filters.optimizer）
+        self.token_filter = TokenFilter.from_config('optimizer')
         
-        # 共通ノイズ語
-        self.noise_words = {
-            'から', 'です', 'ありがとう', '東京高専', 'へ', 'みなさん', 
-            '今日', 'より', 'こと', '一番', 'ます', 'でし', 'まし',
-            'が', 'て', 'いる', 'た', 'の', 'に', 'は', 'を', 'で',
-            '入っ', 'し', 'なっ', 'っ', 'い', 'ん', 'る', 'れ'
-        }
+        # 形態素解析済みトークン（all_text_corpus.csv から事前作成、数字・記号を除去してから解析）
+        self.artifact = load_token_artifact(preprocess_pattern=self.token_filter.preprocess_pattern)
+        
+        # フォント設定
+        self.font_path = 'fonts/ipaexg.ttf'
         
         # 科学用語重み（共通）
         self.science_terms = {
@@ -41,15 +41,6 @@ class AdaptiveWordCloudOptimizer:
             '印象': 2.0, 'きれい': 2.0, '面白い': 2.2, 'おもしろい': 2.2,
             '楽しい': 2.2, '好き': 2.0, '興味': 2.5, 'びっくり': 2.0, 'すごい': 2.0
         }
-        
-        # 表記ゆれ統一（共通）
-        self.normalization_rules = {
-            'みそ汁': 'みそ', 'みそしる': 'みそ', '味噌': 'みそ', '味噌汁': 'みそ',
-            'おもしろい': '面白い', 'おもしろく': '面白い', 'おもしろかっ': '面白い',
-            'たのしい': '楽しい', 'たのしく': '楽しい', 'たのしかっ': '楽しい',
-            'えん分': '塩分', 'エン分': '塩分',
-            'とける': '溶ける', 'とけ': '溶ける', 'とかし': '溶ける', '溶かし': '溶ける'
-        }
     
     def detect_dataset_type(self, df):
         """データセットタイプの自動検出"""
@@ -69,11 +60,12 @@ class AdaptiveWordCloudOptimizer:
         else:
             return 'unknown'
     
-    def get_adaptive_parameters(self, df, dataset_type):
-        """データセットタイプに基づく適応型パラメータ"""
+    def get_adaptive_parameters(self, df, dataset_type, words=None):
+        """データセットタイプに基づく適応型パラメータ（words は抽出済みの語彙、省略時は df から抽出）"""
         
         # 語彙数分析
-        words = self.extract_and_filter_words(df)
+        if words is None:
+            words = self.extract_and_filter_words(df)
         word_freq = Counter([word for word, category in words])
         unique_words = len(word_freq)
         
@@ -124,33 +116,12 @@ class AdaptiveWordCloudOptimizer:
         """語彙抽出・フィルタリング（共通処理）"""
         filtered_words = []
         
-        for idx, row in df.iterrows():
-            text = str(row['text'])
-            category = row['category']
-            
-            # 前処理
-            text = re.sub(r'[0-9０-９]', '', text)
-            text = re.sub(r'[，。！？・「」『』（）()]', '', text)
-            
-            # 形態素解析
-            tokens = self.tokenizer.tokenize(text)
-            for token in tokens:
-                try:
-                    word = token.surface
-                    
-                    # フィルタリング
-                    if (len(word) >= 2 and 
-                        word not in self.noise_words and
-                        not re.match(r'^[ぁ-ん]{1}$', word)):
-                        
-                        # 表記ゆれ統一
-                        if word in self.normalization_rules:
-                            word = self.normalization_rules[word]
-                        
-                        filtered_words.append((word, category))
-                        
-                except (AttributeError, IndexError):
-                    continue
+        # 形態素解析（アーティファクトから取得、未収録テキストのみ解析）
+        token_lists = self.artifact.lookup_tokens(df['text'])
+        for tokens, category in zip(token_lists, df['category']):
+            # フィルタリング・表記ゆれ統一（1パス）
+            for word in self.token_filter.filter(tokens):
+                filtered_words.append((word, category))
         
         return filtered_words
     
@@ -175,38 +146,45 @@ class AdaptiveWordCloudOptimizer:
         
         return weighted_freq
     
-    def generate_adaptive_wordcloud(self, df, title_suffix=""):
-        """適応型ワードクラウド生成"""
+    def prepare_adaptive_wordcloud(self, df):
+        """データセットタイプ検出・パラメータ決定・重み付き頻度計算（語彙抽出は1回のみ）"""
         
         # データセットタイプ検出
         dataset_type = self.detect_dataset_type(df)
         print(f"🔍 検出されたデータセットタイプ: {dataset_type}")
         
-        # 適応型パラメータ取得
-        params, unique_words = self.get_adaptive_parameters(df, dataset_type)
-        print(f"📊 語彙数: {unique_words}語")
-        print(f"⚙️ 適用パラメータ: max_words={params['max_words']}, font_size={params['min_font_size']}-{params['max_font_size']}")
-        
         # 語彙処理
         words = self.extract_and_filter_words(df)
         weighted_freq = self.calculate_weighted_frequencies(words)
         
-        # フォント設定
-        font_path = 'fonts/ipaexg.ttf'
+        # 適応型パラメータ取得
+        params, unique_words = self.get_adaptive_parameters(df, dataset_type, words)
+        print(f"📊 語彙数: {unique_words}語")
+        print(f"⚙️ 適用パラメータ: max_words={params['max_words']}, font_size={params['min_font_size']}-{params['max_font_size']}")
+        
+        return weighted_freq, params, dataset_type
+    
+    def wordcloud_params(self, params):
+        """適応型パラメータから WordCloud のパラメータを作成"""
+        return {
+            'font_path': self.font_path,
+            'width': params['width'],
+            'height': params['height'],
+            'background_color': params['background_color'],
+            'max_words': params['max_words'],
+            'min_font_size': params['min_font_size'],
+            'max_font_size': params['max_font_size'],
+            'prefer_horizontal': params['prefer_horizontal'],
+            'relative_scaling': params['relative_scaling'],
+            'colormap': params['colormap']
+        }
+    
+    def generate_adaptive_wordcloud(self, df, title_suffix=""):
+        """適応型ワードクラウド生成"""
+        weighted_freq, params, dataset_type = self.prepare_adaptive_wordcloud(df)
         
         # ワードクラウド生成
-        wordcloud = WordCloud(
-            font_path=font_path,
-            width=params['width'],
-            height=params['height'],
-            background_color=params['background_color'],
-            max_words=params['max_words'],
-            min_font_size=params['min_font_size'],
-            max_font_size=params['max_font_size'],
-            prefer_horizontal=params['prefer_horizontal'],
-            relative_scaling=params['relative_scaling'],
-            colormap=params['colormap']
-        )
+        wordcloud = WordCloud(**self.wordcloud_params(params))
         
         if weighted_freq:
             wordcloud.generate_from_frequencies(weighted_freq)
@@ -225,9 +203,27 @@ class AdaptiveWordCloudOptimizer:
         else:
             print("⚠️ 有効な語彙が見つかりませんでした")
             return None, {}, {}, dataset_type
+    
+    def adaptive_render_job(self, df, output_name, title_suffix=""):
+        """適応型ワードクラウドの描画ジョブ（一括描画用、300dpi 相当の scale=3 で直接描画）
+        
+        Returns:
+            (描画ジョブ（有効な語彙がない場合は None）, 重み付き頻度, パラメータ, データセットタイプ)
+        """
+        weighted_freq, params, dataset_type = self.prepare_adaptive_wordcloud(df)
+        
+        if not weighted_freq:
+            print("⚠️ 有効な語彙が見つかりませんでした")
+            return None, {}, {}, dataset_type
+        
+        job = RenderJob(output_name, weighted_freq, dict(self.wordcloud_params(params), scale=3),
+                        title=f"適応型ワードクラウド ({dataset_type}){title_suffix}",
+                        title_size=67,  # 16pt × 300dpi
+                        title_font=self.font_path)
+        return job, weighted_freq, params, dataset_type
 
 def generate_comparison_wordclouds():
-    """比較用ワードクラウド生成"""
+    """比較用ワードクラウド生成（全カテゴリを一括でプロセス並列描画）"""
     print("🎨 **適応型ワードクラウド比較生成**")
     print("=" * 60)
     
@@ -244,33 +240,34 @@ def generate_comparison_wordclouds():
     }
     
     results = {}
+    jobs = []
     
     for name, data in categories.items():
-        print(f"\n{'='*20} {name} ワードクラウド生成 {'='*20}")
+        print(f"\n{'='*20} {name} ワードクラウド準備 {'='*20}")
         
-        wordcloud, frequencies, params, dataset_type = optimizer.generate_adaptive_wordcloud(
-            data, title_suffix=f" - {name}"
+        job, frequencies, params, dataset_type = optimizer.adaptive_render_job(
+            data, f'adaptive_{name.replace("理由", "reason")}.png', title_suffix=f" - {name}"
         )
         
-        if wordcloud:
-            # 保存
-            output_path = f'outputs/wordclouds/adaptive_{name.replace("理由", "reason")}.png'
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            print(f"💾 保存完了: {output_path}")
-            
+        if job:
             # トップ語彙表示
             print(f"🏆 トップ語彙 (上位10語):")
             for word, weight in sorted(frequencies.items(), key=lambda x: x[1], reverse=True)[:10]:
                 print(f"  {word}: {weight:.1f}")
             
             results[name] = {
-                'wordcloud': wordcloud,
                 'frequencies': frequencies,
                 'parameters': params,
                 'dataset_type': dataset_type
             }
-            
-            plt.close()  # メモリ節約
+            jobs.append((name, job))
+    
+    # 一括描画・保存
+    print(f"\n🖼️ {len(jobs)}枚を一括描画中...")
+    names = {job.name: name for name, job in jobs}
+    for path in save_batch([job for _, job in jobs], 'outputs/wordclouds'):
+        results[names[path.name]]['output_path'] = str(path)
+        print(f"💾 保存完了: {path}")
     
     return results
 
@@ -8,9 +8,10 @@
 import pandas as pd
 import re
 from collections import Counter, defaultdict
-from janome.tokenizer import Tokenizer
 import json
 
+from scripts.utils.japanese_tokenizer import tokenize_corpus
+
 def load_and_analyze_data():
     """データ読み込みと基本統計"""
     df = pd.read_csv('data/processed/all_text_corpus.csv')
@@ -21,26 +22,17 @@ def load_and_analyze_data():
 
 def tokenize_and_analyze(df):
     """形態素解析と語彙分析"""
-    tokenizer = Tokenizer()
-    
     all_words = []
     word_categories = defaultdict(list)
     word_contexts = defaultdict(list)
     
-    for idx, row in df.iterrows():
-        text = str(row['text'])
-        category = row['category']
-        
-        # 形態素解析
-        tokens = tokenizer.tokenize(text)
-        for token in tokens:
-            try:
+    # 形態素解析（チャンク単位でプロセス並列）
+    documents = tokenize_corpus(df)
+    for text, category, class_value, sentences in zip(df['text'].astype(str), df['category'],
+                                                       df['class'], documents):
+        for tokens in sentences:
+            for token in tokens:
                 word = token.surface
-                # features が None の場合のエラーハンドリング
-                if hasattr(token, 'features') and token.features:
-                    pos = token.features.split(',')[0]  # 品詞
-                else:
-                    pos = 'Unknown'
                 
                 # 基本フィルタリング
                 if len(word) >= 1 and word not in ['、', '。', '？', '！']:
@@ -48,13 +40,10 @@ def tokenize_and_analyze(df):
                     word_categories[category].append(word)
                     word_contexts[word].append({
                         'category': category,
-                        'class': row['class'],
-                        'pos': pos,
+                        'class': class_value,
+                        'pos': token.pos,
                         'context': text[:30] + '...' if len(text) > 30 else text
                     })
-            except (AttributeError, IndexError) as e:
-                # トークン処理でエラーが発生した場合はスキップ
-                continue
     
     return all_words, word_categories, word_contexts
 
@@ -177,16 +166,14 @@ def analyze_educational_progression():
     before_texts = df[df['category'] == 'Q2理由_授業前']['text'].tolist()
     after_texts = df[df['category'] == 'Q2理由_授業後']['text'].tolist()
     
-    tokenizer = Tokenizer()
-    
     def extract_key_terms(texts):
         terms = []
-        for text in texts:
-            tokens = tokenizer.tokenize(str(text))
-            for token in tokens:
-                word = token.surface
-                if word in ['塩', 'ナトリウム', '食塩', '塩化ナトリウム', 'Na']:
-                    terms.append(word)
+        for sentences in tokenize_corpus([str(text) for text in texts]):
+            for tokens in sentences:
+                for token in tokens:
+                    word = token.surface
+                    if word in ['塩', 'ナトリウム', '食塩', '塩化ナトリウム', 'Na']:
+                        terms.append(word)
         return Counter(terms)
     
     before_terms = extract_key_terms(before_texts)
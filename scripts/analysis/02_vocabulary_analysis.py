@@ -18,7 +18,6 @@ import logging
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import stats
 import json
@@ -32,6 +31,89 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 # from scripts.utils.data_loader import DataLoader
 # from scripts.utils.text_preprocessor import TextPreprocessor  
 # from scripts.utils.visualization_utils import VisualizationUtils
+from scripts.utils.figure_export import FigureJob, load_export_settings, render_figures
+
+
+def plot_usage_change_heatmap(figure, categories, change_data):
+    """語彙使用率変化ヒートマップ（カテゴリ × Before・After・変化率）"""
+    ax = figure.add_subplot()
+    
+    data_array = np.array(change_data)
+    im = ax.imshow(data_array, cmap='RdYlBu_r', aspect='auto')
+    
+    # ラベル設定
+    ax.set_xticks(range(3))
+    ax.set_xticklabels(['Before (%)', 'After (%)', 'Change (%)'])
+    ax.set_yticks(range(len(categories)))
+    ax.set_yticklabels(categories)
+    
+    # 数値表示
+    for i in range(len(categories)):
+        for j in range(3):
+            ax.text(j, i, f'{data_array[i, j]:.1f}', 
+                   ha='center', va='center', color='black')
+    
+    ax.set_title('語彙使用率変化ヒートマップ')
+    figure.colorbar(im, ax=ax)
+    figure.tight_layout()
+
+
+def plot_class_effect_sizes(figure, category_effects):
+    """クラス別効果量比較（category_effects: [(カテゴリ, クラス, 効果量) または None]、最大4カテゴリ）"""
+    axes = figure.subplots(2, 2).flatten()
+    
+    for ax, effects in zip(axes, category_effects):
+        if effects is None:
+            continue
+        category, classes, effect_sizes = effects
+        
+        # 効果量プロット
+        ax.bar(classes, effect_sizes, 
+               color=['red' if es < 0 else 'blue' for es in effect_sizes])
+        
+        # 効果量の意味的閾値
+        ax.axhline(y=0.2, color='green', linestyle='--', label='小効果')
+        ax.axhline(y=0.5, color='orange', linestyle='--', label='中効果')
+        ax.axhline(y=0.8, color='red', linestyle='--', label='大効果')
+        
+        ax.set_title(f'{category} - クラス別効果量')
+        ax.set_ylabel("Cohen's d")
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    
+    figure.tight_layout()
+
+
+def plot_forest(figure, categories, effect_sizes, ci_lower, ci_upper, p_values):
+    """統計検定結果の森林プロット"""
+    ax = figure.add_subplot()
+    
+    y_pos = np.arange(len(categories))
+    
+    # 効果量プロット
+    colors = ['red' if p > 0.05 else 'blue' for p in p_values]
+    ax.scatter(effect_sizes, y_pos, color=colors, s=100)
+    
+    # 信頼区間
+    for i in range(len(categories)):
+        ax.plot([ci_lower[i], ci_upper[i]], [i, i], color=colors[i], linewidth=2)
+    
+    # 効果なしライン
+    ax.axvline(x=0, color='black', linestyle='-', alpha=0.5)
+    
+    # 効果量閾値
+    ax.axvline(x=0.2, color='green', linestyle='--', alpha=0.7, label='小効果')
+    ax.axvline(x=0.5, color='orange', linestyle='--', alpha=0.7, label='中効果')
+    ax.axvline(x=0.8, color='red', linestyle='--', alpha=0.7, label='大効果')
+    
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(categories)
+    ax.set_xlabel("Cohen's d (95% CI)")
+    ax.set_title('語彙カテゴリ別効果量・信頼区間')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    figure.tight_layout()
 
 
 class VocabularyAnalyzer:
@@ -41,6 +123,7 @@ class VocabularyAnalyzer:
         """初期化"""
         self.logger = self._setup_logging()
         self.config = self._load_config(config_path)
+        self.export_settings = load_export_settings(config_path)
         self.results = {}
         
         # 分析対象語彙の定義
@@ -346,25 +429,21 @@ class VocabularyAnalyzer:
         return class_effects
     
     def visualize_results(self, usage_rates, test_results, comparison_results):
-        """結果可視化"""
+        """結果可視化（図をプロセス並列で描画し、設定ファイルの出力形式ごとに保存）"""
         self.logger.info("可視化開始")
         
-        # 図のスタイル設定
-        plt.style.use('seaborn-v0_8')
-        
-        # 1. 語彙使用率変化のヒートマップ
-        self._plot_usage_change_heatmap(usage_rates)
-        
-        # 2. クラス別効果量比較
-        self._plot_class_effect_sizes(comparison_results)
-        
-        # 3. 統計的検定結果の森林プロット
-        self._plot_forest_plot(test_results)
+        # 図のスタイル・解像度・出力形式は設定ファイルの visualization セクション
+        jobs = [
+            self._usage_change_heatmap_figure(usage_rates),      # 1. 語彙使用率変化のヒートマップ
+            self._class_effect_sizes_figure(comparison_results),  # 2. クラス別効果量比較
+            self._forest_plot_figure(test_results),               # 3. 統計的検定結果の森林プロット
+        ]
+        render_figures(jobs, 'outputs/vocabulary', self.export_settings)
         
         self.logger.info("可視化完了")
     
-    def _plot_usage_change_heatmap(self, usage_rates):
-        """語彙使用率変化ヒートマップ"""
+    def _usage_change_heatmap_figure(self, usage_rates):
+        """語彙使用率変化ヒートマップの図"""
         # データ準備
         before_rates = usage_rates['before']['overall']
         after_rates = usage_rates['after']['overall']
@@ -379,100 +458,35 @@ class VocabularyAnalyzer:
             change_rate = ((after_rate - before_rate) / before_rate * 100) if before_rate > 0 else 0
             change_data.append([before_rate * 100, after_rate * 100, change_rate])
         
-        # ヒートマップ作成
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        data_array = np.array(change_data)
-        im = ax.imshow(data_array, cmap='RdYlBu_r', aspect='auto')
-        
-        # ラベル設定
-        ax.set_xticks(range(3))
-        ax.set_xticklabels(['Before (%)', 'After (%)', 'Change (%)'])
-        ax.set_yticks(range(len(categories)))
-        ax.set_yticklabels(categories)
-        
-        # 数値表示
-        for i in range(len(categories)):
-            for j in range(3):
-                ax.text(j, i, f'{data_array[i, j]:.1f}', 
-                       ha='center', va='center', color='black')
-        
-        plt.title('語彙使用率変化ヒートマップ')
-        plt.colorbar(im)
-        plt.tight_layout()
-        plt.savefig('outputs/vocabulary/usage_change_heatmap.png', dpi=300)
-        plt.close()
+        return FigureJob('usage_change_heatmap', plot_usage_change_heatmap,
+                         (categories, change_data), figsize=(10, 6))
     
-    def _plot_class_effect_sizes(self, comparison_results):
-        """クラス別効果量比較プロット"""
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        axes = axes.flatten()
-        
-        for i, category in enumerate(self.target_vocabularies.keys()):
+    def _class_effect_sizes_figure(self, comparison_results):
+        """クラス別効果量比較の図"""
+        category_effects = []
+        for category in self.target_vocabularies.keys():
             if category not in comparison_results:
+                category_effects.append(None)  # 図の位置はカテゴリ順のまま空けておく
                 continue
                 
             class_effects = comparison_results[category]['class_effect_sizes']
-            
             classes = list(class_effects.keys())
             effect_sizes = [class_effects[cls]['effect_size'] for cls in classes]
-            
-            # 効果量プロット
-            bars = axes[i].bar(classes, effect_sizes, 
-                              color=['red' if es < 0 else 'blue' for es in effect_sizes])
-            
-            # 効果量の意味的閾値
-            axes[i].axhline(y=0.2, color='green', linestyle='--', label='小効果')
-            axes[i].axhline(y=0.5, color='orange', linestyle='--', label='中効果')
-            axes[i].axhline(y=0.8, color='red', linestyle='--', label='大効果')
-            
-            axes[i].set_title(f'{category} - クラス別効果量')
-            axes[i].set_ylabel("Cohen's d")
-            axes[i].legend()
-            axes[i].grid(True, alpha=0.3)
+            category_effects.append((category, classes, effect_sizes))
         
-        plt.tight_layout()
-        plt.savefig('outputs/vocabulary/class_effect_sizes.png', dpi=300)
-        plt.close()
+        return FigureJob('class_effect_sizes', plot_class_effect_sizes, (category_effects,),
+                         figsize=(15, 12))
     
-    def _plot_forest_plot(self, test_results):
-        """統計検定結果の森林プロット"""
+    def _forest_plot_figure(self, test_results):
+        """統計検定結果の森林プロットの図"""
         categories = list(test_results.keys())
         effect_sizes = [test_results[cat]['effect_size_cohens_d'] for cat in categories]
         ci_lower = [test_results[cat]['confidence_interval'][0] for cat in categories]
         ci_upper = [test_results[cat]['confidence_interval'][1] for cat in categories]
         p_values = [test_results[cat]['p_value'] for cat in categories]
         
-        fig, ax = plt.subplots(figsize=(10, 8))
-        
-        y_pos = np.arange(len(categories))
-        
-        # 効果量プロット
-        colors = ['red' if p > 0.05 else 'blue' for p in p_values]
-        ax.scatter(effect_sizes, y_pos, color=colors, s=100)
-        
-        # 信頼区間
-        for i in range(len(categories)):
-            ax.plot([ci_lower[i], ci_upper[i]], [i, i], color=colors[i], linewidth=2)
-        
-        # 効果なしライン
-        ax.axvline(x=0, color='black', linestyle='-', alpha=0.5)
-        
-        # 効果量閾値
-        ax.axvline(x=0.2, color='green', linestyle='--', alpha=0.7, label='小効果')
-        ax.axvline(x=0.5, color='orange', linestyle='--', alpha=0.7, label='中効果')
-        ax.axvline(x=0.8, color='red', linestyle='--', alpha=0.7, label='大効果')
-        
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(categories)
-        ax.set_xlabel("Cohen's d (95% CI)")
-        ax.set_title('語彙カテゴリ別効果量・信頼区間')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('outputs/vocabulary/forest_plot.png', dpi=300)
-        plt.close()
+        return FigureJob('forest_plot', plot_forest,
+                         (categories, effect_sizes, ci_lower, ci_upper, p_values), figsize=(10, 8))
     
     def save_results(self, usage_rates, test_results, comparison_results):
         """結果保存"""
@@ -18,23 +18,58 @@ import logging
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import defaultdict, Counter
 import re
-from wordcloud import WordCloud
 import json
 
 # プロジェクトルートをパスに追加
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from scripts.utils.token_artifact import load_token_artifact
+from scripts.utils.token_filter import TokenFilter
+from scripts.utils.batch_renderer import RenderJob, save_batch
+from scripts.utils.figure_export import FigureJob, load_export_settings, render_figures
+
+
+def plot_usage_rates(figure, categories, usage_rates, colors, title):
+    """語彙カテゴリ別使用率の棒グラフ"""
+    ax = figure.add_subplot()
+    bars = ax.bar(categories, usage_rates, color=colors)
+    ax.set_ylabel('使用率')
+    ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    
+    # 値表示
+    for bar, rate in zip(bars, usage_rates):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
+                f'{rate:.1%}', ha='center', va='bottom')
+    
+    figure.tight_layout()
+
+
+def plot_sentiment_distribution(figure, sizes):
+    """感情分布パイチャート"""
+    ax = figure.add_subplot()
+    labels = ['ポジティブ', 'ニュートラル', 'ネガティブ']
+    colors = ['lightgreen', 'lightgray', 'lightcoral']
+    ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
+    ax.set_title('感情分布', fontsize=16)
+    ax.axis('equal')
+
+
 class SentimentAnalyzer:
     """感情・興味分析クラス"""
     
+    # ワードクラウド用の内容語（名詞・動詞・形容詞・副詞の基本形、2文字以上）
+    WORDCLOUD_FILTER = TokenFilter(pos=('名詞', '動詞', '形容詞', '副詞'), use_base_form=True,
+                                   min_length=2, word_pattern=r"\w[\w']+")
+    
     def __init__(self, config_path="config/analysis_config.yaml"):
         """初期化"""
         self.logger = self._setup_logging()
         self.config = self._load_config(config_path)
+        self.export_settings = load_export_settings(config_path)
         self.results = {}
         
         # 興味関心語彙の定義
@@ -84,6 +119,9 @@ class SentimentAnalyzer:
             
             self.logger.info(f"Comments data: {len(self.comments_data)} records")
             
+            # 形態素解析済みトークン（all_text_corpus.csv から事前作成）
+            self.artifact = load_token_artifact()
+            
             # データ検証
             self._validate_data()
             
@@ -241,48 +279,47 @@ class SentimentAnalyzer:
         }
     
     def generate_wordclouds(self):
-        """ワードクラウド生成"""
-        self.logger.info("ワードクラウド生成開始")
-        
-        # 出力ディレクトリ確保
-        output_dir = Path('outputs/wordclouds')
-        output_dir.mkdir(parents=True, exist_ok=True)
+        """ワードクラウド生成（全体・クラス別を一括でプロセス並列描画）
         
-        # 全体ワードクラウド
-        self._generate_overall_wordcloud(output_dir)
+        1回の配置から設定ファイルの出力形式（visualization.output.format）ごとに保存する。
+        """
+        self.logger.info("ワードクラウド生成開始")
         
-        # クラス別ワードクラウド
-        self._generate_class_wordclouds(output_dir)
+        jobs = [self._overall_wordcloud_job()] + self._class_wordcloud_jobs()
+        paths = save_batch([job for job in jobs if job is not None], Path('outputs/wordclouds'),
+                           formats=self.export_settings.formats)
         
-        self.logger.info("ワードクラウド生成完了")
+        self.logger.info(f"ワードクラウド生成完了: {len(paths)}枚")
+    
+    def _word_frequencies(self, texts):
+        """ワードクラウド用の単語頻度（トークンアーティファクトから集計）"""
+        return self.WORDCLOUD_FILTER.count(self.artifact.lookup_tokens(texts))
     
-    def _generate_overall_wordcloud(self, output_dir):
-        """全体ワードクラウド生成"""
-        # 全テキスト結合
-        all_text = ' '.join(self.comments_data[self.text_column].dropna().astype(str))
+    def _overall_wordcloud_job(self):
+        """全体ワードクラウドの描画ジョブ"""
+        # 全テキストの単語頻度（トークンアーティファクトから取得）
+        frequencies = self._word_frequencies(self.comments_data[self.text_column].dropna().astype(str))
         
-        # ワードクラウド生成
-        wordcloud = WordCloud(
+        if not frequencies:
+            return None
+        
+        params = dict(
             width=800,
             height=400,
             background_color='white',
             max_words=100,
             colormap='viridis',
-            font_path=None  # システムフォント使用
-        ).generate(all_text)
-        
-        # 保存
-        plt.figure(figsize=(12, 6))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title('全体ワードクラウド', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.savefig(output_dir / 'overall_wordcloud.png', dpi=300, bbox_inches='tight')
-        plt.close()
+            font_path=None,  # システムフォント使用
+            scale=self.export_settings.scale  # 画面サイズで配置し、印刷解像度（dpi）で直接描画
+        )
+        # matplotlib を経由せず直接エンコード（SVG / PDF はベクター出力）
+        return RenderJob('overall_wordcloud.png', dict(frequencies), params,
+                         title='全体ワードクラウド', title_size=round(16 * self.export_settings.scale))
     
-    def _generate_class_wordclouds(self, output_dir):
-        """クラス別ワードクラウド生成"""
+    def _class_wordcloud_jobs(self):
+        """クラス別ワードクラウドの描画ジョブ"""
         classes = self.comments_data['class'].unique()
+        jobs = []
         
         for class_id in classes:
             if pd.isna(class_id):
@@ -293,123 +330,83 @@ class SentimentAnalyzer:
             if len(class_data) == 0:
                 continue
             
-            # クラス別テキスト結合
-            class_text = ' '.join(class_data[self.text_column].dropna().astype(str))
+            # クラス別単語頻度（トークンアーティファクトから取得）
+            frequencies = self._word_frequencies(class_data[self.text_column].dropna().astype(str))
             
-            if not class_text.strip():
+            if not frequencies:
                 continue
                 
-            # ワードクラウド生成
-            wordcloud = WordCloud(
+            params = dict(
                 width=600,
                 height=400,
                 background_color='white',
                 max_words=50,
-                colormap='Set2'
-            ).generate(class_text)
-            
-            # 保存
-            plt.figure(figsize=(10, 6))
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
-            plt.title(f'クラス {class_id} ワードクラウド', fontsize=14, pad=20)
-            plt.tight_layout()
-            plt.savefig(output_dir / f'class_{class_id}_wordcloud.png', dpi=300, bbox_inches='tight')
-            plt.close()
+                colormap='Set2',
+                scale=self.export_settings.scale
+            )
+            jobs.append(RenderJob(f'class_{class_id}_wordcloud.png', dict(frequencies), params,
+                                  title=f'クラス {class_id} ワードクラウド',
+                                  title_size=round(14 * self.export_settings.scale)))
+        
+        return jobs
     
     def create_visualizations(self):
-        """可視化作成"""
+        """可視化作成（図をプロセス並列で描画し、設定ファイルの出力形式ごとに保存）"""
         self.logger.info("可視化作成開始")
         
         # 出力ディレクトリ確保
         output_dir = Path('outputs/sentiment_results')
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 興味関心分析結果の可視化
-        self._visualize_interest_analysis(output_dir)
-        
-        # 実験関連分析結果の可視化
-        self._visualize_experiment_analysis(output_dir)
-        
-        # 感情分析結果の可視化
-        self._visualize_sentiment_distribution(output_dir)
+        jobs = [
+            self._interest_analysis_figure(),    # 興味関心分析結果
+            self._experiment_analysis_figure(),  # 実験関連分析結果
+            self._sentiment_distribution_figure(),  # 感情分析結果
+        ]
+        render_figures([job for job in jobs if job is not None], output_dir, self.export_settings)
         
         self.logger.info("可視化作成完了")
     
-    def _visualize_interest_analysis(self, output_dir):
-        """興味関心分析可視化"""
+    def _interest_analysis_figure(self):
+        """興味関心分析の図（使用率バープロット）"""
         if 'sentiment' not in self.results:
-            return
+            return None
             
         interest_data = self.results['sentiment']['interest_analysis']
-        
-        # 使用率バープロット
         categories = list(interest_data.keys())
         usage_rates = [interest_data[cat]['usage_rate'] for cat in categories]
         
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(categories, usage_rates, color=['skyblue', 'lightgreen', 'lightcoral'])
-        plt.ylabel('使用率')
-        plt.title('興味関心語彙の使用率')
-        plt.xticks(rotation=45)
-        
-        # 値表示
-        for bar, rate in zip(bars, usage_rates):
-            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                    f'{rate:.1%}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        plt.savefig(output_dir / 'interest_usage_rates.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        return FigureJob('interest_usage_rates', plot_usage_rates,
+                         (categories, usage_rates, ['skyblue', 'lightgreen', 'lightcoral'],
+                          '興味関心語彙の使用率'))
     
-    def _visualize_experiment_analysis(self, output_dir):
-        """実験関連分析可視化"""
+    def _experiment_analysis_figure(self):
+        """実験関連分析の図（使用率バープロット）"""
         if 'sentiment' not in self.results:
-            return
+            return None
             
         experiment_data = self.results['sentiment']['experiment_analysis']
-        
-        # 使用率バープロット
         categories = list(experiment_data.keys())
         usage_rates = [experiment_data[cat]['usage_rate'] for cat in categories]
         
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(categories, usage_rates, color=['gold', 'orange', 'lightblue'])
-        plt.ylabel('使用率')
-        plt.title('実験関連語彙の使用率')
-        plt.xticks(rotation=45)
-        
-        # 値表示
-        for bar, rate in zip(bars, usage_rates):
-            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                    f'{rate:.1%}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        plt.savefig(output_dir / 'experiment_usage_rates.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        return FigureJob('experiment_usage_rates', plot_usage_rates,
+                         (categories, usage_rates, ['gold', 'orange', 'lightblue'],
+                          '実験関連語彙の使用率'))
     
-    def _visualize_sentiment_distribution(self, output_dir):
-        """感情分布可視化"""
+    def _sentiment_distribution_figure(self):
+        """感情分布の図（パイチャート）"""
         if 'sentiment' not in self.results:
-            return
+            return None
             
         sentiment_data = self.results['sentiment']['overall_sentiment']
-        
-        # 感情分布パイチャート
-        labels = ['ポジティブ', 'ニュートラル', 'ネガティブ']
         sizes = [
             sentiment_data['positive_ratio'],
             sentiment_data['neutral_ratio'],
             sentiment_data['negative_ratio']
         ]
-        colors = ['lightgreen', 'lightgray', 'lightcoral']
-        
-        plt.figure(figsize=(8, 8))
-        plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-        plt.title('感情分布', fontsize=16)
-        plt.axis('equal')
-        plt.savefig(output_dir / 'sentiment_distribution.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        
+        return FigureJob('sentiment_distribution', plot_sentiment_distribution, (sizes,),
+                         figsize=(8, 8))
     
     def save_results(self):
         """結果保存"""
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+同時描画 ストレステスト
+東京高専出前授業テキストマイニング分析プロジェクト
+
+ワードクラウドアプリの描画処理（ワードクラウド・差分ワードクラウド・共起ネットワーク）を
+まず1件ずつ描画し、次に同じ設定をスレッドプールで同時に描画して、
+画像がバイト単位で一致することを確認する。
+描画結果キャッシュ・配置キャッシュは無効にし、毎回配置から描画する。
+設定はすべて異なるため、同時リクエストの集約（シングルフライト）も働かない。
+
+実行方法: python scripts/benchmarks/concurrency_stress.py [--threads 8] [--rounds 3]
+"""
+
+import sys
+import time
+import random
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / 'wordcloud_app'))
+
+from app_v2 import app_state
+
+
+def render_tasks(state):
+    """描画する設定の一覧 [(名前, 描画関数)]"""
+    generator = state.generator
+    tasks = []
+    for source in ('comments', 'q2_before', 'q2_after'):
+        for colormap in ('viridis', 'plasma', 'accessible_three'):
+            config = {'text_source': source, 'colormap': colormap, 'width': 800, 'height': 500}
+            tasks.append((f"wordcloud {source} {colormap}",
+                          lambda config=config: generator.render_wordcloud(config)[1:3]))
+    for method in ('frequency_difference', 'log_ratio'):
+        config = {'base_dataset': 'q2_before', 'compare_dataset': 'q2_after',
+                  'calculation_method': method, 'science_highlight': True}
+        tasks.append((f"difference {method}",
+                      lambda config=config: state.difference_generator.generate_difference_wordcloud(config)[:2]))
+    for layout in ('spring', 'circular', 'kamada_kawai'):
+        for source in ('all_responses', 'q2_before'):
+            config = {'text_source': source, 'layout': layout, 'max_nodes': 25}
+            tasks.append((f"cooccurrence {source} {layout}",
+                          lambda config=config: state.cooccurrence_generator.generate_cooccurrence_image(config)[:2]))
+    return tasks
+
+
+def render(task):
+    """1件描画して画像のハッシュを返す"""
+    name, fn = task
+    image, error = fn()
+    if image is None:
+        raise RuntimeError(f"{name}: {error}")
+    if isinstance(image, str):
+        image = image.encode('ascii')  # Base64 文字列
+    return hashlib.sha256(image).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='同時描画の結果が1件ずつの描画と一致するかの確認')
+    parser.add_argument('--threads', type=int, default=8, help='同時に描画するスレッド数')
+    parser.add_argument('--rounds', type=int, default=3, help='同時描画の回数（毎回順序を入れ替える）')
+    args = parser.parse_args()
+
+    state = app_state.wait()
+    state.generator.render_cache.enabled = False
+    state.generator.layout_cache.enabled = False
+    state.difference_generator.layout_cache.enabled = False
+
+    tasks = render_tasks(state)
+    start = time.perf_counter()
+    expected = {name: render((name, fn)) for name, fn in tasks}
+    serial_time = time.perf_counter() - start
+    print(f"📊 {len(tasks)}件, 1件ずつ: {serial_time:.2f}秒")
+
+    mismatches = 0
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        for round_index in range(args.rounds):
+            order = random.Random(round_index).sample(tasks, len(tasks))
+            start = time.perf_counter()
+            digests = list(executor.map(render, order))
+            elapsed = time.perf_counter() - start
+            for (name, _), digest in zip(order, digests):
+                if digest != expected[name]:
+                    mismatches += 1
+                    print(f"  ❌ 不一致: {name}")
+            print(f"  同時描画 {round_index + 1}回目（{args.threads}スレッド）: {elapsed:.2f}秒")
+
+    if mismatches:
+        print(f"❌ {mismatches}件の画像が1件ずつの描画と一致しませんでした")
+        sys.exit(1)
+    print("✅ すべての画像が1件ずつの描画と一致しました")
+
+
+if __name__ == "__main__":
+    main()
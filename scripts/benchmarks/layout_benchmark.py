@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+ワードクラウド配置エンジン ベンチマーク
+東京高専出前授業テキストマイニング分析プロジェクト
+
+ワードクラウドアプリ Ver.2 の固定パラメータ（140語、フォントサイズ24〜174、1000×600）で、
+wordcloud ライブラリ標準の配置と NumPy 版（セル格子の累積和テーブル）を比較する。
+乱数シードごとに配置できた単語数と1回あたりの配置時間を出力する。
+
+実行方法: python scripts/benchmarks/layout_benchmark.py [--seeds 5] [--cell-size 4]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from scripts.utils.font_registry import get_font_registry
+from scripts.utils.token_artifact import load_token_artifact
+from scripts.utils.token_filter import TokenFilter
+from scripts.utils.wordcloud_layout import LAYOUT_ENGINES, create_wordcloud
+
+# wordcloud_app/app_v2.py の FIXED_PARAMS と同じ値
+FIXED_PARAMS = {
+    'width': 1000,
+    'height': 600,
+    'min_font_size': 24,
+    'max_font_size': 174,
+    'prefer_horizontal': 0.9,
+    'relative_scaling': 0.4,
+    'max_words': 140,
+    'background_color': '#f8f8f8',
+}
+
+
+def corpus_frequencies():
+    """コーパス全体の単語頻度（ワードクラウドアプリと同じフィルタ）"""
+    config_path = project_root / 'config' / 'analysis_config.yaml'
+    artifact = load_token_artifact(project_root / 'data' / 'processed' / 'all_text_corpus.csv')
+    token_filter = TokenFilter.from_config('wordcloud_app', config_path)
+    return token_filter.count(artifact.document_tokens(i) for i in range(artifact.n_documents))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ワードクラウド配置エンジンの速度・配置語数比較')
+    parser.add_argument('--seeds', type=int, default=5, help='計測する乱数シード数')
+    parser.add_argument('--cell-size', type=int, default=4, help='NumPy 版のセルサイズ（ピクセル）')
+    args = parser.parse_args()
+
+    get_font_registry()  # フォントキャッシュは両エンジン共通
+    frequencies = corpus_frequencies()
+    print(f"📊 語彙数 {len(frequencies)}、最大 {FIXED_PARAMS['max_words']}語、シード {args.seeds}個")
+
+    print(f"\n{'エンジン':<12}{'配置語数(平均)':>16}{'最小':>6}{'最大':>6}{'ms/回':>10}")
+    results = {}
+    for engine in LAYOUT_ENGINES:
+        options = {'cell_size': args.cell_size} if engine == 'numpy' else {}
+        placed, elapsed = [], 0.0
+        for seed in range(args.seeds):
+            start = time.perf_counter()
+            wordcloud = create_wordcloud(engine, random_state=seed, **FIXED_PARAMS, **options)
+            wordcloud.generate_from_frequencies(frequencies)
+            elapsed += time.perf_counter() - start
+            placed.append(len(wordcloud.layout_))
+        results[engine] = elapsed / args.seeds * 1000
+        print(f"{engine:<12}{sum(placed) / len(placed):>16.1f}{min(placed):>6}{max(placed):>6}"
+              f"{results[engine]:>10.1f}")
+
+    print(f"\n速度比（wordcloud / numpy）: {results['wordcloud'] / results['numpy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+本番サーバー 負荷試験
+東京高専出前授業テキストマイニング分析プロジェクト
+
+ワーカー数を変えて gunicorn（wordcloud_app/gunicorn.conf.py）を起動し、
+描画API（/api/generate・/api/cooccurrence-generate・/api/jobs）へ同時にリクエストを送って
+スループット（リクエスト/秒）と応答時間を計測する。
+ワードクラウドは描画結果キャッシュに当たらないよう毎回異なるサイズで描画する。
+CPUコア数までは、ワーカー数にほぼ比例してスループットが伸びることを確認する。
+
+各リクエストの後に応答の画像URL（ジョブはジョブの状態URLと結果の画像URL）を取得し、
+別のワーカーが受けても 200 が返ること（描画済み画像・ジョブの状態がワーカー間で
+共有されていること）を確認する。取得に失敗したリクエストはエラーとして数える。
+
+実行方法: python scripts/benchmarks/load_test.py [--workers 1 2 4] [--duration 20]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import subprocess
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+GUNICORN_CONFIG = project_root / 'wordcloud_app' / 'gunicorn.conf.py'
+TEXT_SOURCES = ('all_responses', 'comments', 'q2_before', 'q2_after')
+NETWORK_LAYOUTS = ('spring', 'circular', 'kamada_kawai')
+
+
+def request_body(endpoint, index):
+    """index 番目のリクエスト（ワードクラウドは毎回異なる設定）"""
+    source = TEXT_SOURCES[index % len(TEXT_SOURCES)]
+    if endpoint == 'cooccurrence':
+        return '/api/cooccurrence-generate', {
+            'text_source': source,
+            'layout': NETWORK_LAYOUTS[index // len(TEXT_SOURCES) % len(NETWORK_LAYOUTS)],
+            'max_nodes': 25,
+        }
+    config = {
+        'text_source': source,
+        'width': 600 + index % 400,
+        'height': 400 + index // 400 % 200,
+    }
+    if endpoint == 'jobs':
+        return '/api/jobs', {'kind': 'wordcloud', 'config': config}
+    return '/api/generate', config
+
+
+def fetch(base_url, path, payload=None, timeout=120):
+    """GET（payload があれば JSON を POST）して (応答コード, 応答 JSON) を返す"""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(base_url + path, data=data,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            if response.headers.get_content_type() == 'application/json':
+                return response.status, json.loads(body)
+            return response.status, None
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def run_request(base_url, endpoint, index):
+    """index 番目のリクエストを送り、画像URL・ジョブの状態URLまで取得できれば True"""
+    path, payload = request_body(endpoint, index)
+    status, body = fetch(base_url, path, payload)
+    if endpoint == 'jobs':
+        if status != 202:
+            return False
+        # ジョブの状態URL（投入を受けたワーカーとは別のワーカーが応答することがある）
+        while body['status'] not in ('done', 'failed', 'cancelled'):
+            status, body = fetch(base_url, body['status_url'] + '?wait=30')
+            if status != 200:
+                return False
+        if body['status'] != 'done':
+            return False
+        body = body['result']
+    elif status != 200:
+        return False
+    if body.get('image_url'):
+        status, _ = fetch(base_url, body['image_url'])
+        return status == 200
+    return True
+
+
+def wait_ready(base_url, process, timeout=180):
+    """サーバーの初期化完了（/api/ready が 200）まで待機"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn が終了しました（終了コード {process.returncode}）")
+        try:
+            with urllib.request.urlopen(base_url + '/api/ready', timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("サーバーの初期化が完了しませんでした")
+
+
+def run_load(base_url, endpoint, clients, duration):
+    """clients 本の同時接続で duration 秒間リクエストを送り続ける"""
+    # 描画済み画像はディスクに残るので、計測ごとに異なる設定から始める
+    counter = itertools.count(random.randrange(10 ** 6))
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            index = next(counter)
+            start = time.perf_counter()
+            ok = run_request(base_url, endpoint, index)
+            elapsed = time.perf_counter() - start
+            with lock:
+                (latencies if ok else errors).append(elapsed)
+
+    # ウォームアップ（各ワーカーの初回描画を計測から除外）
+    for index in range(clients):
+        run_request(base_url, endpoint, 2 * 10 ** 6 + index)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies or [0.0])
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': np.percentile(latencies, 50) * 1000,
+        'p95_ms': np.percentile(latencies, 95) * 1000,
+    }
+
+
+def benchmark_workers(n_workers, args):
+    """ワーカー数 n_workers で gunicorn を起動して計測"""
+    bind = f'127.0.0.1:{args.port}'
+    base_url = f'http://{bind}'
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', str(GUNICORN_CONFIG),
+         '--workers', str(n_workers), '--bind', bind],
+        cwd=str(project_root), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url, process)
+        return {endpoint: run_load(base_url, endpoint, n_workers * args.clients_per_worker, args.duration)
+                for endpoint in args.endpoints}
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    # ワーカー間の共有を確認するため、CPUコア数によらず 2 ワーカー以上を含める
+    default_workers = sorted({1, 2} | {min(n, cpu_count) for n in (4, 8, cpu_count)})
+
+    parser = argparse.ArgumentParser(description='ワーカー数ごとの描画APIスループット計測')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers, help='計測するワーカー数')
+    parser.add_argument('--duration', type=float, default=20, help='ワーカー数ごとの計測秒数')
+    parser.add_argument('--clients-per-worker', type=int, default=2, help='ワーカーあたりの同時接続数')
+    parser.add_argument('--endpoints', nargs='+', choices=('wordcloud', 'cooccurrence', 'jobs'),
+                        default=['wordcloud', 'cooccurrence', 'jobs'])
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    print(f"📊 CPUコア数 {cpu_count}, 計測 {args.duration:.0f}秒, ワーカーあたり同時接続 {args.clients_per_worker}")
+    baseline = {}
+    for n_workers in args.workers:
+        results = benchmark_workers(n_workers, args)
+        for endpoint, result in results.items():
+            base_workers, base_throughput = baseline.setdefault(endpoint, (n_workers, result['throughput']))
+            speedup = result['throughput'] / base_throughput
+            efficiency = speedup / (n_workers / base_workers)
+            print(f"{endpoint:<14}{n_workers:>3}ワーカー: {result['throughput']:>7.1f} req/s"
+                  f"（{base_workers}ワーカー比 {speedup:.2f}倍, 効率 {efficiency:.0%}）"
+                  f"  p50 {result['p50_ms']:>6.0f}ms  p95 {result['p95_ms']:>6.0f}ms"
+                  f"  エラー {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
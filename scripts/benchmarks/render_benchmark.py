@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+ワードクラウド画像エンコード ベンチマーク
+東京高専出前授業テキストマイニング分析プロジェクト
+
+生成済みの WordCloud を画像化する処理について、
+従来の matplotlib 経由（imshow → savefig）と WordCloud.to_image() の直接エンコード
+（PNG 圧縮レベル別・WebP・JPEG）の所要時間とバイト数を比較する。
+
+実行方法: python scripts/benchmarks/render_benchmark.py [--repeat 10] [--width 1000 --height 600]
+"""
+
+import io
+import sys
+import time
+import argparse
+from collections import Counter
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from wordcloud import WordCloud
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from scripts.utils.token_artifact import load_token_artifact
+from scripts.utils.token_filter import TokenFilter
+from scripts.utils.wordcloud_renderer import encode_wordcloud
+
+
+def corpus_frequencies():
+    """コーパス全体の単語頻度（ワードクラウドアプリと同じフィルタ）"""
+    config_path = project_root / 'config' / 'analysis_config.yaml'
+    artifact = load_token_artifact(project_root / 'data' / 'processed' / 'all_text_corpus.csv')
+    token_filter = TokenFilter.from_config('wordcloud_app', config_path)
+    counts = Counter()
+    for doc_index in range(artifact.n_documents):
+        counts.update(token_filter.filter(artifact.document_tokens(doc_index)))
+    return counts
+
+
+def matplotlib_png(wordcloud):
+    """従来の matplotlib 経由のエンコード"""
+    plt.figure(figsize=(12, 6))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis('off')
+    plt.tight_layout(pad=0)
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight',
+                facecolor='white', edgecolor='none')
+    plt.close()
+    return buffer.getvalue()
+
+
+def measure(encode, wordcloud, repeat):
+    """平均所要時間（ミリ秒）とバイト数"""
+    data = encode(wordcloud)  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = encode(wordcloud)
+    return (time.perf_counter() - start) / repeat * 1000, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ワードクラウド画像エンコードの速度・サイズ比較')
+    parser.add_argument('--repeat', type=int, default=10, help='各方式の計測回数')
+    parser.add_argument('--width', type=int, default=1000)
+    parser.add_argument('--height', type=int, default=600)
+    args = parser.parse_args()
+
+    wordcloud = WordCloud(width=args.width, height=args.height, background_color='#f8f8f8',
+                          max_words=140, random_state=42).generate_from_frequencies(corpus_frequencies())
+
+    methods = [
+        ('matplotlib PNG (dpi=150)', matplotlib_png),
+        ('direct PNG level 1', lambda wc: encode_wordcloud(wc, 'png', compress_level=1)),
+        ('direct PNG level 6', lambda wc: encode_wordcloud(wc, 'png', compress_level=6)),
+        ('direct PNG level 9', lambda wc: encode_wordcloud(wc, 'png', compress_level=9)),
+        ('direct WebP q90', lambda wc: encode_wordcloud(wc, 'webp', quality=90)),
+        ('direct JPEG q90', lambda wc: encode_wordcloud(wc, 'jpeg', quality=90)),
+    ]
+
+    print(f"📊 {args.width}×{args.height}, {args.repeat}回平均")
+    print(f"\n{'方式':<26}{'時間(ms)':>10}{'バイト数':>12}{'対matplotlib':>14}")
+    baseline = None
+    for name, encode in methods:
+        elapsed, size = measure(encode, wordcloud, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<26}{elapsed:>10.1f}{size:>12,}{baseline / elapsed:>13.1f}x")
+
+
+if __name__ == "__main__":
+    main()
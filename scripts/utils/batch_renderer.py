@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+ワードクラウド一括描画エンジン
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 描画ジョブ（単語頻度 + WordCloud パラメータ + タイトル）のプロセス並列描画（performance.parallel.n_jobs）
+2. 同一ジョブの重複排除、大きいジョブから順に投入（全体の所要時間 ≒ 最も遅い1枚）
+3. 完了順に結果を返すイテレータと、ZIP ストリーム・ディレクトリ保存のヘルパー
+4. 1回の配置から複数形式（印刷用 PNG・SVG・PDF など）を出力して保存
+5. ワーカープロセスは forkserver（なければ spawn）で起動し、スレッドを持つプロセス
+   （Web サーバーのリクエスト処理スレッド等）を fork しない。プールはプロセスごとに再利用する
+
+単語頻度の集計（形態素解析・フィルタ）は呼び出し側で一度だけ行い、
+ワーカーには配置・描画・エンコードのみを任せる。
+
+使用例:
+    from scripts.utils.batch_renderer import RenderJob, save_batch
+    jobs = [RenderJob('class_1_wordcloud.png', frequencies, {'width': 600, 'height': 400}),
+            RenderJob('class_2_wordcloud.png', frequencies2, {'width': 600, 'height': 400})]
+    paths = save_batch(jobs, 'outputs/wordclouds')
+    paths = save_batch(jobs, 'outputs/wordclouds', formats=('png', 'pdf'))
+"""
+
+import io
+import os
+import logging
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from scripts.utils.japanese_tokenizer import load_parallel_settings, resolve_n_jobs
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH
+
+logger = logging.getLogger(__name__)
+
+# forkserver に先読みさせるモジュール（ワーカーは読み込み済みの状態から起動する）
+WORKER_PRELOAD = ('scripts.utils.batch_renderer', 'scripts.utils.wordcloud_layout',
+                  'scripts.utils.wordcloud_renderer')
+
+# プロセスごとに作成して再利用するワーカープール（ワーカー数 → (作成したプロセスID, プール)）
+_pools: Dict[int, Tuple[int, ProcessPoolExecutor]] = {}
+_pools_lock = threading.Lock()
+
+
+class RenderJob(NamedTuple):
+    """ワードクラウド1枚分の描画ジョブ（ワーカープロセスへ渡すため pickle 可能な値のみ）"""
+    name: str                           # 出力ファイル名（ZIP 内のエントリ名）
+    frequencies: Dict[str, float]       # 単語頻度
+    params: dict                        # WordCloud のパラメータ
+    title: Optional[str] = None         # 画像上部のタイトル
+    title_size: int = 28                # タイトルの文字サイズ
+    title_font: Optional[str] = None    # タイトルのフォント
+    layout_engine: str = 'wordcloud'    # 'wordcloud' / 'numpy'
+    colormap: Optional[object] = None   # 配置後に recolor するカラーマップ（None は配置時の色）
+    color_seed: Optional[int] = None    # recolor の乱数シード
+    encode: Optional[dict] = None       # encode_wordcloud の追加オプション（compress_level 等）
+
+    @property
+    def image_format(self) -> str:
+        """拡張子から決まる画像形式"""
+        return Path(self.name).suffix.lstrip('.') or 'png'
+
+    @property
+    def cost(self) -> float:
+        """描画コストの目安（キャンバスの画素数 × 単語数）"""
+        scale = self.params.get('scale', 1)
+        pixels = self.params.get('width', 400) * self.params.get('height', 200) * scale * scale
+        return pixels * min(len(self.frequencies), self.params.get('max_words', 200))
+
+
+def batch_n_jobs(server_workers: int = 1, config_path=DEFAULT_CONFIG_PATH) -> int:
+    """Web サーバーのワーカープロセスごとの一括描画プロセス数
+
+    performance.parallel.n_jobs を上限に、CPUコアをサーバーのワーカー数で分ける
+    （各ワーカーが同時に一括描画しても全体でコア数を超えない）。
+    """
+    n_jobs = resolve_n_jobs(load_parallel_settings(config_path)[0])
+    return max(1, min(n_jobs, (os.cpu_count() or 1) // max(1, server_workers)))
+
+
+def _process_context():
+    """ワーカープロセスの起動方式（forkserver、使えない環境では spawn）
+
+    fork はロックを保持した他のスレッドの状態ごと複製するため、スレッドを持つプロセスから
+    起動すると子プロセスがデッドロックすることがある。forkserver はシングルスレッドの
+    サーバープロセスから fork する。どちらの方式でも実行中のスクリプトは __mp_main__ として
+    読み込まれるため、スクリプトの処理は if __name__ == "__main__" の中に置くこと。
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(list(WORKER_PRELOAD))
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _worker_pool(n_workers: int) -> ProcessPoolExecutor:
+    """n_workers プロセスのワーカープール（初回に作成し、同じプロセス内の一括描画で再利用）"""
+    with _pools_lock:
+        entry = _pools.get(n_workers)
+        if entry is None or entry[0] != os.getpid():
+            pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=_process_context(),
+                                       initializer=_init_worker)
+            entry = _pools[n_workers] = (os.getpid(), pool)
+        return entry[1]
+
+
+def _discard_pool(n_workers: int, pool: ProcessPoolExecutor):
+    """ワーカーが異常終了したプールを破棄（次の一括描画で作り直す）"""
+    with _pools_lock:
+        if _pools.get(n_workers, (None, None))[1] is pool:
+            del _pools[n_workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_worker():
+    """ワーカープロセス初期化（フォント・外接矩形キャッシュを持つフォントレジストリを作成）"""
+    from scripts.utils.font_registry import get_font_registry
+    get_font_registry()
+
+
+def render_job_formats(job: RenderJob, formats: Sequence[str]) -> Dict[str, bytes]:
+    """ジョブを1回だけ配置・着色し、形式ごとにエンコードした画像を返す（ワーカープロセスで実行）"""
+    from scripts.utils.wordcloud_layout import create_wordcloud
+    from scripts.utils.wordcloud_renderer import encode_wordcloud
+
+    wordcloud = create_wordcloud(job.layout_engine, **job.params)
+    wordcloud.generate_from_frequencies(job.frequencies)
+    if job.colormap is not None:
+        wordcloud.recolor(random_state=job.color_seed, colormap=job.colormap)
+    return {image_format: encode_wordcloud(wordcloud, image_format, title=job.title,
+                                           font_path=job.title_font, title_size=job.title_size,
+                                           **(job.encode or {}))
+            for image_format in formats}
+
+
+def render_job(job: RenderJob) -> bytes:
+    """ジョブを配置・描画してエンコード済み画像を返す（ワーカープロセスで実行）"""
+    return render_job_formats(job, (job.image_format,))[job.image_format]
+
+
+def render_batch(jobs: Iterable[RenderJob], n_jobs: Optional[int] = None,
+                 config_path=DEFAULT_CONFIG_PATH) -> Iterator[Tuple[RenderJob, bytes]]:
+    """ジョブをプロセス並列で描画し、完了した順に (ジョブ, 画像) を返す
+
+    内容が同じジョブ（名前だけが違うもの）は一度だけ描画する。ジョブが1つしかない場合や
+    n_jobs=1 の場合はプロセスを起動せず現在のプロセスで描画する。
+
+    Args:
+        jobs: 描画ジョブ
+        n_jobs: ワーカー数（-1 で全CPUコア、省略時は設定ファイルの値）
+        config_path: 設定ファイルパス
+    """
+    return _run_batch(jobs, render_job, n_jobs, config_path)
+
+
+def _run_batch(jobs: Iterable[RenderJob], worker: Callable, n_jobs: Optional[int],
+               config_path) -> Iterator[tuple]:
+    """重複を除いたジョブを worker でプロセス並列に実行し、完了した順に (ジョブ, 結果) を返す"""
+    groups: Dict[tuple, List[RenderJob]] = {}
+    for job in jobs:
+        groups.setdefault(_job_identity(job), []).append(job)
+    # 大きいジョブから投入して最後に長いジョブが残らないようにする
+    unique = sorted((same[0] for same in groups.values()), key=lambda job: job.cost, reverse=True)
+    if not unique:
+        return
+
+    n_jobs = resolve_n_jobs(load_parallel_settings(config_path)[0] if n_jobs is None else n_jobs)
+    n_workers = min(n_jobs, len(unique))
+    logger.info(f"一括描画: {len(unique)}枚（重複除外前 {sum(map(len, groups.values()))}枚）, "
+                f"{n_workers}プロセス")
+
+    if n_workers <= 1:
+        _init_worker()
+        for job in unique:
+            data = worker(job)
+            for same in groups[_job_identity(job)]:
+                yield same, data
+        return
+
+    pool = _worker_pool(n_workers)
+    futures = {}
+    try:
+        futures = {pool.submit(worker, job): job for job in unique}
+        for future in as_completed(futures):
+            data = future.result()
+            for same in groups[_job_identity(futures[future])]:
+                yield same, data
+    except BrokenProcessPool:
+        _discard_pool(n_workers, pool)
+        raise
+    finally:
+        # 途中で読み出しをやめた場合（ZIP 配信中の切断等）は未着手のジョブを取り消す
+        for future in futures:
+            future.cancel()
+
+
+def _job_identity(job: RenderJob) -> tuple:
+    """名前以外の内容が同じジョブを同一視するためのキー"""
+    return (repr(sorted(job.frequencies.items())), repr(sorted(job.params.items())),
+            job.title, job.title_size, job.title_font, job.layout_engine,
+            repr(job.colormap), job.color_seed, repr(sorted((job.encode or {}).items())),
+            job.image_format)
+
+
+class _ZipStream(io.RawIOBase):
+    """書き込まれたバイト列を溜めておき、take() で取り出す書き込み専用ストリーム"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(results: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """(エントリ名, 画像) を ZIP として逐次出力（画像は圧縮済みのため無圧縮で格納）"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in results:
+            archive.writestr(name, data)
+            yield stream.take()
+    yield stream.take()
+
+
+def save_batch(jobs: Iterable[RenderJob], output_dir, n_jobs: Optional[int] = None,
+               config_path=DEFAULT_CONFIG_PATH, formats: Optional[Sequence[str]] = None) -> List[Path]:
+    """ジョブを一括描画して output_dir に保存し、保存したパスを返す
+
+    formats（'png', 'svg', 'pdf' など）を指定すると、ジョブごとに1回だけ配置して
+    各形式で保存する（拡張子はジョブ名の拡張子を置き換える）。
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    if not formats:
+        for job, data in render_batch(jobs, n_jobs=n_jobs, config_path=config_path):
+            path = output_dir / job.name
+            path.write_bytes(data)
+            paths.append(path)
+        return paths
+
+    worker = partial(render_job_formats, formats=tuple(formats))
+    for job, images in _run_batch(jobs, worker, n_jobs, config_path):
+        for image_format, data in images.items():
+            path = output_dir / Path(job.name).with_suffix(f'.{image_format}')
+            path.write_bytes(data)
+            paths.append(path)
+    return paths
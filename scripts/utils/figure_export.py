@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+レポート図の書き出し
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 設定ファイルの visualization.output（format, dpi, transparent, bbox_inches）・visualization.style の読み込み
+2. pyplot を使わず Figure 単位で描画し、1回の描画を複数形式（PNG / SVG / PDF）で保存
+3. レポートの図をプロセス並列で描画（performance.parallel.n_jobs）
+
+描画関数はワーカープロセスへ渡すためモジュールレベルの関数とし、
+plot(figure, *args) の形で受け取った Figure に描画する。
+
+使用例:
+    from scripts.utils.figure_export import FigureJob, load_export_settings, render_figures
+    settings = load_export_settings()
+    jobs = [FigureJob('forest_plot', plot_forest, (test_results,), figsize=(10, 8))]
+    paths = render_figures(jobs, 'outputs/vocabulary', settings)
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from scripts.utils.japanese_tokenizer import load_parallel_settings, resolve_n_jobs
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config
+
+logger = logging.getLogger(__name__)
+
+# 画面表示の解像度（ワードクラウドは画面サイズで配置し、dpi / SCREEN_DPI 倍で直接描画する）
+SCREEN_DPI = 100
+
+
+class ExportSettings(NamedTuple):
+    """図の書き出し設定"""
+    formats: Tuple[str, ...] = ('png',)     # 出力形式（1回の描画を各形式で保存）
+    dpi: int = 300                          # ラスター形式の解像度
+    transparent: bool = False
+    bbox_inches: Optional[str] = 'tight'
+    style: Optional[str] = None             # matplotlib のスタイル
+
+    @property
+    def scale(self) -> float:
+        """画面サイズで配置したワードクラウドを印刷解像度で描画する倍率"""
+        return self.dpi / SCREEN_DPI
+
+
+def load_export_settings(config_path=DEFAULT_CONFIG_PATH, formats=None) -> ExportSettings:
+    """設定ファイルの visualization セクションから書き出し設定を作成
+
+    Args:
+        config_path: 設定ファイルパス
+        formats: 出力形式（省略時は visualization.output.format、文字列・リストのどちらも可）
+    """
+    visualization = load_config(config_path).get('visualization', {}) or {}
+
+    output = visualization.get('output', {}) or {}
+    formats = formats or output.get('format', 'png')
+    if isinstance(formats, str):
+        formats = [formats]
+    return ExportSettings(formats=tuple(str(image_format).lower() for image_format in formats),
+                          dpi=int(output.get('dpi', 300)),
+                          transparent=bool(output.get('transparent', False)),
+                          bbox_inches=output.get('bbox_inches', 'tight'),
+                          style=visualization.get('style'))
+
+
+class FigureJob(NamedTuple):
+    """図1枚分の描画ジョブ（ワーカープロセスへ渡すため pickle 可能な値のみ）"""
+    name: str                                   # 出力ファイル名（拡張子なし）
+    plot: Callable                              # plot(figure, *args) で Figure に描画する関数
+    args: tuple = ()                            # 描画関数の引数
+    figsize: Tuple[float, float] = (10, 6)      # 図のサイズ（インチ）
+
+
+def render_figure(job: FigureJob, output_dir, settings: ExportSettings) -> List[Path]:
+    """図を1回描画して各形式で保存し、保存したパスを返す（ワーカープロセスで実行）"""
+    import matplotlib.style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    output_dir = Path(output_dir)
+    style = matplotlib.style.context(settings.style) if settings.style else nullcontext()
+    paths = []
+    with style:
+        figure = Figure(figsize=job.figsize)
+        FigureCanvasAgg(figure)
+        job.plot(figure, *job.args)
+        for image_format in settings.formats:
+            path = output_dir / f'{job.name}.{image_format}'
+            figure.savefig(path, format=image_format, dpi=settings.dpi,
+                           transparent=settings.transparent, bbox_inches=settings.bbox_inches)
+            paths.append(path)
+    return paths
+
+
+def render_figures(jobs: Iterable[FigureJob], output_dir, settings: Optional[ExportSettings] = None,
+                   n_jobs: Optional[int] = None, config_path=DEFAULT_CONFIG_PATH) -> List[Path]:
+    """図をプロセス並列で描画して output_dir に保存し、保存したパスを返す
+
+    図が1枚しかない場合や n_jobs=1 の場合はプロセスを起動せず現在のプロセスで描画する。
+
+    Args:
+        jobs: 描画ジョブ
+        output_dir: 出力ディレクトリ
+        settings: 書き出し設定（省略時は設定ファイルから読み込み）
+        n_jobs: ワーカー数（-1 で全CPUコア、省略時は設定ファイルの値）
+        config_path: 設定ファイルパス
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    settings = settings or load_export_settings(config_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    n_jobs = resolve_n_jobs(load_parallel_settings(config_path)[0] if n_jobs is None else n_jobs)
+    n_workers = min(n_jobs, len(jobs))
+    logger.info(f"図の描画: {len(jobs)}枚 × {len(settings.formats)}形式, {n_workers}プロセス")
+
+    if n_workers <= 1:
+        return [path for job in jobs for path in render_figure(job, output_dir, settings)]
+
+    paths = []
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(render_figure, job, output_dir, settings) for job in jobs]
+        for future in as_completed(futures):
+            paths.extend(future.result())
+    return paths
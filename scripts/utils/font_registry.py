@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+フォントレジストリ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. fonts/font_list.json からフォント一覧を一度だけ読み込み（プロセス全体で共有）
+2. (フォント, サイズ) ごとの FreeTypeFont をキャッシュ（フォントファイルの再解析なし）
+3. (単語, フォント, サイズ, 向き) ごとの文字列外接矩形をキャッシュ
+4. matplotlib の FontProperties をフォントごとにキャッシュ
+5. 上記キャッシュを使う ImageFont 代替（wordcloud_layout.CachedFontWordCloud の配置・描画で使用、
+   wordcloud モジュール自体は変更しない）
+
+使用例:
+    from scripts.utils.font_registry import get_font_registry
+    registry = get_font_registry()
+    font_path = registry.resolve_path('IPAexGothic')
+    props = registry.font_properties(registry.japanese_font(font_path))
+"""
+
+import json
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FONTS_DIR = Path(__file__).parent.parent.parent / "fonts"
+
+# 日本語フォントの既定候補（font_list.json の指定が使えない場合に先頭から使用）
+DEFAULT_JAPANESE_FONTS = (
+    "ipaexg.ttf",
+    "ipag.ttf",
+    "NotoSansJP-Regular.otf",
+    "HannariMincho-Regular.otf",
+)
+
+# キャッシュ上限（フォント: 種類×サイズ、外接矩形: 単語×サイズ×向き）
+FONT_CACHE_SIZE = 4096
+EXTENT_CACHE_SIZE = 200000
+
+
+class FontRegistry:
+    """フォント一覧とフォントオブジェクト・文字列寸法のキャッシュ"""
+
+    def __init__(self, fonts_dir=DEFAULT_FONTS_DIR):
+        """初期化
+
+        Args:
+            fonts_dir: フォントディレクトリ（font_list.json の相対パスはその親ディレクトリ基準）
+        """
+        self.fonts_dir = Path(fonts_dir)
+        self.base_dir = self.fonts_dir.parent
+        self.fonts: Dict[str, dict] = self._load_font_list()
+
+        # インスタンスごとのキャッシュ（プロセス内ではレジストリを共有する）
+        self.truetype = lru_cache(maxsize=FONT_CACHE_SIZE)(self._truetype)
+        self.text_bbox = lru_cache(maxsize=EXTENT_CACHE_SIZE)(self._text_bbox)
+        self.font_properties = lru_cache(maxsize=None)(self._font_properties)
+        # 上記キャッシュを使う PIL.ImageFont 代替
+        self.image_font = _ImageFontShim(self)
+
+    def _load_font_list(self) -> Dict[str, dict]:
+        """fonts/font_list.json を読み込み（ない場合はシステムデフォルトのみ）"""
+        font_list_path = self.fonts_dir / "font_list.json"
+        if font_list_path.exists():
+            with open(font_list_path, 'r', encoding='utf-8') as f:
+                fonts = json.load(f)
+        else:
+            fonts = {
+                "default": {
+                    "name": "Default",
+                    "path": None,
+                    "description": "システムデフォルト"
+                }
+            }
+        logger.info(f"利用可能フォント数: {len(fonts)}")
+        return fonts
+
+    def resolve_path(self, font_key: Optional[str]) -> Optional[str]:
+        """フォントキーの絶対パス（未登録・パス指定なしの場合は None）"""
+        font_path = self.fonts.get(font_key or 'default', {}).get('path')
+        if font_path and not Path(font_path).is_absolute():
+            font_path = str(self.base_dir / font_path)
+        return font_path
+
+    def japanese_font(self, font_path: Optional[str] = None,
+                      preferred: Iterable[str] = DEFAULT_JAPANESE_FONTS) -> Optional[str]:
+        """日本語を描画できるフォントのパス（指定フォント → 既定候補の順）"""
+        if font_path and Path(font_path).exists():
+            return str(font_path)
+        for name in preferred:
+            candidate = self.fonts_dir / name
+            if candidate.exists():
+                return str(candidate)
+        logger.warning("利用可能な日本語フォントが見つかりませんでした")
+        return None
+
+    def _truetype(self, font_path, size: int):
+        """FreeTypeFont（(パス, サイズ) ごとに一度だけ読み込み）"""
+        return ImageFont.truetype(font_path, size)
+
+    def _text_bbox(self, font, orientation, text, args=(), kwargs=()):
+        """文字列の外接矩形（フォントオブジェクト・向きごと）"""
+        return ImageFont.TransposedFont(font, orientation).getbbox(text, *args, **dict(kwargs))
+
+    def _font_properties(self, font_path: str):
+        """matplotlib の FontProperties（フォントごとに一度だけ作成）"""
+        from matplotlib import font_manager as fm
+        return fm.FontProperties(fname=font_path)
+
+    def cache_info(self) -> dict:
+        """キャッシュの利用状況"""
+        return {
+            'fonts': self.truetype.cache_info()._asdict(),
+            'text_bbox': self.text_bbox.cache_info()._asdict(),
+            'font_properties': self.font_properties.cache_info()._asdict(),
+        }
+
+
+class _CachedTransposedFont(ImageFont.TransposedFont):
+    """外接矩形をレジストリにキャッシュする TransposedFont"""
+
+    registry: Optional[FontRegistry] = None
+
+    def getbbox(self, text, *args, **kwargs):
+        try:
+            return self.registry.text_bbox(self.font, self.orientation, text,
+                                           args, tuple(sorted(kwargs.items())))
+        except TypeError:
+            # キャッシュキーにできない引数（features のリスト等）はそのまま計算
+            return super().getbbox(text, *args, **kwargs)
+
+
+class _ImageFontShim:
+    """PIL.ImageFont 代替（truetype・TransposedFont をキャッシュ版に置換）"""
+
+    def __init__(self, registry: FontRegistry):
+        self._registry = registry
+        self.TransposedFont = type('TransposedFont', (_CachedTransposedFont,), {'registry': registry})
+
+    def truetype(self, font=None, size=10, *args, **kwargs):
+        if args or kwargs or not isinstance(font, (str, Path)):
+            return ImageFont.truetype(font, size, *args, **kwargs)
+        return self._registry.truetype(str(font), int(size))
+
+    def __getattr__(self, name):
+        return getattr(ImageFont, name)
+
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry(fonts_dir=None) -> FontRegistry:
+    """プロセス共有のフォントレジストリ（初回呼び出し時に作成）
+
+    Args:
+        fonts_dir: フォントディレクトリ（省略時は作成済みのレジストリ、未作成なら fonts/）。
+            作成済みのレジストリと異なるディレクトリは指定できない
+    """
+    global _registry
+    registry = _registry
+    if registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FontRegistry(DEFAULT_FONTS_DIR if fonts_dir is None else fonts_dir)
+            registry = _registry
+    if fonts_dir is not None and Path(fonts_dir).resolve() != registry.fonts_dir.resolve():
+        raise ValueError(f"フォントレジストリは {registry.fonts_dir} で作成済みです"
+                         f"（別のディレクトリ {fonts_dir} は使用できません）")
+    return registry
+
+
+class RegistryImageFont:
+    """プロセス共有レジストリのキャッシュを使う PIL.ImageFont 代替
+
+    属性の参照時にレジストリを取得するため、レジストリの作成前に作ってよい
+    （CachedFontWordCloud.load_font がクラス属性として参照する）。
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_font_registry().image_font, name)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+日本語形態素解析ユーティリティ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 形態素解析結果の共通トークン表現（表層形・基本形・品詞）
+2. 形態素解析エンジンの切り替え（Janome / MeCab(fugashi) / Sudachi、
+   topic_modeling.japanese.tokenizer で選択、未インストール時は自動フォールバック）
+3. テキスト単位・文書単位（文分割あり）の形態素解析
+4. コーパス単位のプロセス並列形態素解析（performance.parallel.n_jobs, data.chunk_size）
+
+使用例:
+    from scripts.utils.japanese_tokenizer import create_tokenizer, tokenize_text, tokenize_corpus
+    tokenizer = create_tokenizer()  # 設定ファイルのエンジン（例: "mecab"）
+    tokens = tokenize_text(tokenizer, "みそ汁はしょっぱい")
+    documents = tokenize_corpus(df)  # 文書ごと・文ごとのトークンリスト
+"""
+
+import os
+import re
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "janome"
+
+# 文区切り（句点・感嘆符・疑問符）
+SENTENCE_DELIMITER = re.compile(r'[。！？]+')
+
+
+class Token(NamedTuple):
+    """形態素解析済みトークン"""
+    surface: str     # 表層形
+    base_form: str   # 基本形（辞書にない語は '*'）
+    pos: str         # 品詞（大分類）
+
+
+# UniDic 系辞書（MeCab/unidic, Sudachi）の品詞大分類を IPA 辞書（Janome）の体系に対応付け
+UNIDIC_POS_MAP = {
+    '代名詞': '名詞',
+    '形状詞': '名詞',
+    '接尾辞': '名詞',
+    '接頭辞': '接頭詞',
+    '補助記号': '記号',
+    '空白': '記号',
+}
+
+
+def _unidic_token(surface: str, base_form: Optional[str], pos: str) -> Token:
+    """UniDic 系の解析結果を共通トークン表現に変換"""
+    return Token(surface, base_form if base_form and base_form != '*' else '*',
+                 UNIDIC_POS_MAP.get(pos, pos))
+
+
+class JanomeBackend:
+    """Janome（純Python、辞書同梱）"""
+    name = 'janome'
+
+    def __init__(self):
+        from janome.tokenizer import Tokenizer
+        self._tokenizer = Tokenizer()
+
+    def tokenize(self, text: str) -> List[Token]:
+        return [
+            Token(token.surface, token.base_form, token.part_of_speech.split(',')[0])
+            for token in self._tokenizer.tokenize(text)
+        ]
+
+
+class MeCabBackend:
+    """MeCab（fugashi + UniDic 辞書）"""
+    name = 'mecab'
+
+    def __init__(self):
+        import fugashi
+        self._tagger = fugashi.Tagger()
+
+    def tokenize(self, text: str) -> List[Token]:
+        return [
+            _unidic_token(word.surface, getattr(word.feature, 'orthBase', None), word.feature.pos1)
+            for word in self._tagger(text)
+        ]
+
+
+class SudachiBackend:
+    """Sudachi（sudachipy + sudachidict_core、短単位 A モード）"""
+    name = 'sudachi'
+
+    def __init__(self):
+        from sudachipy import dictionary, tokenizer
+        sudachi_dictionary = dictionary.Dictionary()
+        # sudachipy 0.6.8 以降は tokenizer()、それ以前は create()
+        create = getattr(sudachi_dictionary, 'tokenizer', None) or sudachi_dictionary.create
+        self._tokenizer = create()
+        self._mode = tokenizer.Tokenizer.SplitMode.A
+
+    def tokenize(self, text: str) -> List[Token]:
+        return [
+            _unidic_token(m.surface(), m.dictionary_form(), m.part_of_speech()[0])
+            for m in self._tokenizer.tokenize(text, self._mode)
+        ]
+
+
+TOKENIZER_BACKENDS: Dict[str, type] = {
+    'janome': JanomeBackend,
+    'mecab': MeCabBackend,
+    'sudachi': SudachiBackend,
+}
+
+
+def configured_backend(config_path=DEFAULT_CONFIG_PATH) -> str:
+    """設定ファイルの形態素解析エンジン名（topic_modeling.japanese.tokenizer）"""
+    config = load_config(config_path)
+    backend = config.get('topic_modeling', {}).get('japanese', {}).get('tokenizer', DEFAULT_BACKEND)
+    return str(backend).lower()
+
+
+def create_tokenizer(backend: Optional[str] = None, config_path=DEFAULT_CONFIG_PATH):
+    """形態素解析エンジンを作成
+
+    指定エンジンが利用できない場合（未インストール・辞書なし）は
+    Janome → その他のエンジンの順にフォールバックする。
+
+    Args:
+        backend: "janome" / "mecab" / "sudachi"（省略時は設定ファイルの値）
+        config_path: 設定ファイルパス
+
+    Returns:
+        tokenize(text) で共通トークン表現のリストを返すエンジン
+    """
+    requested = (backend or configured_backend(config_path)).lower()
+    if requested not in TOKENIZER_BACKENDS:
+        logger.warning(f"未対応の形態素解析エンジンです: {requested}（{DEFAULT_BACKEND}を使用）")
+        requested = DEFAULT_BACKEND
+
+    candidates = [requested, DEFAULT_BACKEND] + list(TOKENIZER_BACKENDS)
+    for name in dict.fromkeys(candidates):
+        try:
+            return TOKENIZER_BACKENDS[name]()
+        except Exception as e:
+            logger.warning(f"形態素解析エンジン {name} を利用できません: {e}")
+    raise RuntimeError("利用可能な形態素解析エンジンがありません")
+
+
+def tokenize_text(tokenizer, text: str) -> List[Token]:
+    """テキストを形態素解析して共通トークン表現のリストを返す
+
+    Args:
+        tokenizer: create_tokenizer() で作成したエンジン
+        text: 解析対象テキスト
+
+    Returns:
+        トークンのリスト
+    """
+    return tokenizer.tokenize(str(text))
+
+
+def split_sentences(text: str) -> List[str]:
+    """テキストを文単位に分割"""
+    sentences = SENTENCE_DELIMITER.split(text)
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def tokenize_document(tokenizer, text: str) -> List[List[Token]]:
+    """文書を文単位に分割して形態素解析
+
+    Returns:
+        文ごとのトークンリスト
+    """
+    return [tokenize_text(tokenizer, sentence) for sentence in split_sentences(str(text))]
+
+
+def load_parallel_settings(config_path=DEFAULT_CONFIG_PATH) -> Tuple[int, int]:
+    """設定ファイルから並列数とチャンクサイズを取得
+
+    Returns:
+        (performance.parallel.n_jobs, data.chunk_size)
+        設定ファイルがない場合は (1, 1000)
+    """
+    config = load_config(config_path)
+    n_jobs = config.get('performance', {}).get('parallel', {}).get('n_jobs', 1)
+    chunk_size = config.get('data', {}).get('chunk_size', 1000)
+    return int(n_jobs), int(chunk_size)
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """n_jobs を実際のワーカー数に変換（-1 は全CPUコア）"""
+    cpu_count = os.cpu_count() or 1
+    if n_jobs < 0:
+        return max(1, cpu_count + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+# ワーカープロセスごとの Tokenizer（初期化時に一度だけ作成）
+_worker_tokenizer = None
+
+
+def _init_worker(backend: str):
+    """ワーカープロセス初期化"""
+    global _worker_tokenizer
+    _worker_tokenizer = create_tokenizer(backend)
+
+
+def _tokenize_chunk(texts: List) -> List[List[List[Token]]]:
+    """チャンク内の文書を形態素解析（ワーカープロセスで実行）"""
+    return [[] if pd.isna(text) else tokenize_document(_worker_tokenizer, text) for text in texts]
+
+
+def tokenize_corpus(data, text_column: str = 'text', n_jobs: Optional[int] = None,
+                    chunk_size: Optional[int] = None, tokenizer=None,
+                    config_path=DEFAULT_CONFIG_PATH) -> List[List[List[Token]]]:
+    """コーパス全体をチャンク分割してプロセス並列で形態素解析
+
+    結果は入力と同じ順序で返す。チャンクが1つしかない場合や n_jobs=1 の場合は
+    プロセスを起動せず現在のプロセスで解析する。
+
+    Args:
+        data: DataFrame またはテキストの列
+        text_column: DataFrame の場合のテキスト列名
+        n_jobs: ワーカー数（-1 で全CPUコア、省略時は設定ファイルの値）
+        chunk_size: 1チャンクあたりの文書数（省略時は設定ファイルの値）
+        tokenizer: 使用するエンジン（省略時は設定ファイルのエンジンを作成、
+            並列処理時は各ワーカーで同じエンジンを作成）
+        config_path: 設定ファイルパス
+
+    Returns:
+        文書ごとの、文ごとのトークンリスト（欠損テキストは空リスト）
+    """
+    texts = list(data[text_column]) if isinstance(data, pd.DataFrame) else list(data)
+    if not texts:
+        return []
+
+    config_n_jobs, config_chunk_size = load_parallel_settings(config_path)
+    n_jobs = resolve_n_jobs(config_n_jobs if n_jobs is None else n_jobs)
+    chunk_size = max(1, chunk_size or config_chunk_size)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    n_workers = min(n_jobs, len(chunks))
+
+    if n_workers <= 1:
+        if tokenizer is None:
+            tokenizer = create_tokenizer(config_path=config_path)
+        return [[] if pd.isna(text) else tokenize_document(tokenizer, text) for text in texts]
+
+    backend = tokenizer.name if tokenizer is not None else configured_backend(config_path)
+    logger.info(f"並列形態素解析: {len(texts)}文書, {len(chunks)}チャンク, {n_workers}プロセス")
+    results = []
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(backend,)) as executor:
+        for chunk_result in executor.map(_tokenize_chunk, chunks):
+            results.extend(chunk_result)
+    return results
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+描画ジョブキュー
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 描画処理をワーカースレッドで非同期実行し、ジョブIDで状態・結果を参照（performance.jobs.workers）
+2. 同じクライアント・同じビューの新しいジョブが投入されたら、待機中・実行中の古いジョブを取り消し
+3. 実行中のジョブは処理の区切り（raise_if_cancelled）で協調的に中断し、完了しても結果は破棄
+4. 終了したジョブは件数上限まで保持（performance.jobs.max_jobs、古いものから破棄）
+5. ジョブの状態・結果を共有ディレクトリ（performance.cache.directory の jobs）に書き出し、
+   gunicorn の別のワーカープロセスが受けた状態取得・取り消しにも応答
+
+使用例:
+    from scripts.utils.job_queue import JobQueue, raise_if_cancelled
+    queue = JobQueue.from_config()
+    job = queue.submit(render, config, kind='wordcloud', client_id='tab-1')
+    job = queue.wait(job.id, timeout=10)
+    job.to_dict()  # {'job_id': ..., 'status': 'done', ...}
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_JOBS = 256
+# 共有ディレクトリにジョブの状態を残す時間（秒、起動時にこれより古いものを削除）
+DEFAULT_RETENTION = 60 * 60
+
+# ジョブの状態（queued → running → done / failed、取り消し時は cancelled）
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+
+class JobCancelled(BaseException):
+    """ジョブの取り消し（描画処理の except Exception で握りつぶされないよう BaseException を継承）"""
+
+
+_current = threading.local()
+
+
+def current_job() -> Optional['Job']:
+    """現在のスレッドで実行中のジョブ（ジョブ外では None）"""
+    return getattr(_current, 'job', None)
+
+
+def raise_if_cancelled():
+    """実行中のジョブが取り消されていれば JobCancelled を送出（ジョブ外では何もしない）"""
+    job = current_job()
+    if job is not None and job.cancel_requested():
+        raise JobCancelled(job.id)
+
+
+class Job:
+    """キューに投入したジョブ"""
+
+    def __init__(self, job_id: str, kind: str, client_id: Optional[str], view: str):
+        self.id = job_id
+        self.kind = kind
+        self.client_id = client_id
+        self.view = view
+        self.status = 'queued'
+        self.result = None
+        self.error: Optional[str] = None
+        self.superseded_by: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.future = None
+        self.cancel_path: Optional[Path] = None  # 他のプロセスからの取り消し要求（共有ディレクトリ使用時）
+
+    @property
+    def finished_status(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def cancel_requested(self) -> bool:
+        """取り消し要求の有無（他のプロセスからの要求を受けていれば cancel_event に反映）"""
+        if not self.cancel_event.is_set() and self.cancel_path is not None and self.cancel_path.exists():
+            self.cancel_event.set()
+        return self.cancel_event.is_set()
+
+    def to_record(self) -> dict:
+        """共有ディレクトリに書き出す状態と結果（結果は JSON にできる値であること）"""
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'client_id': self.client_id,
+            'view': self.view,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'superseded_by': self.superseded_by,
+            'cancel_requested': self.cancel_event.is_set(),
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'owner_pid': os.getpid(),
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> 'Job':
+        """共有ディレクトリから読み込んだ状態（他のプロセスで実行中・実行済みのジョブの写し）"""
+        job = cls(record['job_id'], record['kind'], record['client_id'], record['view'])
+        job.status = record['status']
+        job.result = record['result']
+        job.error = record['error']
+        job.superseded_by = record['superseded_by']
+        job.created = record['created']
+        job.started = record['started']
+        job.finished = record['finished']
+        if record['cancel_requested']:
+            job.cancel_event.set()
+        if job.finished_status:
+            job.done_event.set()
+        return job
+
+    def to_dict(self) -> dict:
+        """状態（結果は含めない）"""
+        info = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'view': self.view,
+            'status': self.status,
+            'error': self.error,
+            'superseded_by': self.superseded_by,
+            'cancel_requested': self.cancel_event.is_set(),
+        }
+        if self.started is not None:
+            info['queued_seconds'] = round(self.started - self.created, 3)
+            if self.finished is not None:
+                info['run_seconds'] = round(self.finished - self.started, 3)
+        return info
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """同じホストのプロセスが実行中か（判定できない場合は実行中とみなす）"""
+    if not pid:
+        return False
+    if os.name == 'nt':
+        return True  # Windows の os.kill はプロセスを終了させるため判定しない
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """描画ジョブのキュー（ワーカースレッドで実行、スレッドセーフ）
+
+    directory を指定した場合は、状態が変わるたびにジョブの状態・結果を書き出す。
+    同じディレクトリを使う他のプロセスは、自分のキューにないジョブをそこから取得・待機し、
+    取り消し要求を書き込む（実行中のプロセスは raise_if_cancelled の区切りで中断する）。
+    """
+
+    # 他のプロセスのジョブの終了を待つときの確認間隔（秒）
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_jobs: int = DEFAULT_MAX_JOBS,
+                 directory=None, retention: float = DEFAULT_RETENTION):
+        """初期化
+
+        Args:
+            workers: 同時に実行するジョブ数
+            max_jobs: 状態を保持するジョブ数の上限（超えた分は終了したものから破棄）
+            directory: ジョブの状態を共有するディレクトリ（None の場合はプロセス内のみ）
+            retention: 共有ディレクトリにジョブの状態を残す秒数（prune_shared で削除）
+        """
+        self.workers = max(1, workers)
+        self.max_jobs = max_jobs
+        self.retention = retention
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.counts = {'submitted': 0, 'done': 0, 'failed': 0, 'cancelled': 0}
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._latest: Dict[tuple, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='render-job')
+
+    @classmethod
+    def from_config(cls, config_path=DEFAULT_CONFIG_PATH) -> 'JobQueue':
+        """設定ファイルの performance.jobs（workers, max_jobs, retention）から作成
+
+        状態は performance.cache.directory の下の jobs ディレクトリで共有する。
+        """
+        from scripts.utils.render_cache import cache_directory
+
+        jobs_config = load_config(config_path).get('performance', {}).get('jobs', {}) or {}
+        return cls(int(jobs_config.get('workers', DEFAULT_WORKERS)),
+                   int(jobs_config.get('max_jobs', DEFAULT_MAX_JOBS)),
+                   directory=cache_directory(config_path, 'jobs'),
+                   retention=float(jobs_config.get('retention', DEFAULT_RETENTION)))
+
+    def submit(self, fn, *args, kind: str = 'render', client_id: Optional[str] = None,
+               view: Optional[str] = None) -> Job:
+        """ジョブを投入（同じクライアント・ビューの未終了のジョブは取り消す）
+
+        Args:
+            fn: ワーカースレッドで実行する関数（戻り値がジョブの結果）
+            kind: ジョブの種類
+            client_id: クライアント識別子（None の場合は取り消しの対象にしない）
+            view: ビュー（省略時は kind）。同じクライアント・ビューでは最新のジョブのみ有効
+        """
+        job = Job(uuid.uuid4().hex, kind, client_id, view or kind)
+        if self.directory is not None:
+            job.cancel_path = self._path(job.id, '.cancel')
+        with self._lock:
+            if client_id is not None:
+                previous = self._latest.get((client_id, job.view))
+                if previous is not None:
+                    self._cancel(previous, superseded_by=job.id)
+                    self._write(previous)
+                self._latest[(client_id, job.view)] = job
+                self._supersede_shared(job)
+            self._jobs[job.id] = job
+            self.counts['submitted'] += 1
+            self._evict()
+            self._write(job)
+            job.future = self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Job, fn, args):
+        """ジョブを実行（ワーカースレッド）"""
+        if job.cancel_requested():
+            with self._lock:
+                self._cancel(job)
+                self._write(job)
+        with self._lock:
+            if job.status != 'queued':
+                return
+            job.status = 'running'
+            job.started = time.time()
+            self._write(job)
+        _current.job = job
+        try:
+            result = fn(*args)
+        except JobCancelled:
+            self._finish(job, 'cancelled')
+        except Exception as e:
+            logger.error(f"ジョブ実行エラー ({job.kind}): {e}")
+            self._finish(job, 'failed', error=str(e))
+        else:
+            self._finish(job, 'done', result=result)
+        finally:
+            _current.job = None
+
+    def _finish(self, job: Job, status: str, result=None, error: Optional[str] = None):
+        """終了状態を記録（実行中に取り消されたジョブの結果は破棄）"""
+        with self._lock:
+            if job.cancel_event.is_set():
+                status, result = 'cancelled', None
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished = time.time()
+            self.counts[status] += 1
+            if self._latest.get((job.client_id, job.view)) is job:
+                del self._latest[(job.client_id, job.view)]
+            self._write(job)
+        job.done_event.set()
+
+    def _cancel(self, job: Job, superseded_by: Optional[str] = None) -> bool:
+        """ジョブを取り消し（ロック取得済みで呼ぶ）。実行中のジョブは次の区切りで中断する"""
+        if job.finished_status or job.cancel_event.is_set():
+            return False
+        job.cancel_event.set()
+        job.superseded_by = superseded_by
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished = time.time()
+            self.counts['cancelled'] += 1
+            if job.future is not None:
+                job.future.cancel()
+            if self._latest.get((job.client_id, job.view)) is job:
+                del self._latest[(job.client_id, job.view)]
+            job.done_event.set()
+        return True
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """ジョブを取り消し（存在しなければ None）。他のプロセスのジョブには取り消し要求を書き込む"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._cancel(job)
+                self._write(job)
+                return job
+        job = self._read(job_id)
+        if job is not None and not job.finished_status:
+            self._request_cancel(job_id)
+            job.cancel_event.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得（存在しなければ None）。他のプロセスのジョブは共有ディレクトリの写し"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._read(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """ジョブの終了を最大 timeout 秒待って返す（存在しなければ None）"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job.done_event.wait(timeout)
+            return job
+
+        # 他のプロセスのジョブは共有ディレクトリの状態を確認しながら待つ
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = self._read(job_id)
+        while job is not None and not job.finished_status:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(self.POLL_INTERVAL)
+            job = self._read(job_id)
+        return job
+
+    def prune_shared(self) -> int:
+        """共有ディレクトリの古いジョブの状態を整理（サーバー起動時に呼ぶ）
+
+        最終更新から retention 秒を過ぎたファイルは削除し、実行していたプロセスが
+        終了して終わらないままのジョブは失敗として記録する（待っているクライアントに 404 ではなく
+        失敗を返す）。USR2 での入れ替え中に旧マスターのワーカーが実行・保持しているジョブは残す。
+
+        Returns:
+            削除したファイル数
+        """
+        if self.directory is None:
+            return 0
+        now = time.time()
+        removed = 0
+        for path in self.directory.iterdir():
+            try:
+                age = now - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age > self.retention:
+                path.unlink(missing_ok=True)
+                removed += 1
+            elif path.suffix == '.json' and not path.name.startswith('.'):
+                self._fail_orphaned(path)
+        return removed
+
+    def _fail_orphaned(self, path: Path):
+        """実行していたプロセスが終了した未終了のジョブを失敗として記録"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            job = Job.from_record(record)
+        except (OSError, ValueError, KeyError):
+            return
+        if job.finished_status or _process_alive(record.get('owner_pid')):
+            return
+        job.status = 'failed'
+        job.error = 'ジョブを実行していたサーバープロセスが終了しました（再実行してください）'
+        job.finished = time.time()
+        with self._lock:
+            self._write(job)
+
+    def _path(self, job_id: str, suffix: str = '.json') -> Path:
+        """ジョブの状態ファイル（ジョブIDは uuid4 の16進表記のみ受け付ける）"""
+        if not all(c in '0123456789abcdef' for c in job_id) or len(job_id) != 32:
+            raise ValueError(f"ジョブIDが不正です: {job_id}")
+        return self.directory / f'{job_id}{suffix}'
+
+    def _write(self, job: Job):
+        """ジョブの状態を書き出し（一時ファイルから置き換え、ロック取得済みで呼ぶ）"""
+        if self.directory is None:
+            return
+        path = self._path(job.id)
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job.to_record(), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"ジョブ状態の書き出しに失敗しました ({job.id}): {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _read(self, job_id: str) -> Optional[Job]:
+        """共有ディレクトリからジョブの状態を読み込み（なければ None）"""
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return Job.from_record(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _request_cancel(self, job_id: str):
+        """他のプロセスで実行中のジョブに取り消し要求を書き込む"""
+        try:
+            self._path(job_id, '.cancel').touch()
+        except (OSError, ValueError) as e:
+            logger.warning(f"ジョブの取り消し要求に失敗しました ({job_id}): {e}")
+
+    def _supersede_shared(self, job: Job):
+        """同じクライアント・ビューの他のプロセスのジョブに取り消し要求を書き込む（ロック取得済みで呼ぶ）"""
+        if self.directory is None:
+            return
+        digest = hashlib.sha256(f'{job.client_id}\0{job.view}'.encode('utf-8')).hexdigest()[:32]
+        latest_path = self.directory / f'latest-{digest}'
+        try:
+            previous_id = latest_path.read_text(encoding='ascii').strip()
+        except OSError:
+            previous_id = None
+        if previous_id and previous_id not in self._jobs:
+            previous = self._read(previous_id)
+            if previous is not None and not previous.finished_status:
+                self._request_cancel(previous_id)
+        tmp_path = latest_path.with_name(f'.{latest_path.name}.{os.getpid()}')
+        try:
+            tmp_path.write_text(job.id, encoding='ascii')
+            os.replace(tmp_path, latest_path)
+        except OSError as e:
+            logger.warning(f"最新ジョブの記録に失敗しました: {e}")
+
+    def _evict(self):
+        """保持件数の上限を超えた分を終了したジョブの古いものから破棄（ロック取得済みで呼ぶ）"""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job.id for job in self._jobs.values() if job.finished_status][:excess]:
+            del self._jobs[job_id]
+            if self.directory is not None:
+                self._path(job_id).unlink(missing_ok=True)
+                self._path(job_id, '.cancel').unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def stats(self) -> dict:
+        """ワーカー数・状態ごとの件数"""
+        with self._lock:
+            active = {status: 0 for status in ('queued', 'running')}
+            for job in self._jobs.values():
+                if job.status in active:
+                    active[job.status] += 1
+            return dict(self.counts, workers=self.workers, **active)
+
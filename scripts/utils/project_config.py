@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+設定ファイルの場所と読み込み
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 既定の設定ファイル（config/analysis_config.yaml）をプロジェクトルートから解決
+   （作業ディレクトリによらず同じ設定を読む）
+2. 相対パスで指定された設定ファイルもプロジェクトルート基準で解決
+3. 設定ファイルがない・読めない場合は警告して空の設定（既定値で動作）
+
+使用例:
+    from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config
+    config = load_config()
+    cache_config = config.get('performance', {}).get('cache', {})
+"""
+
+import logging
+import threading
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "config" / "analysis_config.yaml"
+
+# 警告済みのパス（同じ設定ファイルの欠落を何度も警告しない）
+_warned_paths = set()
+_warned_lock = threading.Lock()
+
+
+def resolve_config_path(config_path=DEFAULT_CONFIG_PATH) -> Path:
+    """設定ファイルの絶対パス（相対パスはプロジェクトルート基準）"""
+    path = Path(config_path)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    return path
+
+
+def _warn_once(path: Path, message: str):
+    """パスごとに1回だけ警告"""
+    with _warned_lock:
+        if path in _warned_paths:
+            return
+        _warned_paths.add(path)
+    logger.warning(message)
+
+
+def load_config(config_path=DEFAULT_CONFIG_PATH) -> dict:
+    """設定ファイル読み込み（存在しない・読めない場合は警告して空の設定）"""
+    path = resolve_config_path(config_path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        _warn_once(path, f"設定ファイルが見つかりません: {path}（既定値を使用）")
+    except Exception as e:
+        _warn_once(path, f"設定ファイルの読み込みに失敗しました: {path}: {e}（既定値を使用）")
+    return {}
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+描画結果キャッシュ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 描画設定の正規化ハッシュ、または画像内容のハッシュをキーに画像を保持
+2. 合計バイト数の上限による LRU 破棄
+   - performance.cache.directory 以下のディスクに保存し、複数ワーカープロセスで共有
+     （max_size はディスク上の合計、memory_size はプロセスごとのメモリ上の合計）
+3. キーをそのまま ETag・画像URLとして使用（同じキー → 同じ画像）
+4. 配置済み WordCloud の LRU キャッシュ（色だけが違う描画は再配置せず recolor で描画）
+
+使用例:
+    from scripts.utils.render_cache import RenderCache, config_key
+    cache = RenderCache.from_config()
+    key = config_key({'text_source': 'comments', 'width': 1000})
+    cache.put(key, png_bytes, 'image/png')
+    image = cache.get(key)  # CachedImage(data, mime_type)
+
+    # 複数プロセスで共有するディスクキャッシュ
+    shared = RenderCache(max_bytes=1024 ** 3, directory='cache/render')
+
+    layouts = LayoutCache.from_config()
+    layouts.put(layout_key, wordcloud)
+    wordcloud = layouts.get(layout_key)
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config, resolve_config_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+DEFAULT_MEMORY_BYTES = 64 * 1024 ** 2
+# ディスク上の上限を超えたときに削減する割合（毎回の保存で走査しないよう少し余裕を残す）
+PRUNE_RATIO = 0.9
+DEFAULT_LAYOUT_ENTRIES = 64
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+
+def parse_size(value) -> int:
+    """'1GB' 形式のサイズ指定をバイト数に変換（数値はそのままバイト数）"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B)?\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"サイズ指定が不正です: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2) or 'B'])
+
+
+class CachedImage(NamedTuple):
+    """キャッシュ済みの画像"""
+    data: bytes       # エンコード済み画像
+    mime_type: str    # Content-Type
+
+
+def content_key(data: bytes) -> str:
+    """画像内容のハッシュ"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _load_cache_config(config_path) -> dict:
+    """設定ファイルの performance.cache セクション"""
+    return load_config(config_path).get('performance', {}).get('cache', {}) or {}
+
+
+def cache_directory(config_path=DEFAULT_CONFIG_PATH, name: str = 'render') -> Optional[Path]:
+    """performance.cache.directory の下の name ディレクトリ（未設定なら None）
+
+    相対パスは設定ファイルのあるディレクトリの親（プロジェクトルート）を基準とする。
+    """
+    directory = _load_cache_config(config_path).get('directory')
+    if not directory:
+        return None
+    directory = Path(directory)
+    if not directory.is_absolute():
+        directory = resolve_config_path(config_path).resolve().parent.parent / directory
+    return directory / name
+
+
+def config_key(effective_config: dict) -> str:
+    """描画設定の正規化ハッシュ（キー順・集合の順序に依存しない）"""
+    canonical = json.dumps(effective_config, sort_keys=True, ensure_ascii=False,
+                           separators=(',', ':'), default=sorted)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _config_size(cache_config: dict, name: str, default: int) -> int:
+    """performance.cache のサイズ指定（不正な値は既定値）"""
+    if name not in cache_config:
+        return default
+    try:
+        return parse_size(cache_config[name])
+    except ValueError as e:
+        logger.warning(f"{e}（既定値 {default} バイトを使用）")
+        return default
+
+
+class RenderCache:
+    """描画結果の LRU キャッシュ（合計バイト数で上限管理、スレッドセーフ）
+
+    directory を指定した場合は画像をディスクにも保存し、同じディレクトリを使う
+    他のプロセス（gunicorn の各ワーカー）が描画した画像も取得できる。
+    メモリ上には最近使った画像を memory_bytes まで保持する。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True,
+                 directory=None, memory_bytes: Optional[int] = None):
+        """初期化
+
+        Args:
+            max_bytes: 保持する画像の合計バイト数の上限（directory 指定時はディスク上の合計）
+            enabled: False の場合は描画結果を再利用しない（画像URL配信のための保持は行う）
+            directory: 画像を保存する共有ディレクトリ（None の場合はメモリのみ）
+            memory_bytes: メモリ上に保持する合計バイト数の上限（省略時はメモリのみなら max_bytes、
+                ディスク併用時は max_bytes と DEFAULT_MEMORY_BYTES の小さい方）
+        """
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.directory = Path(directory) if directory is not None else None
+        if memory_bytes is None:
+            memory_bytes = max_bytes if self.directory is None else min(max_bytes, DEFAULT_MEMORY_BYTES)
+        self.memory_bytes = memory_bytes
+        self.total_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, CachedImage]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.disk_bytes = sum(size for _, _, size in self._disk_files())
+
+    @classmethod
+    def from_config(cls, config_path=DEFAULT_CONFIG_PATH) -> 'RenderCache':
+        """設定ファイルの performance.cache（enable, directory, max_size, memory_size）から作成
+
+        画像は directory の下の render ディレクトリに保存する（cache_directory）。
+        """
+        cache_config = _load_cache_config(config_path)
+        return cls(_config_size(cache_config, 'max_size', DEFAULT_MAX_BYTES),
+                   enabled=bool(cache_config.get('enable', True)),
+                   directory=cache_directory(config_path, 'render'),
+                   memory_bytes=(_config_size(cache_config, 'memory_size', DEFAULT_MEMORY_BYTES)
+                                 if 'memory_size' in cache_config else None))
+
+    def lookup(self, key: str) -> Optional[CachedImage]:
+        """再描画を省略するための検索（無効時は常に None、ヒット率を集計）"""
+        if not self.enabled:
+            return None
+        image = self.get(key)
+        with self._lock:
+            if image is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return image
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        """キャッシュ済みの画像を取得（メモリになければディスクから、なければ None）"""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                return image
+        image = self._read_disk(key)
+        if image is not None:
+            self._put_memory(key, image)
+        return image
+
+    def put(self, key: str, data: bytes, mime_type: str = 'image/png'):
+        """画像を登録（上限を超えた分は最も古く使われたものから破棄）"""
+        if len(data) > self.max_bytes:
+            logger.warning(f"画像が描画キャッシュの上限を超えるため保持しません: {len(data)}バイト")
+            return
+        image = CachedImage(data, mime_type)
+        self._write_disk(key, image)
+        self._put_memory(key, image)
+
+    def _put_memory(self, key: str, image: CachedImage):
+        """メモリ上の LRU に登録"""
+        if len(image.data) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous.data)
+            self._entries[key] = image
+            self.total_bytes += len(image.data)
+            while self.total_bytes > self.memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted.data)
+
+    def _path(self, key: str) -> Path:
+        """キーの保存先（先頭2文字のサブディレクトリに分ける）"""
+        if not re.fullmatch(r'[0-9a-f]{64}', key):
+            raise ValueError(f"キャッシュキーが不正です: {key}")
+        return self.directory / key[:2] / key
+
+    def _read_disk(self, key: str) -> Optional[CachedImage]:
+        """ディスクから読み込み（1行目が Content-Type、以降が画像）"""
+        if self.directory is None:
+            return None
+        try:
+            path = self._path(key)
+            with open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)  # 最終使用時刻（破棄の順序）を更新
+        except (OSError, ValueError):
+            return None
+        mime_type, _, data = content.partition(b'\n')
+        return CachedImage(data, mime_type.decode('ascii'))
+
+    def _write_disk(self, key: str, image: CachedImage):
+        """ディスクに保存（一時ファイルから置き換え、他プロセスが書きかけを読まないようにする）"""
+        if self.directory is None:
+            return
+        path = self._path(key)
+        if path.exists():
+            os.utime(path)
+            return
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f'.{key}.{os.getpid()}.{threading.get_ident()}')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(image.mime_type.encode('ascii') + b'\n')
+                f.write(image.data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"描画キャッシュの保存に失敗しました: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        with self._disk_lock:
+            self.disk_bytes += len(image.mime_type) + 1 + len(image.data)
+            if self.disk_bytes > self.max_bytes:
+                self._prune_disk()
+
+    def _disk_files(self):
+        """ディスク上のキャッシュファイル (最終使用時刻, パス, バイト数)"""
+        files = []
+        for path in self.directory.glob('*/*'):
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        return files
+
+    def _prune_disk(self):
+        """ディスク上の合計が上限を超えていれば最も古く使われたものから削除（_disk_lock 取得済みで呼ぶ）
+
+        他のプロセスが保存した分も含めて実際のファイルを走査して合計する。
+        """
+        files = sorted(self._disk_files())
+        total = sum(size for _, _, size in files)
+        target = self.max_bytes * PRUNE_RATIO
+        for _, path, size in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self.disk_bytes = total
+
+    def put_content(self, data: bytes, mime_type: str = 'image/png') -> str:
+        """画像を内容ハッシュをキーに登録してキーを返す"""
+        key = content_key(data)
+        self.put(key, data, mime_type)
+        return key
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._entries:
+            return True
+        try:
+            return self.directory is not None and self._path(key).exists()
+        except ValueError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """件数・使用バイト数（メモリ・ディスク）・ヒット数"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'memory_bytes': self.memory_bytes,
+            'directory': str(self.directory) if self.directory is not None else None,
+            'disk_bytes': self.disk_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class LayoutCache:
+    """配置済み WordCloud の LRU キャッシュ（件数で上限管理、スレッドセーフ）
+
+    保持した WordCloud は共有されるため、色付け・描画は copy.copy した複製に対して行う
+    （recolor・描画倍率の変更は複製の属性を置き換えるだけで元の配置は変わらない）。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_LAYOUT_ENTRIES, enabled: bool = True):
+        """初期化
+
+        Args:
+            max_entries: 保持する配置の最大件数
+            enabled: False の場合は配置を保持しない
+        """
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_path=DEFAULT_CONFIG_PATH) -> 'LayoutCache':
+        """設定ファイルの performance.cache（enable, layout_cache_entries）から作成"""
+        cache_config = _load_cache_config(config_path)
+        return cls(int(cache_config.get('layout_cache_entries', DEFAULT_LAYOUT_ENTRIES)),
+                   enabled=bool(cache_config.get('enable', True)))
+
+    def get(self, key: str):
+        """配置を取得（なければ None、ヒット率を集計）"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            layout = self._entries.get(key)
+            if layout is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return layout
+
+    def peek(self, key: str):
+        """配置を取得（ヒット率・使用順は更新しない）"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, layout):
+        """配置を登録（上限を超えた分は最も古く使われたものから破棄）"""
+        if not self.enabled or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = layout
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """件数・ヒット数"""
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
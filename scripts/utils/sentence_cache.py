@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+文単位トークンキャッシュ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 文テキストの内容ハッシュをキーに形態素解析結果を保持（LRU）
+2. 変更された文のみ形態素解析し、未変更の文はキャッシュを再利用
+
+使用例:
+    from scripts.utils.sentence_cache import SentenceTokenCache
+    cache = SentenceTokenCache.from_config(tokenizer)
+    sentences = cache.tokenize(custom_text)  # [(文, トークン列), ...]
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from scripts.utils.japanese_tokenizer import Token, split_sentences, tokenize_text
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def sentence_key(sentence: str) -> bytes:
+    """文テキストの内容ハッシュ（キャッシュキー）"""
+    return hashlib.blake2b(sentence.encode('utf-8'), digest_size=16).digest()
+
+
+class SentenceTokenCache:
+    """文単位の形態素解析結果キャッシュ（スレッドセーフ、LRU）"""
+
+    def __init__(self, tokenizer, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """初期化
+
+        Args:
+            tokenizer: 形態素解析エンジン
+            max_entries: 保持する最大文数（超えた分は最も古く使われた文から破棄）
+        """
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[bytes, List[Token]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # MeCab (fugashi)・Sudachi のエンジンはスレッドセーフでないため、解析は1スレッドずつ行う
+        self._tokenizer_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, tokenizer, config_path=DEFAULT_CONFIG_PATH) -> 'SentenceTokenCache':
+        """設定ファイルの performance.cache.sentence_cache_entries から作成"""
+        cache_config = load_config(config_path).get('performance', {}).get('cache', {}) or {}
+        return cls(tokenizer, int(cache_config.get('sentence_cache_entries', DEFAULT_MAX_ENTRIES)))
+
+    def tokenize(self, text: str) -> List[Tuple[str, List[Token]]]:
+        """テキストを文に分割し、文ごとのトークン列を取得
+
+        Returns:
+            (文テキスト, トークン列) のリスト
+        """
+        results = []
+        misses = []
+        with self._lock:
+            for sentence in split_sentences(text):
+                key = sentence_key(sentence)
+                tokens = self._entries.get(key)
+                if tokens is None:
+                    misses.append((len(results), key))
+                else:
+                    self._entries.move_to_end(key)
+                results.append((sentence, tokens))
+            self.hits += len(results) - len(misses)
+            self.misses += len(misses)
+
+        # 形態素解析はキャッシュのロック外で行う（同じ文の同時解析は結果が同一なので許容）
+        computed = {}
+        if misses:
+            with self._tokenizer_lock:
+                for position, key in misses:
+                    sentence = results[position][0]
+                    tokens = computed.get(key)
+                    if tokens is None:
+                        tokens = computed[key] = tokenize_text(self.tokenizer, sentence)
+                    results[position] = (sentence, tokens)
+
+        if computed:
+            with self._lock:
+                for key, tokens in computed.items():
+                    self._entries[key] = tokens
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            logger.debug(f"文キャッシュ: {len(results)}文中 {len(computed)}文を形態素解析")
+        return results
+
+    def clear(self):
+        """キャッシュを空にする"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+同時リクエストの集約（シングルフライト）
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 同じキーの処理が実行中なら新たに実行せず、その完了を待って同じ結果（例外）を受け取る
+2. 集約できた件数（hits）と実際に実行した件数（misses）の集計
+3. 実行していたリクエストが取り消された場合（JobCancelled 等）、待っていた側が改めて実行
+
+使用例:
+    from scripts.utils.single_flight import SingleFlight
+    flights = SingleFlight()
+    image = flights.do(render_key, lambda: render(config))
+    flights.stats()  # {'in_flight': 0, 'hits': 12, 'misses': 3}
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class _Call:
+    """実行中の処理"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """同じキーの同時実行を1回にまとめる（スレッドセーフ）"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """fn() の結果を返す（同じキーの fn が実行中ならその結果を共有）
+
+        fn が Exception を送出した場合は、待っていた全員に同じ例外を送出する。
+        BaseException（ジョブの取り消しなど）で中断した場合は結果を共有せず、
+        待っていた側のうち1つが改めて実行する。
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.misses += 1
+                else:
+                    call.waiters += 1
+
+            if leader:
+                return self._run(key, call, fn)
+
+            call.done.wait()
+            if call.abandoned:
+                continue
+            with self._lock:
+                self.hits += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _run(self, key: str, call: _Call, fn: Callable[[], T]) -> T:
+        """代表として fn を実行し、結果を待っている側に渡す"""
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                logger.debug(f"同時リクエストを集約: {call.waiters}件")
+            call.done.set()
+
+    def stats(self) -> dict:
+        """実行中の件数・集約できた件数・実行した件数"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
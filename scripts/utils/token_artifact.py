@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+トークンアーティファクト（列指向・メモリマップ形式）
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. all_text_corpus.csv の形態素解析結果を列指向の .npy ファイル群として保存
+2. np.load(mmap_mode='r') によるゼロコピー読み込み
+3. 元CSVのハッシュ・形態素解析エンジンの変化を検知した場合の自動再作成
+4. 形態素解析前にテキストから文字を除去したアーティファクト（preprocess_pattern ごとに別ディレクトリ）
+5. 複数プロセスからの同時読み込み・再作成に対応
+   （版ごとのディレクトリに作成して CURRENT を os.replace で切り替え、作成はファイルロックで1プロセスずつ）
+
+ディレクトリ構成:
+    token_artifact/CURRENT             読み込む版のディレクトリ名
+    token_artifact/v2-<CSVハッシュ>-<エンジン>/   版ごとの列ファイル・meta.json・vocab.json
+
+保存内容:
+    surface_ids / base_ids / pos_ids   トークン単位の整数ID列
+    sentence_offsets / doc_offsets     文・文書のトークン境界
+    sentence_bytes / sentence_byte_offsets  文テキスト（UTF-8 の連結）と文ごとのバイト境界
+    doc_sentence_offsets               文書ごとの文境界
+    category_ids / class / page_id     文書単位のメタデータ列
+    text_hashes                        文書テキストのハッシュ（行照合用、除去前のテキスト）
+
+使用例:
+    from scripts.utils.token_artifact import load_token_artifact
+    artifact = load_token_artifact("data/processed/all_text_corpus.csv")
+    tokens = artifact.document_tokens(0)
+
+実行方法（事前作成）: python scripts/utils/token_artifact.py
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows（ロックなし。版の作成・切り替えはそれぞれ rename・os.replace で原子的）
+    fcntl = None
+
+# プロジェクトルートをパスに追加
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from scripts.utils.japanese_tokenizer import (Token, configured_backend, create_tokenizer, split_sentences,
+                                              tokenize_corpus)
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 2
+DEFAULT_CORPUS_PATH = "data/processed/all_text_corpus.csv"
+DEFAULT_ARTIFACT_DIR = "data/processed/token_artifact"
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+# 作成途中で残った一時ディレクトリを削除するまでの時間（秒）
+STALE_TMP_SECONDS = 60 * 60
+
+# 列名と dtype
+TOKEN_COLUMNS = {
+    'surface_ids': np.int32,
+    'base_ids': np.int32,
+    'pos_ids': np.int16,
+}
+INDEX_COLUMNS = {
+    'sentence_offsets': np.int64,
+    'sentence_docs': np.int32,
+    'doc_offsets': np.int64,
+    'doc_sentence_offsets': np.int64,
+    'sentence_byte_offsets': np.int64,
+}
+# 文テキスト（split_sentences の結果を UTF-8 で連結、sentence_byte_offsets で切り出す）
+TEXT_COLUMNS = {
+    'sentence_bytes': np.uint8,
+}
+DOCUMENT_COLUMNS = {
+    'category_ids': np.int16,
+    'class': np.float64,
+    'page_id': np.int64,
+    'text_hashes': np.uint64,
+}
+
+
+def file_sha256(path) -> str:
+    """ファイル内容の SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_hash(text) -> int:
+    """文書テキストの64bitハッシュ（行照合用）"""
+    return int.from_bytes(hashlib.blake2b(str(text).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class _Interner:
+    """文字列→整数IDの対応表"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __call__(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self.ids[value] = index
+            self.values.append(value)
+        return index
+
+
+class TokenArtifact:
+    """メモリマップで読み込んだトークンアーティファクト"""
+
+    def __init__(self, artifact_dir):
+        """初期化
+
+        Args:
+            artifact_dir: アーティファクトディレクトリ
+        """
+        self.artifact_dir = Path(artifact_dir)
+        with open(self.artifact_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(self.artifact_dir / 'vocab.json', 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+        self.surfaces: List[str] = vocab['surface']
+        self.base_forms: List[str] = vocab['base_form']
+        self.pos_tags: List[str] = vocab['pos']
+        self.categories: List[str] = self.meta['categories']
+
+        columns = {**TOKEN_COLUMNS, **INDEX_COLUMNS, **TEXT_COLUMNS, **DOCUMENT_COLUMNS}
+        for name in columns:
+            # ゼロコピー読み込み（ページは必要時にOSが読み込む）
+            setattr(self, name, np.load(self.artifact_dir / f'{name}.npy', mmap_mode='r'))
+
+        self._hash_index: Optional[Dict[int, int]] = None
+
+    @property
+    def source_sha256(self) -> str:
+        return self.meta['source_sha256']
+
+    @property
+    def preprocess_pattern(self) -> Optional[str]:
+        return self.meta.get('preprocess_pattern')
+
+    @property
+    def backend(self) -> str:
+        """作成に使用した形態素解析エンジン名"""
+        return self.meta.get('backend', 'janome')
+
+    @property
+    def n_documents(self) -> int:
+        return len(self.category_ids)
+
+    @property
+    def n_sentences(self) -> int:
+        return len(self.sentence_docs)
+
+    @property
+    def n_tokens(self) -> int:
+        return len(self.surface_ids)
+
+    def _tokens(self, start: int, end: int) -> List[Token]:
+        surfaces, base_forms, pos_tags = self.surfaces, self.base_forms, self.pos_tags
+        return [
+            Token(surfaces[s], base_forms[b], pos_tags[p])
+            for s, b, p in zip(self.surface_ids[start:end].tolist(),
+                               self.base_ids[start:end].tolist(),
+                               self.pos_ids[start:end].tolist())
+        ]
+
+    def sentence_tokens(self, sentence_index: int) -> List[Token]:
+        """文のトークン列"""
+        return self._tokens(int(self.sentence_offsets[sentence_index]),
+                            int(self.sentence_offsets[sentence_index + 1]))
+
+    def sentence_text(self, sentence_index: int) -> str:
+        """文テキスト（元テキストを split_sentences で分割した文そのもの）"""
+        start = int(self.sentence_byte_offsets[sentence_index])
+        end = int(self.sentence_byte_offsets[sentence_index + 1])
+        return self.sentence_bytes[start:end].tobytes().decode('utf-8')
+
+    def document_sentences(self, doc_index: int) -> range:
+        """文書に含まれる文番号の範囲"""
+        return range(int(self.doc_sentence_offsets[doc_index]),
+                     int(self.doc_sentence_offsets[doc_index + 1]))
+
+    def document_tokens(self, doc_index: int) -> List[Token]:
+        """文書のトークン列"""
+        return self._tokens(int(self.doc_offsets[doc_index]), int(self.doc_offsets[doc_index + 1]))
+
+    def document_category(self, doc_index: int) -> str:
+        return self.categories[int(self.category_ids[doc_index])]
+
+    def find_document(self, text) -> Optional[int]:
+        """テキストに一致する文書番号を検索（見つからなければ None）"""
+        if self._hash_index is None:
+            self._hash_index = {}
+            for doc_index, value in enumerate(self.text_hashes.tolist()):
+                self._hash_index.setdefault(value, doc_index)
+        return self._hash_index.get(text_hash(text))
+
+    def lookup_tokens(self, texts: Iterable, tokenizer=None) -> List[List[Token]]:
+        """テキストごとのトークン列を取得
+
+        コーパスに含まれるテキストはアーティファクトから取得し、
+        含まれないテキストのみ形態素解析する（作成時と同じ前処理を適用）。
+
+        Args:
+            texts: テキストの列
+            tokenizer: 未収録テキスト用のエンジン（省略時は作成時と同じエンジン）
+        """
+        results = []
+        missing = []
+        for text in texts:
+            doc_index = None if pd.isna(text) else self.find_document(text)
+            if doc_index is not None:
+                results.append(self.document_tokens(doc_index))
+            else:
+                results.append([])
+                if not pd.isna(text):
+                    missing.append((len(results) - 1, text))
+
+        if missing:
+            if tokenizer is None:
+                tokenizer = create_tokenizer(self.backend)
+            documents = tokenize_corpus([preprocess_text(text, self.preprocess_pattern) for _, text in missing],
+                                        tokenizer=tokenizer)
+            for (position, _), sentences in zip(missing, documents):
+                results[position] = [token for sentence in sentences for token in sentence]
+        return results
+
+
+def preprocess_text(text, preprocess_pattern: Optional[str] = None) -> str:
+    """形態素解析前の文字除去（パターンがなければそのまま）"""
+    text = str(text)
+    if preprocess_pattern:
+        text = re.sub(preprocess_pattern, '', text)
+    return text
+
+
+def default_artifact_dir(csv_path, preprocess_pattern: Optional[str] = None) -> Path:
+    """CSV と同じディレクトリの token_artifact（前処理ありはパターンのハッシュ付きの別ディレクトリ）"""
+    name = Path(DEFAULT_ARTIFACT_DIR).name
+    if preprocess_pattern:
+        name = f"{name}-pre-{hashlib.sha256(preprocess_pattern.encode('utf-8')).hexdigest()[:12]}"
+    return Path(csv_path).parent / name
+
+
+def version_name(source_sha256: str, backend: str) -> str:
+    """版ディレクトリ名（形式の版・元CSVのハッシュ・形態素解析エンジン）"""
+    return f"v{ARTIFACT_VERSION}-{source_sha256[:16]}-{backend}"
+
+
+def current_version_dir(artifact_dir) -> Optional[Path]:
+    """CURRENT が指す版のディレクトリ（未作成なら None）"""
+    artifact_dir = Path(artifact_dir)
+    try:
+        name = (artifact_dir / CURRENT_FILE).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    return artifact_dir / name if name else None
+
+
+def _switch_current(artifact_dir: Path, version_dir: Path):
+    """CURRENT を version_dir に切り替え（一時ファイルから os.replace）"""
+    tmp_path = artifact_dir / f".{CURRENT_FILE}.tmp-{os.getpid()}"
+    tmp_path.write_text(version_dir.name, encoding='utf-8')
+    os.replace(tmp_path, artifact_dir / CURRENT_FILE)
+
+
+def _remove_old_versions(artifact_dir: Path, keep: Path):
+    """切り替え前の版・古い一時ディレクトリ・旧形式（直下の列ファイル）を削除
+
+    読み込み済みのプロセスはメモリマップを保持しているため、削除後も読み続けられる
+    （Windows で使用中のファイルは削除できないため、失敗は無視して次回に削除）。
+    """
+    now = time.time()
+    for path in artifact_dir.iterdir():
+        if path == keep or path.name in (CURRENT_FILE, LOCK_FILE):
+            continue
+        if path.is_dir():
+            if '.tmp-' in path.name and now - path.stat().st_mtime < STALE_TMP_SECONDS:
+                continue  # 他のプロセスが作成中
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.suffix in ('.npy', '.json'):
+            path.unlink(missing_ok=True)
+
+
+@contextmanager
+def _build_lock(artifact_dir: Path):
+    """アーティファクトの確認・作成を1プロセスずつ行うファイルロック"""
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(artifact_dir / LOCK_FILE, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def build_token_artifact(csv_path=DEFAULT_CORPUS_PATH, artifact_dir=DEFAULT_ARTIFACT_DIR,
+                         tokenizer=None, preprocess_pattern: Optional[str] = None) -> Path:
+    """コーパスCSVを形態素解析してアーティファクトを作成
+
+    artifact_dir の下の一時ディレクトリに書き出し、版ディレクトリへ rename してから
+    CURRENT を切り替える（読み込み中のプロセスが作成途中・削除途中の状態を見ることはない）。
+    同じ版を他のプロセスが先に作成していた場合はそちらを使う。
+
+    Args:
+        csv_path: コーパスCSV（text, category, class, page_id 列）
+        artifact_dir: 出力ディレクトリ
+        tokenizer: 使用するエンジン（省略時は設定ファイルのエンジン、並列処理時は各ワーカーで作成）
+        preprocess_pattern: 形態素解析の前にテキストから取り除く文字の正規表現
+
+    Returns:
+        作成した版のディレクトリ
+    """
+    csv_path = Path(csv_path)
+    artifact_dir = Path(artifact_dir)
+    logger.info(f"トークンアーティファクト作成開始: {csv_path}")
+
+    if tokenizer is None:
+        tokenizer = create_tokenizer()
+
+    source_sha256 = file_sha256(csv_path)
+    df = pd.read_csv(csv_path)
+
+    surfaces, base_forms, pos_tags, categories = _Interner(), _Interner(), _Interner(), _Interner()
+    columns = {name: [] for name in {**TOKEN_COLUMNS, **INDEX_COLUMNS, **DOCUMENT_COLUMNS}}
+    columns['sentence_bytes'] = bytearray()
+    columns['sentence_offsets'].append(0)
+    columns['sentence_byte_offsets'].append(0)
+    columns['doc_offsets'].append(0)
+    columns['doc_sentence_offsets'].append(0)
+
+    n_rows = len(df)
+    texts = df['text']
+    row_categories = df['category'] if 'category' in df.columns else pd.Series([''] * n_rows)
+    row_classes = df['class'] if 'class' in df.columns else pd.Series([np.nan] * n_rows)
+    row_page_ids = df['page_id'] if 'page_id' in df.columns else pd.Series([-1] * n_rows)
+
+    # 行照合用のハッシュは元のテキスト、形態素解析・文テキストは前処理後のテキスト
+    cleaned_texts = [text if pd.isna(text) else preprocess_text(text, preprocess_pattern) for text in texts]
+    documents = tokenize_corpus(cleaned_texts, tokenizer=tokenizer)
+
+    for doc_index, (text, cleaned_text, sentences, category, class_value, page_id) in enumerate(
+            zip(texts, cleaned_texts, documents, row_categories, row_classes, row_page_ids)):
+        sentence_texts = [] if pd.isna(text) else split_sentences(cleaned_text)
+        for sentence, tokens in zip(sentence_texts, sentences):
+            for token in tokens:
+                columns['surface_ids'].append(surfaces(token.surface))
+                columns['base_ids'].append(base_forms(token.base_form))
+                columns['pos_ids'].append(pos_tags(token.pos))
+            columns['sentence_offsets'].append(len(columns['surface_ids']))
+            columns['sentence_docs'].append(doc_index)
+            columns['sentence_bytes'] += sentence.encode('utf-8')
+            columns['sentence_byte_offsets'].append(len(columns['sentence_bytes']))
+        columns['doc_offsets'].append(len(columns['surface_ids']))
+        columns['doc_sentence_offsets'].append(len(columns['sentence_docs']))
+
+        columns['category_ids'].append(categories(str(category)))
+        columns['class'].append(np.nan if pd.isna(class_value) else float(class_value))
+        columns['page_id'].append(-1 if pd.isna(page_id) else int(page_id))
+        columns['text_hashes'].append(text_hash(text))
+
+    # 一時ディレクトリに書き出してから版ディレクトリへ rename（読み込み中の不完全状態を防ぐ）
+    version_dir = artifact_dir / version_name(source_sha256, tokenizer.name)
+    tmp_dir = artifact_dir / f"{version_dir.name}.tmp-{os.getpid()}"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    dtypes = {**TOKEN_COLUMNS, **INDEX_COLUMNS, **TEXT_COLUMNS, **DOCUMENT_COLUMNS}
+    for name, values in columns.items():
+        np.save(tmp_dir / f'{name}.npy', np.asarray(values, dtype=dtypes[name]))
+
+    with open(tmp_dir / 'vocab.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'surface': surfaces.values,
+            'base_form': base_forms.values,
+            'pos': pos_tags.values
+        }, f, ensure_ascii=False)
+
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'source_path': str(csv_path),
+        'source_sha256': source_sha256,
+        'backend': tokenizer.name,
+        'preprocess_pattern': preprocess_pattern,
+        'created_at': pd.Timestamp.now().isoformat(),
+        'categories': categories.values,
+        'counts': {
+            'documents': len(columns['category_ids']),
+            'sentences': len(columns['sentence_docs']),
+            'tokens': len(columns['surface_ids']),
+            'vocabulary': len(surfaces.values)
+        }
+    }
+    with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    try:
+        os.rename(tmp_dir, version_dir)
+    except OSError:
+        if not (version_dir / 'meta.json').exists():
+            raise
+        # 同じ版を他のプロセスが先に作成した（内容は同じなのでそちらを使う）
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    _switch_current(artifact_dir, version_dir)
+    _remove_old_versions(artifact_dir, keep=version_dir)
+
+    logger.info(f"トークンアーティファクト作成完了: {version_dir} {meta['counts']}")
+    return version_dir
+
+
+def load_token_artifact(csv_path=DEFAULT_CORPUS_PATH, artifact_dir=None,
+                        rebuild: bool = True, tokenizer=None,
+                        preprocess_pattern: Optional[str] = None) -> TokenArtifact:
+    """アーティファクトを読み込み（元CSV・形態素解析エンジン・前処理が変化していれば再作成）
+
+    Args:
+        csv_path: コーパスCSV
+        artifact_dir: アーティファクトディレクトリ（省略時は CSV と同じディレクトリの token_artifact、
+            前処理ありは token_artifact-pre-<パターンのハッシュ>）
+        rebuild: ハッシュ不一致・未作成時に再作成するか
+        tokenizer: 使用するエンジン（省略時は設定ファイルのエンジン）
+        preprocess_pattern: 形態素解析の前にテキストから取り除く文字の正規表現
+            （TokenFilter.preprocess_pattern）
+
+    Returns:
+        TokenArtifact
+    """
+    csv_path = Path(csv_path)
+    artifact_dir = Path(artifact_dir) if artifact_dir else default_artifact_dir(csv_path, preprocess_pattern)
+    source_sha256 = file_sha256(csv_path)
+
+    for attempt in range(2):
+        version_dir, tokenizer = _up_to_date_version(artifact_dir, source_sha256, preprocess_pattern, tokenizer)
+        if version_dir is None:
+            if not rebuild:
+                raise FileNotFoundError(f"最新のトークンアーティファクトがありません: {artifact_dir}")
+            with _build_lock(artifact_dir):
+                # ロック待ちの間に他のプロセスが作成していればそれを使う
+                version_dir, tokenizer = _up_to_date_version(artifact_dir, source_sha256,
+                                                             preprocess_pattern, tokenizer)
+                if version_dir is None:
+                    logger.info("コーパスまたは形態素解析エンジンの変更を検知したためトークンアーティファクトを再作成します")
+                    version_dir = build_token_artifact(csv_path, artifact_dir, tokenizer, preprocess_pattern)
+        try:
+            return TokenArtifact(version_dir)
+        except FileNotFoundError:
+            # 読み込み中に他のプロセスが新しい版へ切り替えて古い版を削除した場合は読み直す
+            if attempt:
+                raise
+
+
+def _up_to_date_version(artifact_dir: Path, source_sha256: str, preprocess_pattern: Optional[str],
+                        tokenizer):
+    """CURRENT の版が元CSV・形態素解析エンジン・前処理と一致していればその版のディレクトリ
+
+    Returns:
+        (版のディレクトリ（一致しなければ None）, 使用するエンジン（比較のために作成した場合はそれ）)
+    """
+    version_dir = current_version_dir(artifact_dir)
+    if version_dir is None:
+        return None, tokenizer
+    try:
+        with open(version_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None, tokenizer
+
+    up_to_date = (meta.get('version') == ARTIFACT_VERSION and
+                  meta.get('source_sha256') == source_sha256 and
+                  meta.get('preprocess_pattern') == preprocess_pattern)
+    expected_backend = tokenizer.name if tokenizer is not None else configured_backend()
+    if up_to_date and meta.get('backend') != expected_backend and tokenizer is None:
+        # 設定のエンジンが未インストールでフォールバックした場合は実際のエンジン名で比較
+        tokenizer = create_tokenizer()
+        expected_backend = tokenizer.name
+    up_to_date = up_to_date and meta.get('backend') == expected_backend
+    return (version_dir if up_to_date else None), tokenizer
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS_PATH
+    artifact = load_token_artifact(corpus_path)
+    print(f"トークンアーティファクト: {artifact.artifact_dir}")
+    print(f"  文書数: {artifact.n_documents}")
+    print(f"  文数: {artifact.n_sentences}")
+    print(f"  トークン数: {artifact.n_tokens}")
+    print(f"  語彙数: {len(artifact.surfaces)}")
+    print(f"  形態素解析エンジン: {artifact.backend}")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+トークンフィルタ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 設定ファイル（token_filters）のプロファイルから一度だけフィルタを作成
+2. 品詞・基本形/表層形・記号除去・最小語長・ストップワード・表記ゆれ統一を1パスで適用
+   （形態素解析前のテキストの記号除去は preprocess_pattern、load_token_artifact に渡して適用）
+3. リクエストごとの除外単語はコピーせず差分として適用
+4. ワードクラウド用の単語頻度集計（WordCloud.generate_from_frequencies にそのまま渡す）
+
+使用例:
+    from scripts.utils.token_filter import TokenFilter
+    token_filter = TokenFilter.from_config('wordcloud_app')
+    words = token_filter.filter(tokens, excluded_words={'実験'})
+"""
+
+import re
+import logging
+import weakref
+from collections import Counter
+from typing import AbstractSet, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from scripts.utils.project_config import DEFAULT_CONFIG_PATH, load_config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenFilter:
+    """コンパイル済みトークンフィルタ"""
+
+    def __init__(self, stop_words: Iterable[str] = (), normalization: Optional[Dict[str, str]] = None,
+                 pos: Optional[Iterable[str]] = None, use_base_form: bool = False,
+                 min_length: int = 1, strip_pattern: Optional[str] = None,
+                 word_pattern: Optional[str] = None, preprocess_pattern: Optional[str] = None):
+        """初期化
+
+        Args:
+            stop_words: ストップワード
+            normalization: 表記ゆれ統一ルール（変換前 → 変換後）
+            pos: 対象品詞（大分類、None の場合は全品詞）
+            use_base_form: 基本形を使うか（辞書にない語は表層形）
+            min_length: 最小語長
+            strip_pattern: 語から取り除く文字の正規表現
+            word_pattern: 語を分割する正規表現（一致部分を単語とする）
+            preprocess_pattern: 形態素解析の前にテキストから取り除く文字の正規表現
+                （分割は前後の文字に依存するため、語単位の strip_pattern とは結果が異なる）
+        """
+        self.stop_words = frozenset(stop_words)
+        self.normalization = dict(normalization or {})
+        self.pos = frozenset(pos) if pos else None
+        self.use_base_form = use_base_form
+        self.min_length = min_length
+        self._strip = re.compile(strip_pattern) if strip_pattern else None
+        self._split = re.compile(word_pattern) if word_pattern else None
+        self.preprocess_pattern = preprocess_pattern
+        # 語彙ごとのストップワードマスク（語彙サイズが変わったら作り直す）
+        self._stop_masks = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_config(cls, profile: str, config_path=DEFAULT_CONFIG_PATH) -> 'TokenFilter':
+        """設定ファイルの token_filters.<profile> から作成"""
+        settings = load_config(config_path).get('token_filters', {}).get(profile) or {}
+        if not settings:
+            logger.warning(f"トークンフィルタ設定がありません: {profile}（フィルタなし）")
+        return cls(
+            stop_words=settings.get('stop_words') or (),
+            normalization=settings.get('normalization'),
+            pos=settings.get('pos'),
+            use_base_form=settings.get('use_base_form', False),
+            min_length=settings.get('min_length', 1),
+            strip_pattern=settings.get('strip_pattern'),
+            word_pattern=settings.get('word_pattern'),
+            preprocess_pattern=settings.get('preprocess_pattern'),
+        )
+
+    def candidates(self, token) -> List[str]:
+        """ストップワード判定前の語（品詞・語形・記号除去・語長・表記ゆれ統一を適用）"""
+        if self.pos is not None and token.pos not in self.pos:
+            return []
+        word = token.surface
+        if self.use_base_form and token.base_form != '*':
+            word = token.base_form
+        if self._strip is not None:
+            word = self._strip.sub('', word)
+        if len(word) < self.min_length:
+            return []
+        word = self.normalization.get(word, word)
+        if self._split is not None:
+            return self._split.findall(word)
+        return [word]
+
+    def is_stop_word(self, word: str, excluded_words: Optional[AbstractSet[str]] = None) -> bool:
+        """ストップワード・除外単語か"""
+        return word in self.stop_words or (excluded_words is not None and word in excluded_words)
+
+    def filter(self, tokens, excluded_words: Optional[AbstractSet[str]] = None) -> List[str]:
+        """トークン列から単語リストを作成
+
+        Args:
+            tokens: 共通トークン表現（surface, base_form, pos）の列
+            excluded_words: リクエストごとの追加除外単語（ストップワードに加えて除外）
+        """
+        return [
+            word
+            for token in tokens
+            for word in self.candidates(token)
+            if not self.is_stop_word(word, excluded_words)
+        ]
+
+    def count(self, token_sequences, excluded_words: Optional[AbstractSet[str]] = None,
+              include_numbers: bool = False) -> Counter:
+        """トークン列の集合から単語頻度を集計
+
+        Args:
+            token_sequences: トークン列の列（文書・文ごと）
+            excluded_words: リクエストごとの追加除外単語
+            include_numbers: 数字のみの語も数えるか（WordCloud の include_numbers と同じ）
+        """
+        counts = Counter()
+        for tokens in token_sequences:
+            counts.update(self.filter(tokens, excluded_words))
+        if not include_numbers:
+            for word in [word for word in counts if word.isdigit()]:
+                del counts[word]
+        return counts
+
+    def stop_mask(self, vocabulary, excluded_words: Optional[Iterable[str]] = None) -> np.ndarray:
+        """語彙に対するストップワード・除外単語マスク
+
+        ストップワード部分は語彙ごとにキャッシュし、除外単語は差分として重ねる。
+
+        Args:
+            vocabulary: scripts.utils.vocabulary.Vocabulary
+            excluded_words: リクエストごとの追加除外単語
+        """
+        cached = self._stop_masks.get(vocabulary)
+        if cached is None or len(cached) != len(vocabulary):
+            cached = vocabulary.mask(self.stop_words)
+            self._stop_masks[vocabulary] = cached
+        if not excluded_words:
+            return cached
+        return cached | vocabulary.mask(excluded_words)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+トークンストア
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. コーパス全文書の形態素解析結果（表層形・基本形・品詞）を一度だけ作成・保持
+2. 文単位・カテゴリ単位でのトークン取得
+
+使用例:
+    from scripts.utils.token_store import TokenStore
+    from scripts.utils.token_artifact import load_token_artifact
+    store = TokenStore.from_artifact(load_token_artifact())
+    sentences = store.sentences(categories=['感想文'])
+"""
+
+import logging
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+import pandas as pd
+from scripts.utils.japanese_tokenizer import (Token, create_tokenizer, split_sentences,
+                                              tokenize_corpus, tokenize_text)
+
+logger = logging.getLogger(__name__)
+
+
+class Sentence(NamedTuple):
+    """形態素解析済みの文"""
+    doc_index: int       # 文書番号（コーパスの行番号）
+    category: str        # 文書カテゴリ
+    text: str            # 文テキスト
+    tokens: List[Token]  # トークン列
+
+
+class TokenStore:
+    """形態素解析済みコーパスを保持するストア"""
+
+    def __init__(self, tokenizer=None):
+        """初期化
+
+        Args:
+            tokenizer: 共有する形態素解析エンジン（省略時は最初の形態素解析で設定ファイルのエンジンを作成）
+        """
+        self._tokenizer = tokenizer
+        self._sentences: List[Sentence] = []
+        self.document_count = 0
+
+    @property
+    def tokenizer(self):
+        """形態素解析エンジン（アーティファクトから読み込んだストアでは文書追加まで作成しない）"""
+        if self._tokenizer is None:
+            self._tokenizer = create_tokenizer()
+        return self._tokenizer
+
+    @classmethod
+    def from_csv(cls, csv_path, tokenizer=None) -> 'TokenStore':
+        """コーパスCSV（text, category 列）からストアを作成"""
+        df = pd.read_csv(csv_path)
+        return cls.from_dataframe(df, tokenizer)
+
+    @classmethod
+    def from_artifact(cls, artifact, tokenizer=None) -> 'TokenStore':
+        """トークンアーティファクトからストアを作成（形態素解析なし）"""
+        store = cls(tokenizer)
+        for doc_index in range(artifact.n_documents):
+            category = artifact.document_category(doc_index)
+            for sentence_index in artifact.document_sentences(doc_index):
+                store._sentences.append(Sentence(
+                    doc_index, category,
+                    artifact.sentence_text(sentence_index),
+                    artifact.sentence_tokens(sentence_index)
+                ))
+        store.document_count = artifact.n_documents
+        logger.info(f"トークンストア読み込み: {store.document_count}文書, {len(store._sentences)}文")
+        return store
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, tokenizer=None) -> 'TokenStore':
+        """DataFrame（text, category 列）からストアを作成（並列形態素解析）"""
+        store = cls(tokenizer)
+        documents = tokenize_corpus(df, tokenizer=store.tokenizer)
+        for text, category, sentences in zip(df['text'], df['category'], documents):
+            doc_index = store.document_count
+            store.document_count += 1
+            if pd.isna(text):
+                continue
+            for sentence, tokens in zip(split_sentences(str(text)), sentences):
+                store._sentences.append(Sentence(doc_index, category, sentence, tokens))
+        logger.info(f"トークンストア作成: {store.document_count}文書, {len(store._sentences)}文")
+        return store
+
+    def add_document(self, text, category: str = '') -> int:
+        """文書を形態素解析して追加
+
+        Returns:
+            追加した文書の文書番号
+        """
+        doc_index = self.document_count
+        self.document_count += 1
+
+        if pd.isna(text):
+            return doc_index
+
+        for sentence in split_sentences(str(text)):
+            tokens = tokenize_text(self.tokenizer, sentence)
+            self._sentences.append(Sentence(doc_index, category, sentence, tokens))
+        return doc_index
+
+    def sentences(self, categories: Optional[Iterable[str]] = None) -> List[Sentence]:
+        """文のリストを取得
+
+        Args:
+            categories: 対象カテゴリ（None の場合は全文書）
+        """
+        if categories is None:
+            return list(self._sentences)
+        categories = set(categories)
+        return [s for s in self._sentences if s.category in categories]
+
+    def tokens(self, categories: Optional[Iterable[str]] = None) -> Iterator[Token]:
+        """トークンを文書順に列挙"""
+        for sentence in self.sentences(categories):
+            yield from sentence.tokens
+
+    def __len__(self) -> int:
+        return len(self._sentences)
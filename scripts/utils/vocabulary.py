@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+語彙・単語ID配列ユーティリティ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 単語⇔ID の対応表（インターン済み語彙）
+2. 文集合を単語ID配列（int32）と文オフセットで保持
+3. 除外単語マスクの適用・頻度集計・文書-単語行列の作成
+4. 単語ID → (文番号, 文内位置) の転置インデックス
+
+使用例:
+    from scripts.utils.vocabulary import EncodedCorpus, Vocabulary
+    corpus = EncodedCorpus.from_word_lists([("塩がしょっぱい", ["塩", "しょっぱい"])])
+    frequencies = corpus.filtered(corpus.vocabulary.mask(["しょっぱい"])).frequencies()
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class Vocabulary:
+    """単語⇔ID の対応表"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.words: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> int:
+        """単語を登録してIDを返す（登録済みなら既存のID）"""
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self._ids[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def get(self, word: str) -> Optional[int]:
+        """単語のIDを取得（未登録なら None）"""
+        return self._ids.get(word)
+
+    def encode(self, words: Iterable[str]) -> np.ndarray:
+        """単語列をID配列に変換（未登録の単語は登録）"""
+        return np.fromiter((self.add(word) for word in words), dtype=np.int32)
+
+    def decode(self, word_ids: Iterable[int]) -> List[str]:
+        """ID配列を単語列に変換"""
+        return [self.words[word_id] for word_id in word_ids]
+
+    def mask(self, words: Iterable[str]) -> np.ndarray:
+        """指定した単語の位置が True の真偽値配列（語彙サイズ）"""
+        mask = np.zeros(len(self.words), dtype=bool)
+        ids = [self._ids[word] for word in words if word in self._ids]
+        mask[ids] = True
+        return mask
+
+    def __contains__(self, word) -> bool:
+        return word in self._ids
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+class EncodedCorpus:
+    """単語ID配列で表した文集合
+
+    全文の単語IDを1本の int32 配列に連結し、文の境界を offsets で保持する
+    （文 i の単語ID = word_ids[offsets[i]:offsets[i + 1]]）。
+    """
+
+    def __init__(self, vocabulary: Vocabulary, texts: List[str],
+                 word_ids: np.ndarray, offsets: np.ndarray):
+        self.vocabulary = vocabulary
+        self.texts = texts
+        self.word_ids = word_ids
+        self.offsets = offsets
+        self._index: Optional['InvertedIndex'] = None
+
+    @classmethod
+    def from_word_lists(cls, sentences: Iterable[Tuple[str, List[str]]],
+                        vocabulary: Optional[Vocabulary] = None) -> 'EncodedCorpus':
+        """(文, 単語リスト) の列から作成
+
+        Args:
+            sentences: (文テキスト, 単語リスト) の列
+            vocabulary: 共有する語彙（省略時は新規作成）
+        """
+        vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        texts, arrays, offsets = [], [], [0]
+        for text, words in sentences:
+            ids = vocabulary.encode(words)
+            texts.append(text)
+            arrays.append(ids)
+            offsets.append(offsets[-1] + len(ids))
+        word_ids = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int32)
+        return cls(vocabulary, texts, word_ids.astype(np.int32, copy=False),
+                   np.asarray(offsets, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def sentence_ids(self, index: int) -> np.ndarray:
+        """文の単語ID配列（ビュー）"""
+        return self.word_ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def sentence_words(self, index: int) -> List[str]:
+        """文の単語リスト"""
+        return self.vocabulary.decode(self.sentence_ids(index))
+
+    def sentence_of(self, positions: np.ndarray) -> np.ndarray:
+        """連結配列上の位置から文番号を求める"""
+        return np.searchsorted(self.offsets, positions, side='right') - 1
+
+    @property
+    def index(self) -> 'InvertedIndex':
+        """転置インデックス（初回参照時に作成してキャッシュ）"""
+        if self._index is None:
+            self._index = InvertedIndex(self)
+        return self._index
+
+    def filtered(self, blocked: np.ndarray) -> 'EncodedCorpus':
+        """除外マスクに該当する単語を取り除いた文集合を返す
+
+        Args:
+            blocked: 語彙サイズの真偽値配列（True の単語を除外）
+        """
+        keep = ~blocked[self.word_ids]
+        kept_before = np.concatenate(([0], np.cumsum(keep)))
+        return EncodedCorpus(self.vocabulary, self.texts,
+                             self.word_ids[keep], kept_before[self.offsets])
+
+    def counts(self) -> np.ndarray:
+        """単語IDごとの出現回数（語彙サイズ）"""
+        return np.bincount(self.word_ids, minlength=len(self.vocabulary))
+
+    def frequencies(self) -> Dict[str, int]:
+        """単語頻度辞書（初出順）"""
+        if len(self.word_ids) == 0:
+            return {}
+        unique_ids, first_positions = np.unique(self.word_ids, return_index=True)
+        ordered_ids = unique_ids[np.argsort(first_positions, kind='stable')]
+        counts = self.counts()
+        return {self.vocabulary.words[word_id]: int(counts[word_id]) for word_id in ordered_ids}
+
+    def document_term_matrix(self) -> csr_matrix:
+        """文×単語の出現回数行列（疎行列）"""
+        rows = np.repeat(np.arange(len(self.texts)), np.diff(self.offsets))
+        data = np.ones(len(self.word_ids), dtype=np.int64)
+        matrix = csr_matrix((data, (rows, self.word_ids)),
+                            shape=(len(self.texts), len(self.vocabulary)))
+        matrix.sum_duplicates()
+        return matrix
+
+
+class InvertedIndex:
+    """単語ID → (文番号, 文内位置) の転置インデックス
+
+    全トークンを単語ID順（同じ単語内は出現順）に並べ替えた配列と、
+    単語IDごとの区切り位置で保持する。
+    """
+
+    def __init__(self, corpus: EncodedCorpus):
+        order = np.argsort(corpus.word_ids, kind='stable')
+        sentence_of_token = corpus.sentence_of(np.arange(len(corpus.word_ids)))
+        self.sentences = sentence_of_token[order].astype(np.int32)
+        self.positions = (order - corpus.offsets[sentence_of_token[order]]).astype(np.int32)
+        counts = np.bincount(corpus.word_ids, minlength=len(corpus.vocabulary))
+        self.posting_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def postings(self, word_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """単語の全出現位置（文番号の配列, 文内位置の配列）"""
+        if word_id is None or word_id >= len(self.posting_offsets) - 1:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty
+        start, end = self.posting_offsets[word_id], self.posting_offsets[word_id + 1]
+        return self.sentences[start:end], self.positions[start:end]
+
+    def frequency(self, word_id: int) -> int:
+        """単語の出現回数"""
+        return len(self.postings(word_id)[0])
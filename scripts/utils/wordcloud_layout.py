@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+ワードクラウド配置エンジン（NumPy 版）
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. 粗いセル格子の占有マップと累積和テーブル（summed-area table）による衝突判定
+2. 全候補位置の一括判定（1回の配列演算で空き位置をすべて列挙）
+3. random_state 固定時は同じ頻度から常に同じ配置（決定的モード）
+4. 配置の時間予算（超えたら打ち切り。配置済みの単語は予算なしの配置の先頭部分と一致）
+5. 差分再配置（前回の配置に残る単語は固定し、空いた場所に次の順位の単語を配置）
+6. 配置結果は wordcloud.WordCloud と同じ layout_ 形式（to_image・recolor 等はそのまま使用可能）
+7. フォント・文字列外接矩形をフォントレジストリのキャッシュから取得する WordCloud（CachedFontWordCloud）
+
+wordcloud の配置処理は1ピクセル単位の累積和テーブルを単語ごとに作り直すため、
+1000×600 のキャンバスでは配置探索と再計算が処理時間の大半を占める。
+ここでは cell_size ピクセル四方のセル単位で占有を管理し、探索・更新の対象を
+1/cell_size² に減らす（占有はセル単位で安全側に判定するため単語は重ならない）。
+
+使用例:
+    from scripts.utils.wordcloud_layout import GridWordCloud
+    wordcloud = GridWordCloud(width=1000, height=600, random_state=42).generate_from_frequencies(freq)
+    image = wordcloud.to_image()
+"""
+
+import time
+from operator import itemgetter
+from random import Random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+from wordcloud import WordCloud
+from wordcloud.wordcloud import IntegralOccupancyMap
+
+from scripts.utils.font_registry import RegistryImageFont
+
+LAYOUT_ENGINES = ('wordcloud', 'numpy')
+DEFAULT_CELL_SIZE = 4
+
+
+class CellOccupancy:
+    """セル単位の占有マップと累積和テーブル"""
+
+    def __init__(self, height: int, width: int, cell_size: int = DEFAULT_CELL_SIZE):
+        """初期化
+
+        Args:
+            height: キャンバスの高さ（ピクセル）
+            width: キャンバスの幅（ピクセル）
+            cell_size: セルの一辺（ピクセル）
+        """
+        self.cell_size = cell_size
+        self.rows = height // cell_size
+        self.cols = width // cell_size
+        self.occupied = np.zeros((self.rows, self.cols), dtype=bool)
+        # セルを占有する単語の番号（-1 は空き。差分再配置で単語ごとに空けるために使う）
+        self.labels = np.full((self.rows, self.cols), -1, dtype=np.int16)
+        # 先頭に0の行・列を付けた累積和（窓の合計を4点の差で求める）
+        self.integral = np.zeros((self.rows + 1, self.cols + 1), dtype=np.int32)
+
+    def free_positions(self, box_height: int, box_width: int) -> Tuple[np.ndarray, int]:
+        """指定サイズ（ピクセル）の矩形を置ける全位置
+
+        Returns:
+            (左上セルの平坦インデックス配列, 候補格子の列数)
+        """
+        cell = self.cell_size
+        h = -(-box_height // cell)
+        w = -(-box_width // cell)
+        if h > self.rows or w > self.cols:
+            return np.zeros(0, dtype=np.intp), 0
+        s = self.integral
+        window = s[h:, w:] - s[:-h, w:] - s[h:, :-w] + s[:-h, :-w]
+        return np.flatnonzero(window == 0), window.shape[1]
+
+    def sample_position(self, box_height: int, box_width: int,
+                        random_state: Random) -> Optional[Tuple[int, int]]:
+        """空き位置を1つ選ぶ（ピクセル座標、置けない場合は None）"""
+        positions, n_cols = self.free_positions(box_height, box_width)
+        if len(positions) == 0:
+            return None
+        index = positions[random_state.randint(0, len(positions) - 1)]
+        row, col = divmod(int(index), n_cols)
+        return row * self.cell_size, col * self.cell_size
+
+    def mark(self, pixels: np.ndarray, top: int, left: int, label: int = -1):
+        """描画済みピクセル（top, left を左上とする部分配列）を占有セルに反映
+
+        label を指定すると、新たに占有したセルをその単語番号のセルとして記録する。
+        """
+        cell = self.cell_size
+        r0, c0 = top // cell, left // cell
+        r1 = min(-(-(top + pixels.shape[0]) // cell), self.rows)
+        c1 = min(-(-(left + pixels.shape[1]) // cell), self.cols)
+        if r1 <= r0 or c1 <= c0:
+            return
+        # セル境界に揃えた領域に貼り付けてからセルごとの最大値を取る
+        block = np.zeros(((r1 - r0) * cell, (c1 - c0) * cell), dtype=bool)
+        dy, dx = top - r0 * cell, left - c0 * cell
+        visible = pixels[:block.shape[0] - dy, :block.shape[1] - dx] > 0
+        block[dy:dy + visible.shape[0], dx:dx + visible.shape[1]] = visible
+        cells = block.reshape(r1 - r0, cell, c1 - c0, cell).any(axis=(1, 3))
+        labels = self.labels[r0:r1, c0:c1]
+        labels[cells & ~self.occupied[r0:r1, c0:c1]] = label
+        self.occupied[r0:r1, c0:c1] |= cells
+        self._update_integral(r0)
+
+    def restore(self, labels: np.ndarray):
+        """セルの単語番号（-1 は空き）から占有マップを復元"""
+        self.labels = labels.astype(np.int16)
+        self.occupied = self.labels >= 0
+        self._update_integral(0)
+
+    def _update_integral(self, r0: int):
+        """r0 行以降の累積和を再計算"""
+        self.integral[r0 + 1:, 1:] = np.cumsum(
+            np.cumsum(self.occupied[r0:], axis=1, dtype=np.int32), axis=0, dtype=np.int32
+        ) + self.integral[r0, 1:]
+
+
+class CachedFontWordCloud(WordCloud):
+    """フォント・文字列外接矩形をフォントレジストリのキャッシュから取得する WordCloud
+
+    wordcloud.WordCloud の配置（generate_from_frequencies）と描画（to_image）には
+    フォント読み込みを差し替える仕組みがないため、同じ処理（wordcloud 1.9 系）を
+    フォントの取得だけ load_font に置き換えてここで実装する。wordcloud モジュールは変更せず、
+    乱数列・配置結果・画像はライブラリと一致する。to_svg 等はライブラリの処理のまま。
+    """
+
+    image_font = RegistryImageFont()
+
+    def load_font(self, font_size: int, orientation=None):
+        """font_path・サイズ・向きのフォント（レジストリのキャッシュ、外接矩形もキャッシュ）"""
+        image_font = self.image_font
+        return image_font.TransposedFont(image_font.truetype(self.font_path, font_size),
+                                         orientation=orientation)
+
+    def generate_from_frequencies(self, frequencies, max_font_size=None):
+        """頻度辞書から配置を作成（wordcloud.WordCloud と同じ引数・戻り値・配置）"""
+        # 頻度順に並べて最大頻度を 1 に正規化
+        frequencies = sorted(frequencies.items(), key=itemgetter(1), reverse=True)
+        if len(frequencies) <= 0:
+            raise ValueError("We need at least 1 word to plot a word cloud, "
+                             "got %d." % len(frequencies))
+        frequencies = frequencies[:self.max_words]
+        max_frequency = float(frequencies[0][1])
+        frequencies = [(word, freq / max_frequency) for word, freq in frequencies]
+
+        random_state = self.random_state if self.random_state is not None else Random()
+
+        if self.mask is not None:
+            boolean_mask = self._get_bolean_mask(self.mask)
+            height, width = self.mask.shape[:2]
+        else:
+            boolean_mask = None
+            height, width = self.height, self.width
+        occupancy = IntegralOccupancyMap(height, width, boolean_mask)
+
+        img_grey = Image.new("L", (width, height))
+        draw = ImageDraw.Draw(img_grey)
+        font_sizes, positions, orientations, colors = [], [], [], []
+        last_freq = 1.
+
+        if max_font_size is None:
+            max_font_size = self.max_font_size
+        if max_font_size is None:
+            # 上位2語を試し配置して最大フォントサイズを決める
+            if len(frequencies) == 1:
+                font_size = self.height
+            else:
+                self.generate_from_frequencies(dict(frequencies[:2]), max_font_size=self.height)
+                sizes = [x[1] for x in self.layout_]
+                if not sizes:
+                    raise ValueError("Couldn't find space to draw. Either the Canvas size"
+                                     " is too small or too much of the image is masked out.")
+                font_size = (int(2 * sizes[0] * sizes[1] / (sizes[0] + sizes[1]))
+                             if len(sizes) > 1 else sizes[0])
+        else:
+            font_size = max_font_size
+
+        self.words_ = dict(frequencies)
+
+        if self.repeat and len(frequencies) < self.max_words:
+            # 単語を繰り返して max_words 語まで埋める（繰り返すごとに頻度を下げる）
+            times_extend = int(np.ceil(self.max_words / len(frequencies))) - 1
+            frequencies_org = list(frequencies)
+            downweight = frequencies[-1][1]
+            for i in range(times_extend):
+                frequencies.extend([(word, freq * downweight ** (i + 1))
+                                    for word, freq in frequencies_org])
+
+        for word, freq in frequencies:
+            if freq == 0:
+                continue
+            rs = self.relative_scaling
+            if rs != 0:
+                font_size = int(round((rs * (freq / float(last_freq)) + (1 - rs)) * font_size))
+            orientation = None if random_state.random() < self.prefer_horizontal else Image.ROTATE_90
+            tried_other_orientation = False
+            while True:
+                if font_size < self.min_font_size:
+                    break
+                transposed_font = self.load_font(font_size, orientation)
+                box_size = draw.textbbox((0, 0), word, font=transposed_font, anchor="lt")
+                result = occupancy.sample_position(box_size[3] + self.margin,
+                                                   box_size[2] + self.margin,
+                                                   random_state)
+                if result is not None:
+                    break
+                # 置けなければ向きを変えて再試行し、それでも駄目なら小さくする
+                if not tried_other_orientation and self.prefer_horizontal < 1:
+                    orientation = Image.ROTATE_90
+                    tried_other_orientation = True
+                else:
+                    font_size -= self.font_step
+                    orientation = None
+
+            if font_size < self.min_font_size:
+                break
+
+            x, y = np.array(result) + self.margin // 2
+            draw.text((y, x), word, fill="white", font=transposed_font)
+            positions.append((x, y))
+            orientations.append(orientation)
+            font_sizes.append(font_size)
+            colors.append(self.color_func(word, font_size=font_size, position=(x, y),
+                                          orientation=orientation, random_state=random_state,
+                                          font_path=self.font_path))
+            img_array = np.asarray(img_grey)
+            if boolean_mask is not None:
+                img_array = img_array + boolean_mask
+            occupancy.update(img_array, x, y)
+            last_freq = freq
+
+        self.layout_ = list(zip(frequencies, font_sizes, positions, orientations, colors))
+        return self
+
+    def to_image(self):
+        """配置を画像化（wordcloud.WordCloud.to_image と同じ画像）"""
+        self._check_generated()
+        if self.mask is not None:
+            height, width = self.mask.shape[:2]
+        else:
+            height, width = self.height, self.width
+
+        img = Image.new(self.mode, (int(width * self.scale), int(height * self.scale)),
+                        self.background_color)
+        draw = ImageDraw.Draw(img)
+        for (word, count), font_size, position, orientation, color in self.layout_:
+            transposed_font = self.load_font(int(font_size * self.scale), orientation)
+            pos = (int(position[1] * self.scale), int(position[0] * self.scale))
+            draw.text(pos, word, fill=color, font=transposed_font)
+        return self._draw_contour(img=img)
+
+
+class GridWordCloud(CachedFontWordCloud):
+    """セル格子の累積和テーブルで配置する WordCloud
+
+    配置以外（色付け・画像化・再着色）は wordcloud.WordCloud と共通。
+    マスク指定・repeat には対応しないため、その場合は wordcloud の配置処理を使う。
+
+    time_budget（秒）を指定すると、超えた時点で残りの単語を配置せずに終了する。
+    単語は頻度順に同じ乱数列で配置するため、打ち切った配置は予算なしの配置の先頭部分と一致する。
+    """
+
+    def __init__(self, *args, cell_size: int = DEFAULT_CELL_SIZE,
+                 time_budget: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cell_size = cell_size
+        self.time_budget = time_budget
+
+    def generate_from_frequencies(self, frequencies, max_font_size=None):
+        """頻度辞書から配置を作成（wordcloud.WordCloud と同じ引数・戻り値）"""
+        if self.mask is not None or self.repeat:
+            return super().generate_from_frequencies(frequencies, max_font_size)
+        return self._generate(frequencies, max_font_size)
+
+    def generate_incremental(self, frequencies, previous: WordCloud):
+        """前回の配置を保持して頻度辞書から配置を作成
+
+        previous の単語のうち frequencies の上位 max_words に残るものは同じ位置・向き・大きさのまま
+        固定し、除外で空いた場所に残りの単語を頻度順に配置する（置けない単語は飛ばして次を試す）。
+        previous が GridWordCloud の場合はセルの単語番号から占有を復元し、固定する単語を描き直さない。
+
+        Args:
+            frequencies: 単語 → 頻度
+            previous: 配置済みの WordCloud
+        """
+        if self.mask is not None or self.repeat:
+            return super().generate_from_frequencies(frequencies)
+        fixed = {word: (font_size, position, orientation)
+                 for (word, _), font_size, position, orientation, _ in previous.layout_}
+        cells = None
+        if (getattr(previous, 'cell_labels_', None) is not None
+                and previous.cell_size == self.cell_size
+                and (previous.width, previous.height) == (self.width, self.height)):
+            cells = (previous.cell_labels_, [word for (word, _), *_ in previous.layout_])
+        return self._generate(frequencies, fixed=fixed, fixed_cells=cells)
+
+    def _generate(self, frequencies, max_font_size=None,
+                  fixed: Optional[Dict[str, tuple]] = None,
+                  fixed_cells: Optional[Tuple[np.ndarray, List[str]]] = None):
+        """配置処理本体
+
+        Args:
+            frequencies: 単語 → 頻度
+            max_font_size: 最大フォントサイズ（None の場合は上位2語から決める）
+            fixed: 単語 → (フォントサイズ, 位置, 向き)。探索せずその位置に置く
+            fixed_cells: fixed の単語の占有セル（セルの単語番号, 番号順の単語）
+        """
+        fixed = fixed or {}
+        frequencies = sorted(frequencies.items(), key=itemgetter(1), reverse=True)
+        if len(frequencies) <= 0:
+            raise ValueError("We need at least 1 word to plot a word cloud, "
+                             "got %d." % len(frequencies))
+        frequencies = frequencies[:self.max_words]
+
+        # 最大頻度を 1 に正規化
+        max_frequency = float(frequencies[0][1])
+        frequencies = [(word, freq / max_frequency) for word, freq in frequencies]
+
+        random_state = self.random_state if self.random_state is not None else Random()
+
+        if max_font_size is None:
+            max_font_size = self.max_font_size
+        if max_font_size is None and fixed:
+            max_font_size = max(font_size for font_size, _, _ in fixed.values())
+        if max_font_size is None:
+            # 上位2語を試し配置して最大フォントサイズを決める（wordcloud と同じ方法）
+            if len(frequencies) == 1:
+                font_size = self.height
+            else:
+                self.generate_from_frequencies(dict(frequencies[:2]), max_font_size=self.height)
+                sizes = [x[1] for x in self.layout_]
+                if not sizes:
+                    raise ValueError("Couldn't find space to draw. Either the Canvas size"
+                                     " is too small or too much of the image is masked out.")
+                font_size = (int(2 * sizes[0] * sizes[1] / (sizes[0] + sizes[1]))
+                             if len(sizes) > 1 else sizes[0])
+        else:
+            font_size = max_font_size
+
+        self.words_ = dict(frequencies)
+
+        occupancy = CellOccupancy(self.height, self.width, self.cell_size)
+        img_grey = Image.new("L", (self.width, self.height))
+        draw = ImageDraw.Draw(img_grey)
+        placed, font_sizes, positions, orientations, colors = [], [], [], [], []
+        label_words = []  # セルの単語番号 → 単語
+        last_freq = 1.
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+
+        # 固定する単語の占有を先に反映（前回のセルの単語番号があれば描き直さない）
+        fixed = {word: fixed[word] for word, _ in frequencies if word in fixed}
+        if fixed_cells is not None:
+            previous_labels, previous_words = fixed_cells
+            label_map = np.full(len(previous_words) + 1, -1, dtype=np.int16)
+            for index, word in enumerate(previous_words):
+                if word in fixed:
+                    label_map[index] = len(label_words)
+                    label_words.append(word)
+            occupancy.restore(label_map[previous_labels])  # -1 は末尾の -1 に対応
+        else:
+            for word, (size, position, orientation) in fixed.items():
+                font = self.load_font(size, orientation)
+                draw.text((position[1], position[0]), word, fill="white", font=font)
+                left, top, right, bottom = draw.textbbox((position[1], position[0]), word, font=font)
+                pixels = np.asarray(img_grey.crop((left, top, right, bottom)))
+                occupancy.mark(pixels, top, left, label=len(label_words))
+                label_words.append(word)
+
+        for word, freq in frequencies:
+            if freq == 0:
+                continue
+            if word in fixed:
+                font_size, (x, y), orientation = fixed[word]
+                placed.append((word, freq))
+                positions.append((x, y))
+                orientations.append(orientation)
+                font_sizes.append(font_size)
+                colors.append(self.color_func(word, font_size=font_size, position=(x, y),
+                                              orientation=orientation, random_state=random_state,
+                                              font_path=self.font_path))
+                last_freq = freq
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            rs = self.relative_scaling
+            if rs != 0:
+                font_size = int(round((rs * (freq / float(last_freq)) + (1 - rs)) * font_size))
+            start_size = font_size
+            orientation = None if random_state.random() < self.prefer_horizontal else Image.ROTATE_90
+            tried_other_orientation = False
+            while True:
+                if font_size < self.min_font_size:
+                    break
+                transposed_font = self.load_font(font_size, orientation)
+                box_size = draw.textbbox((0, 0), word, font=transposed_font, anchor="lt")
+                result = occupancy.sample_position(box_size[3] + self.margin,
+                                                   box_size[2] + self.margin,
+                                                   random_state)
+                if result is not None:
+                    break
+                # 置けなければ向きを変えて再試行し、それでも駄目なら小さくする
+                if not tried_other_orientation and self.prefer_horizontal < 1:
+                    orientation = Image.ROTATE_90
+                    tried_other_orientation = True
+                else:
+                    font_size -= self.font_step
+                    orientation = None
+
+            if font_size < self.min_font_size:
+                if fixed:
+                    # 差分再配置では置けない単語だけを飛ばし、空いた場所を次の単語で埋める
+                    font_size = start_size
+                    continue
+                break
+
+            x, y = np.array(result) + self.margin // 2
+            draw.text((y, x), word, fill="white", font=transposed_font)
+            placed.append((word, freq))
+            positions.append((x, y))
+            orientations.append(orientation)
+            font_sizes.append(font_size)
+            colors.append(self.color_func(word, font_size=font_size, position=(x, y),
+                                          orientation=orientation, random_state=random_state,
+                                          font_path=self.font_path))
+            # 描画した矩形内のピクセルのみ占有セルに反映
+            bottom = min(int(x) + box_size[3], self.height)
+            right = min(int(y) + box_size[2], self.width)
+            pixels = np.asarray(img_grey.crop((int(y), int(x), right, bottom)))
+            occupancy.mark(pixels, int(x), int(y), label=len(label_words))
+            label_words.append(word)
+            last_freq = freq
+
+        self.layout_ = list(zip(placed, font_sizes, positions, orientations, colors))
+        # セルの単語番号を layout_ の順番に揃えて保持（次の差分再配置で使う）
+        layout_index = {word: index for index, ((word, _), *_) in enumerate(self.layout_)}
+        label_map = np.array([layout_index[word] for word in label_words] + [-1], dtype=np.int16)
+        self.cell_labels_ = label_map[occupancy.labels]
+        return self
+
+
+def create_wordcloud(layout_engine: str = 'wordcloud', time_budget: Optional[float] = None,
+                     **kwargs) -> WordCloud:
+    """配置エンジンを指定して WordCloud を作成
+
+    Args:
+        layout_engine: 'wordcloud'（ライブラリ標準の配置、CachedFontWordCloud）または 'numpy'（GridWordCloud）
+        time_budget: 配置の時間予算（秒、'numpy' のみ。'wordcloud' では常にすべて配置）
+        **kwargs: WordCloud の引数
+    """
+    if layout_engine == 'numpy':
+        return GridWordCloud(time_budget=time_budget, **kwargs)
+    return CachedFontWordCloud(**kwargs)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+ワードクラウド画像エンコーダ
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. WordCloud.to_image() を matplotlib を経由せずに直接エンコード（PNG / WebP / JPEG）
+2. PIL ImageDraw によるタイトル描画
+3. Base64・ファイル保存のヘルパー
+4. 配置データ（単語・文字サイズ・位置・向き・色）の JSON 出力（ブラウザ側で canvas / SVG に描画）
+5. 印刷用のベクター出力（SVG / PDF、配置はそのままに単語をフォントのアウトラインで描画）
+
+使用例:
+    from scripts.utils.wordcloud_renderer import encode_wordcloud
+    png = encode_wordcloud(wordcloud, image_format='png', compress_level=6)
+    webp = encode_wordcloud(wordcloud, image_format='webp', title='差分分析', font_path=font_path)
+    layout = encode_wordcloud(wordcloud, image_format='json', font_key='ipaexg')
+    pdf = encode_wordcloud(wordcloud, image_format='pdf', title='全体ワードクラウド', font_path=font_path)
+"""
+
+import io
+import json
+import base64
+import logging
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORMAT = 'png'
+
+# 形式ごとの MIME タイプと PIL の形式名（json は配置データ、svg / pdf はベクター形式）
+IMAGE_FORMATS = {
+    'png': ('image/png', 'PNG'),
+    'webp': ('image/webp', 'WEBP'),
+    'jpeg': ('image/jpeg', 'JPEG'),
+    'json': ('application/json', None),
+    'svg': ('image/svg+xml', None),
+    'pdf': ('application/pdf', None),
+}
+VECTOR_FORMATS = ('svg', 'pdf')
+FORMAT_ALIASES = {'jpg': 'jpeg', 'layout': 'json'}
+
+
+def normalize_format(image_format: Optional[str]) -> str:
+    """形式名を正規化（未対応の形式は PNG）"""
+    name = str(image_format or DEFAULT_FORMAT).lower()
+    name = FORMAT_ALIASES.get(name, name)
+    if name not in IMAGE_FORMATS:
+        logger.warning(f"未対応の画像形式です: {image_format}（PNGを使用）")
+        return DEFAULT_FORMAT
+    return name
+
+
+def mime_type(image_format: Optional[str]) -> str:
+    """形式の MIME タイプ"""
+    return IMAGE_FORMATS[normalize_format(image_format)][0]
+
+
+def encode_image(image: Image.Image, image_format: str = DEFAULT_FORMAT,
+                 compress_level: int = 6, quality: int = 90) -> bytes:
+    """画像をエンコード
+
+    Args:
+        image: PIL 画像
+        image_format: 'png' / 'webp' / 'jpeg'
+        compress_level: PNG の圧縮レベル（0-9、大きいほど小さく遅い）
+        quality: WebP / JPEG の画質（1-100）
+
+    Returns:
+        エンコード済みバイト列
+    """
+    image_format = normalize_format(image_format)
+    buffer = io.BytesIO()
+    if image_format == 'png':
+        image.save(buffer, format='PNG', compress_level=compress_level)
+    elif image_format == 'webp':
+        image.save(buffer, format='WEBP', quality=quality, method=4)
+    else:
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(buffer, format='JPEG', quality=quality, optimize=False)
+    return buffer.getvalue()
+
+
+def load_title_font(font_path: Optional[str], size: int):
+    """タイトル用フォント（読み込めない場合は PIL の既定フォント）"""
+    if font_path and Path(font_path).exists():
+        try:
+            return ImageFont.truetype(str(font_path), size)
+        except OSError as e:
+            logger.warning(f"フォント読み込み失敗: {e}")
+    return ImageFont.load_default(size)
+
+
+def add_title(image: Image.Image, title: str, font_path: Optional[str] = None,
+              font_size: int = 28, padding: int = 20, color='#222222',
+              background='white') -> Image.Image:
+    """画像の上にタイトル帯を付けた新しい画像を返す
+
+    Args:
+        image: 元画像
+        title: タイトル文字列
+        font_path: タイトルのフォント（日本語を含む場合は日本語フォントを指定）
+        font_size: 文字サイズ（ピクセル）
+        padding: タイトル上下の余白（ピクセル）
+        color: 文字色
+        background: タイトル帯の背景色
+    """
+    font = load_title_font(font_path, font_size)
+    left, top, right, bottom = font.getbbox(title)
+    band_height = (bottom - top) + padding * 2
+
+    titled = Image.new(image.mode, (image.width, image.height + band_height), background)
+    titled.paste(image, (0, band_height))
+    draw = ImageDraw.Draw(titled)
+    x = (image.width - (right - left)) // 2 - left
+    draw.text((x, padding - top), title, font=font, fill=color)
+    return titled
+
+
+def wordcloud_image(wordcloud, title: Optional[str] = None, font_path: Optional[str] = None,
+                    title_size: int = 28, scale: Optional[float] = None) -> Image.Image:
+    """WordCloud を PIL 画像に変換（タイトル指定時はタイトル帯付き）
+
+    scale を指定すると配置はそのままに描画倍率だけを変える（プレビューの縮小描画など）。
+    """
+    if scale is not None:
+        wordcloud.scale = scale
+    image = wordcloud.to_image()
+    if title:
+        image = add_title(image, title, font_path=font_path, font_size=title_size)
+    return image
+
+
+def wordcloud_layout(wordcloud, title: Optional[str] = None, title_size: int = 28,
+                     font_key: Optional[str] = None) -> dict:
+    """WordCloud の配置データ（ブラウザ側で canvas / SVG に描画するための値）
+
+    座標・文字サイズは描画倍率 1 の画素単位。x, y は単語の外接矩形の左上
+    （to_image と同じく PIL の既定アンカー 'la' 基準）で、orientation 90 は
+    反時計回りに90度回転した縦向きの単語。
+
+    Args:
+        wordcloud: 生成済みの WordCloud
+        title: 画像上部に描画するタイトル
+        title_size: タイトルの文字サイズ（ピクセル）
+        font_key: 単語のフォントキー（/api/fonts のキー）
+    """
+    words = []
+    for (word, frequency), font_size, (y, x), orientation, color in wordcloud.layout_:
+        words.append({
+            'word': word,
+            'frequency': round(float(frequency), 4),
+            'font_size': int(font_size),
+            'x': int(x),
+            'y': int(y),
+            'orientation': 0 if orientation is None else 90,
+            'color': color,
+        })
+    return {
+        'width': wordcloud.width,
+        'height': wordcloud.height,
+        'background_color': wordcloud.background_color,
+        'font': font_key,
+        'title': title,
+        'title_size': title_size if title else None,
+        'words': words,
+    }
+
+
+def encode_vector(wordcloud, image_format: str = 'pdf', title: Optional[str] = None,
+                  font_path: Optional[str] = None, title_size: int = 28, padding: int = 20) -> bytes:
+    """WordCloud を SVG / PDF で出力（配置・タイトル帯は to_image と同じ、単語はベクターで描画）
+
+    1pt = 配置の 1px（72dpi）の Figure に配置どおりの位置・向き・色で単語を置くため、
+    拡大・印刷しても単語がぼやけない。タイトルの文字サイズ・余白は to_image と同じく
+    描画倍率（scale）適用後の画素単位で指定する。
+
+    Args:
+        wordcloud: 生成済みの WordCloud
+        image_format: 'svg' / 'pdf'
+        title: 画像上部に描画するタイトル
+        font_path: タイトルのフォント
+        title_size: タイトルの文字サイズ（ピクセル）
+        padding: タイトル上下の余白（ピクセル）
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.patches import Rectangle
+    from PIL import ImageColor
+
+    title_size = round(title_size / wordcloud.scale)
+    padding = padding / wordcloud.scale
+    band_height = 0
+    if title:
+        left, top, right, bottom = load_title_font(font_path, title_size).getbbox(title)
+        band_height = (bottom - top) + padding * 2
+    width, height = wordcloud.width, wordcloud.height + band_height
+
+    figure = Figure(figsize=(width / 72, height / 72), dpi=72)
+    ax = figure.add_axes((0, 0, 1, 1))
+    ax.set_xlim(0, width)
+    ax.set_ylim(height, 0)  # 画素と同じく y 軸は下向き
+    ax.axis('off')
+    figure.patch.set_facecolor('white')
+    if wordcloud.background_color is not None:
+        ax.add_patch(Rectangle((0, band_height), width, wordcloud.height,
+                               color=wordcloud.background_color, linewidth=0))
+
+    if title:
+        title_font = FontProperties(fname=font_path) if font_path and Path(font_path).exists() else None
+        ax.text(width / 2, padding, title, fontproperties=title_font, fontsize=title_size,
+                color='#222222', ha='center', va='top')
+
+    word_font = FontProperties(fname=wordcloud.font_path)
+    for (word, _), font_size, (y, x), orientation, color in wordcloud.layout_:
+        rgb = tuple(channel / 255 for channel in ImageColor.getrgb(color)[:3])
+        ax.text(x, band_height + y, word, fontproperties=word_font, fontsize=font_size, color=rgb,
+                ha='left', va='top', rotation=0 if orientation is None else 90)
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=image_format, facecolor=figure.get_facecolor())
+    return buffer.getvalue()
+
+
+def encode_wordcloud(wordcloud, image_format: str = DEFAULT_FORMAT, title: Optional[str] = None,
+                     font_path: Optional[str] = None, title_size: int = 28,
+                     compress_level: int = 6, quality: int = 90,
+                     scale: Optional[float] = None, font_key: Optional[str] = None) -> bytes:
+    """WordCloud を直接エンコード（matplotlib の描画・再サンプリングなし）
+
+    image_format='json' の場合は画像を描画せず、配置データ（wordcloud_layout）を JSON で返す。
+    'svg' / 'pdf' の場合はベクター形式で出力する（encode_vector、scale・画質の指定は不要）。
+
+    Args:
+        wordcloud: 生成済みの WordCloud
+        image_format: 'png' / 'webp' / 'jpeg' / 'json' / 'svg' / 'pdf'
+        title: 画像上部に描画するタイトル
+        font_path: タイトルのフォント
+        title_size: タイトルの文字サイズ（ピクセル）
+        compress_level: PNG の圧縮レベル
+        quality: WebP / JPEG の画質
+        scale: 描画倍率（None の場合は WordCloud の scale のまま）
+        font_key: 配置データに含める単語のフォントキー（json のみ）
+    """
+    image_format = normalize_format(image_format)
+    if image_format == 'json':
+        layout = wordcloud_layout(wordcloud, title, title_size, font_key)
+        return json.dumps(layout, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if image_format in VECTOR_FORMATS:
+        return encode_vector(wordcloud, image_format, title, font_path, title_size)
+    image = wordcloud_image(wordcloud, title, font_path, title_size, scale)
+    return encode_image(image, image_format, compress_level=compress_level, quality=quality)
+
+
+def encode_wordcloud_base64(wordcloud, **kwargs) -> str:
+    """WordCloud を直接エンコードして Base64 文字列を返す"""
+    return base64.b64encode(encode_wordcloud(wordcloud, **kwargs)).decode('utf-8')
+
+
+def save_wordcloud(wordcloud, output_path, title: Optional[str] = None,
+                   font_path: Optional[str] = None, **kwargs) -> Path:
+    """WordCloud を拡張子に応じた形式で保存"""
+    output_path = Path(output_path)
+    image_format = output_path.suffix.lstrip('.') or DEFAULT_FORMAT
+    output_path.write_bytes(encode_wordcloud(wordcloud, image_format=image_format,
+                                             title=title, font_path=font_path, **kwargs))
+    return output_path
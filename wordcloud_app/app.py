@@ -15,7 +15,6 @@ import io
 from pathlib import Path
 from flask import Flask, render_template, request, jsonify, send_file
 from flask_cors import CORS
-from wordcloud import WordCloud
 import matplotlib
 matplotlib.use('Agg')  # バックエンド設定（GUI不要）
 import matplotlib.pyplot as plt
@@ -23,7 +22,6 @@ from PIL import Image
 import numpy as np
 import logging
 import pandas as pd
-from janome.tokenizer import Tokenizer
 from matplotlib.colors import LinearSegmentedColormap
 
 # プロジェクトルートをパスに追加
@@ -31,6 +29,11 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent
 sys.path.append(str(project_root))
 
+from scripts.utils.font_registry import get_font_registry
+from scripts.utils.japanese_tokenizer import create_tokenizer, tokenize_text
+from scripts.utils.token_filter import TokenFilter
+from scripts.utils.wordcloud_layout import CachedFontWordCloud
+
 app = Flask(__name__)
 CORS(app)
 
@@ -45,27 +48,11 @@ class WordCloudGenerator:
         self.fonts_dir = project_root / "fonts"
         self.load_available_fonts()
         self.load_sample_texts()
-        self.tokenizer = Tokenizer()
+        config_path = project_root / "config" / "analysis_config.yaml"
+        self.tokenizer = create_tokenizer(config_path=config_path)
+        # 品詞・基本形・語長・ストップワード（設定ファイル token_filters.wordcloud_app）
+        self.token_filter = TokenFilter.from_config('wordcloud_app', config_path)
         self.create_custom_colormaps()
-        
-        # 日本語ストップワード
-        self.stop_words = set([
-            'て', 'に', 'を', 'は', 'が', 'で', 'と', 'し', 'れ', 'さ', 'ある', 'いる', 
-            'も', 'する', 'から', 'な', 'こと', 'です', 'だ', 'た', 'した', 'の', 'よう',
-            'れる', 'くる', 'や', 'くれ', 'そう', 'ない', 'か', 'ので', 'よ', 'てる',
-            'もの', 'み', 'また', 'その', 'あり', 'き', 'い', 'う', 'のは', 'ん',
-            'のが', 'もん', 'どう', 'など', 'マス', '。', '、', '（', '）', '(', ')',
-            'より', 'へ', 'まで', 'から', 'また', 'も', 'お', 'みなさん', '今日',
-            'ありがとう', 'ござい', 'ました', 'てくれ', 'くれる', 'てくれる',
-            'くださり', 'ください', 'ませ', 'ありがとうござい',
-            '東京高専', 'みなさん', '本当', '一番', '授業', 'でき', 'いっ',
-            'おもしろ', 'すご', 'よかっ', 'より', 'こと', '今日', 'そう', 'な',
-            'て', 'る', 'よう', 'に', 'で', 'と', 'から', '。', '、', 'が',
-            'ミンチ', 'カルシウム', 'バリウム', 'リチウム', 'ホウ酸',
-            'ユキ', 'スケッチ', 'いう', 'べき', 'だっ', 'つい', 'った',
-            'とっ', 'おもしろい', 'きれい', 'すごい', 'なる', 'みる', 'いく',
-            'れ', 'なり', 'やっ', 'たい', 'いい', 'それ', 'お'
-        ])
     
     def create_custom_colormaps(self):
         """カスタムカラーマップを作成"""
@@ -142,23 +129,9 @@ class WordCloudGenerator:
         }
         
     def load_available_fonts(self):
-        """利用可能フォント読み込み"""
-        font_list_path = self.fonts_dir / "font_list.json"
-        
-        if font_list_path.exists():
-            with open(font_list_path, 'r', encoding='utf-8') as f:
-                self.available_fonts = json.load(f)
-        else:
-            # フォールバック：デフォルトフォント
-            self.available_fonts = {
-                "default": {
-                    "name": "Default",
-                    "path": None,
-                    "description": "システムデフォルト"
-                }
-            }
-        
-        logger.info(f"利用可能フォント数: {len(self.available_fonts)}")
+        """利用可能フォント読み込み（プロセス共有のフォントレジストリ）"""
+        self.font_registry = get_font_registry(self.fonts_dir)
+        self.available_fonts = self.font_registry.fonts
     
     def load_sample_texts(self):
         """実際のプロジェクトデータを読み込み"""
@@ -218,21 +191,10 @@ class WordCloudGenerator:
             }
         }
     
-    def tokenize_japanese(self, text):
-        """日本語テキストを単語に分割"""
-        # 単語を抽出（名詞、動詞、形容詞、副詞のみ）
-        words = []
-        for token in self.tokenizer.tokenize(text):
-            part_of_speech = token.part_of_speech.split(',')[0]
-            if part_of_speech in ['名詞', '動詞', '形容詞', '副詞']:
-                # 基本形を取得
-                base_form = token.base_form
-                word = base_form if base_form != '*' else token.surface
-                
-                # 2文字以上かつストップワードでない単語のみを追加
-                if len(word) >= 2 and word not in self.stop_words:
-                    words.append(word)
-        return ' '.join(words)
+    def word_frequencies(self, text):
+        """日本語テキストの単語頻度を集計"""
+        # 単語を抽出（名詞、動詞、形容詞、副詞の2文字以上、ストップワード・数字のみの語を除外）
+        return self.token_filter.count([tokenize_text(self.tokenizer, text)])
     
     def generate_wordcloud(self, config):
         """ワードクラウド生成"""
@@ -247,17 +209,11 @@ class WordCloudGenerator:
             if not text.strip():
                 return None, "テキストが空です"
             
-            # 日本語テキストを単語に分割
-            tokenized_text = self.tokenize_japanese(text)
-            
-            # フォント設定
-            font_key = config.get('font', 'default')
-            font_info = self.available_fonts.get(font_key, {})
-            font_path = font_info.get('path')
+            # 日本語テキストの単語頻度
+            frequencies = self.word_frequencies(text)
             
-            # 相対パスを絶対パスに変換
-            if font_path and not Path(font_path).is_absolute():
-                font_path = str(project_root / font_path)
+            # フォント設定（フォントオブジェクト・文字列寸法はレジストリでキャッシュ）
+            font_path = self.font_registry.resolve_path(config.get('font', 'default'))
             
             # 背景色設定（明度から生成またはデフォルト）
             background_color = config.get('background_color')
@@ -319,19 +275,14 @@ class WordCloudGenerator:
                 'relative_scaling': config.get('relative_scaling', 0.5),
                 'min_font_size': config.get('min_font_size', 10),
                 'max_font_size': config.get('max_font_size', 100),
-                'prefer_horizontal': config.get('prefer_horizontal', 0.7),
-                'collocations': False,
-                'regexp': r'[\w]+',
-                'include_numbers': False,
-                'normalize_plurals': False,
-                'stopwords': self.stop_words
+                'prefer_horizontal': config.get('prefer_horizontal', 0.7)
             }
             
             if font_path:
                 wordcloud_config['font_path'] = font_path
             
             # ワードクラウド生成
-            wordcloud = WordCloud(**wordcloud_config).generate(tokenized_text)
+            wordcloud = CachedFontWordCloud(**wordcloud_config).generate_from_frequencies(frequencies)
             
             # 画像変換
             plt.figure(figsize=(12, 6))
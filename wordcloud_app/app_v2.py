@@ -8,54 +8,95 @@
 アクセス: http://localhost:5002
 """
 
+import time
+_boot_started = time.perf_counter()
+
 import os
 import sys
 import json
-import base64
+import copy
+import hashlib
 import io
+import math
+import threading
+import logging
+from contextlib import contextmanager
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+from collections import Counter, defaultdict
+from flask import Flask, render_template, request, jsonify, send_file, url_for
 from flask_cors import CORS
-from wordcloud import WordCloud
-import matplotlib
-matplotlib.use('Agg')  # バックエンド設定（GUI不要）
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-from matplotlib import font_manager as fm
-from PIL import Image
 import numpy as np
-import logging
-import pandas as pd
-from janome.tokenizer import Tokenizer
-from matplotlib.colors import ListedColormap
-from collections import Counter
-from scipy import stats
-import math
-import networkx as nx
-from collections import defaultdict
-from itertools import combinations
-from sklearn.feature_extraction.text import CountVectorizer
-from scipy.sparse import coo_matrix
+
+# 重いモジュール（pandas, matplotlib, wordcloud, networkx, scipy）は
+# 使用するメソッド内でインポートし、起動直後からリクエストを受け付ける
 
 # プロジェクトルートをパスに追加
 current_dir = Path(__file__).parent
 project_root = current_dir.parent
 sys.path.append(str(project_root))
 
+from scripts.utils.job_queue import JobQueue, raise_if_cancelled
+
 app = Flask(__name__)
 CORS(app)
 
+# 描画済み画像のブラウザキャッシュ期間（秒）
+IMAGE_MAX_AGE = 24 * 60 * 60
+# ジョブ状態取得で終了を待つ最大時間（秒）
+MAX_JOB_WAIT = 30
+# フォントファイルの拡張子 → MIMEタイプ（不明な拡張子は application/octet-stream）
+FONT_MIME_TYPES = {
+    '.ttf': 'font/ttf',
+    '.otf': 'font/otf',
+    '.ttc': 'font/collection',
+    '.woff': 'font/woff',
+    '.woff2': 'font/woff2',
+}
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 起動フェーズごとの所要時間（秒）
+boot_timings = {}
+
+
+@contextmanager
+def boot_phase(name):
+    """起動フェーズの所要時間を記録"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        boot_timings[name] = round(time.perf_counter() - start, 3)
+        logger.info(f"起動フェーズ {name}: {boot_timings[name]:.3f}秒")
+
+
+def load_figure_classes():
+    """matplotlib の Figure・FigureCanvasAgg を遅延インポート
+    
+    pyplot のグローバルな「現在の図」を使わず、リクエストごとに Figure を作って描画する
+    （スレッド間で図を共有しないため、複数のリクエストを同時に描画できる）。
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    return Figure, FigureCanvasAgg
+
+
 class DifferenceWordCloudGenerator:
     """差分ワードクラウド生成クラス"""
     
+    # 配置に効かない設定（配置キャッシュのキーから除く）
+    COLOR_ONLY_KEYS = ('difference_colormap', 'image_format', 'preview')
+    
     def __init__(self, base_generator):
         """ベースジェネレータから機能を継承"""
+        from scripts.utils.render_cache import LayoutCache
+        
         self.base_generator = base_generator
         self.create_difference_colormaps()
+        # 配置キャッシュ（配置・統計・単語分析の組を保持）
+        self.layout_cache = LayoutCache.from_config(project_root / "config" / "analysis_config.yaml")
         
         # 科学用語リスト（教育効果測定用）
         self.science_terms = {
@@ -66,6 +107,8 @@ class DifferenceWordCloudGenerator:
     
     def create_difference_colormaps(self):
         """差分可視化用カラーマップ作成（アクセシブルカラー準拠）"""
+        from matplotlib.colors import ListedColormap
+        
         # 通常ワードクラウドのアクセシブルカラーを基準にする
         base_orange = self.base_generator.ACCESSIBLE_COLORS['orange']  # #d06500
         base_blue = self.base_generator.ACCESSIBLE_COLORS['blue']      # #0066cc
@@ -106,41 +149,11 @@ class DifferenceWordCloudGenerator:
             ])
         }
     
-    def get_matplotlib_font_props(self, font_path):
-        """matplotlib用フォントプロパティを取得"""
-        # フォントパスが指定されている場合
-        if font_path and Path(font_path).exists():
-            try:
-                return fm.FontProperties(fname=font_path)
-            except Exception as e:
-                logger.warning(f"フォント読み込み失敗: {e}")
-        
-        # デフォルトの日本語フォントを試す
-        fonts_dir = self.base_generator.fonts_dir
-        default_fonts = [
-            fonts_dir / "ipaexg.ttf",
-            fonts_dir / "ipag.ttf", 
-            fonts_dir / "NotoSansJP-Regular.otf",
-            fonts_dir / "HannariMincho-Regular.otf"
-        ]
-        
-        for default_font in default_fonts:
-            if default_font.exists():
-                try:
-                    logger.info(f"デフォルト日本語フォントを使用: {default_font}")
-                    return fm.FontProperties(fname=str(default_font))
-                except Exception as e:
-                    logger.warning(f"デフォルトフォント読み込み失敗: {e}")
-                    continue
-        
-        logger.warning("利用可能な日本語フォントが見つかりませんでした")
-        return None
     
-    def calculate_word_frequencies(self, text, excluded_words=None):
-        """テキストから単語頻度を計算"""
-        tokenized_text = self.base_generator.tokenize_japanese(text, excluded_words)
-        words = tokenized_text.split()
-        return Counter(words)
+    def calculate_word_frequencies(self, text_key, excluded_words=None):
+        """テキストソースから単語頻度を計算（単語ID配列から集計）"""
+        corpus = self.base_generator.get_source_sentences({'text_source': text_key}, excluded_words)
+        return Counter(corpus.frequencies() if corpus is not None else {})
     
     def calculate_difference_statistics(self, base_freq, compare_freq):
         """差分統計を計算"""
@@ -193,7 +206,12 @@ class DifferenceWordCloudGenerator:
         return statistics
     
     def generate_difference_frequencies(self, base_freq, compare_freq, config):
-        """差分頻度辞書を生成（方向性重視版）"""
+        """差分頻度辞書を生成（方向性重視版）
+        
+        Returns:
+            (差分頻度辞書, 単語ごとの分析データ)。分析データはリクエストごとに作成し、
+            共有インスタンスには保存しない（同時リクエストで混ざらないように）
+        """
         all_words = set(base_freq.keys()) | set(compare_freq.keys())
         
         # 設定からパラメータ取得
@@ -201,8 +219,8 @@ class DifferenceWordCloudGenerator:
         min_occurrence = config.get('min_occurrence', 1)
         min_difference = config.get('min_difference', 0.01)
         
-        # 分析用の詳細データも保存
-        self.word_analysis = {}
+        # 分析用の詳細データ
+        word_analysis = {}
         difference_freq = {}
         
         for word in all_words:
@@ -232,7 +250,7 @@ class DifferenceWordCloudGenerator:
             # 最小差分フィルタ
             if abs(diff) >= min_difference:
                 # 単語分析データ保存（方向性情報含む）
-                self.word_analysis[word] = {
+                word_analysis[word] = {
                     'diff': diff,
                     'base': base_count,
                     'compare': compare_count,
@@ -245,7 +263,7 @@ class DifferenceWordCloudGenerator:
                 if config.get('science_highlight', False):
                     for level, terms in self.science_terms.items():
                         if word in terms:
-                            self.word_analysis[word]['science_level'] = level
+                            word_analysis[word]['science_level'] = level
                             is_science_term = True
                             break
                 
@@ -273,10 +291,85 @@ class DifferenceWordCloudGenerator:
                 
                 difference_freq[word] = max(weight, 1)  # 最小値1を保証
         
-        return difference_freq
+        return difference_freq, word_analysis
+    
+    def difference_palette(self, colormap_name=None):
+        """差分カラーマップ（difference_colormap）ごとの色分け
+        
+        difference_standard は増減を大・中・小の3段階で塗り分け（7色）、
+        science_focused は増加・減少・変化なし・科学用語の4色で塗り分ける。
+        """
+        if colormap_name not in self.difference_colormaps:
+            colormap_name = 'difference_standard'
+        if colormap_name == 'science_focused':
+            return dict(self.difference_colors,
+                        increase_large=self.difference_colors['increase_medium'],
+                        increase_small=self.difference_colors['increase_medium'],
+                        decrease_large=self.difference_colors['decrease_medium'],
+                        decrease_small=self.difference_colors['decrease_medium'])
+        return self.difference_colors
+    
+    def difference_color_func(self, word_analysis, colormap_name=None):
+        """方向性に基づく色分け関数（アクセシブルカラー準拠、色は difference_colormap で選択）"""
+        colors = self.difference_palette(colormap_name)
+        
+        def color_func(word, font_size, position, orientation, random_state=None, **kwargs):
+            if word not in word_analysis:
+                return colors['common']  # デフォルト色
+            
+            analysis = word_analysis[word]
+            direction = analysis['direction']
+            magnitude = analysis['magnitude']
+            
+            # 科学用語の特別色（統一感のためブラウン）
+            if 'science_level' in analysis:
+                return colors['science_highlight']
+            
+            # 方向性に基づく色選択（アクセシブルカラー使用）
+            if direction == 'increase':
+                if magnitude > 20:  # 大幅増加
+                    return colors['increase_large']
+                elif magnitude > 5:  # 中程度増加
+                    return colors['increase_medium']
+                else:  # 軽微増加
+                    return colors['increase_small']
+            elif direction == 'decrease':
+                if magnitude > 20:  # 大幅減少
+                    return colors['decrease_large']
+                elif magnitude > 5:  # 中程度減少
+                    return colors['decrease_medium']
+                else:  # 軽微減少
+                    return colors['decrease_small']
+            else:
+                return colors['common']
+        return color_func
+    
+    def layout_key(self, config, excluded_words):
+        """配置キャッシュのキー（色・画像形式だけが違う設定は同じキー）"""
+        from scripts.utils.render_cache import config_key
+        
+        layout_config = {key: value for key, value in config.items()
+                         if key not in self.COLOR_ONLY_KEYS}
+        layout_config.update({
+            'type': 'difference',
+            'renderer': self.base_generator.RENDER_VERSION,
+            'corpus_version': self.base_generator.corpus_version,
+            'excluded_words': sorted(excluded_words),
+            'layout_engine': self.base_generator.layout_engine(config),
+            'fixed_params': self.base_generator.FIXED_PARAMS,
+            'random_state': self.base_generator.RANDOM_STATE,
+        })
+        return config_key(layout_config)
     
     def generate_difference_wordcloud(self, config):
-        """差分ワードクラウド生成"""
+        """差分ワードクラウド生成
+        
+        配置は統計・単語分析と一緒に配置キャッシュへ保持し、
+        カラーマップ・画像形式だけを変えた再生成は集計・配置を省略して再着色のみ行う。
+        """
+        from scripts.utils.wordcloud_layout import create_wordcloud
+        from scripts.utils.wordcloud_renderer import encode_wordcloud
+        
         try:
             # データソース取得
             base_source = config.get('base_dataset', 'q2_before')
@@ -300,115 +393,79 @@ class DifferenceWordCloudGenerator:
                 custom_words = [w.strip() for w in config.get('custom_exclude_words', '').split(',') if w.strip()]
                 excluded_words.update(custom_words)
             
-            # 単語頻度計算
-            base_freq = self.calculate_word_frequencies(base_text, excluded_words)
-            compare_freq = self.calculate_word_frequencies(compare_text, excluded_words)
-            
-            # 差分統計計算
-            statistics = self.calculate_difference_statistics(base_freq, compare_freq)
-            
-            # 差分頻度辞書生成
-            difference_freq = self.generate_difference_frequencies(base_freq, compare_freq, config)
-            
-            if not difference_freq:
-                return None, "有意な差分が見つかりませんでした", statistics
-            
-            # 方向性に基づく色分け関数（アクセシブルカラー準拠）
-            def color_func(word, font_size, position, orientation, random_state=None, **kwargs):
-                if not hasattr(self, 'word_analysis') or word not in self.word_analysis:
-                    return self.difference_colors['common']  # デフォルト色
-                
-                analysis = self.word_analysis[word]
-                direction = analysis['direction']
-                magnitude = analysis['magnitude']
-                
-                # 科学用語の特別色（統一感のためブラウン）
-                if 'science_level' in analysis:
-                    return self.difference_colors['science_highlight']
-                
-                # 方向性に基づく色選択（アクセシブルカラー使用）
-                if direction == 'increase':
-                    if magnitude > 20:  # 大幅増加
-                        return self.difference_colors['increase_large']
-                    elif magnitude > 5:  # 中程度増加
-                        return self.difference_colors['increase_medium']
-                    else:  # 軽微増加
-                        return self.difference_colors['increase_small']
-                elif direction == 'decrease':
-                    if magnitude > 20:  # 大幅減少
-                        return self.difference_colors['decrease_large']
-                    elif magnitude > 5:  # 中程度減少
-                        return self.difference_colors['decrease_medium']
-                    else:  # 軽微減少
-                        return self.difference_colors['decrease_small']
-                else:
-                    return self.difference_colors['common']
-            
-            # ワードクラウド生成準備（スケーリング調整）
-            max_freq = max(difference_freq.values()) if difference_freq else 1
-            scale_factor = min(100, max(10, max_freq))
-            freq_text = ' '.join([f"{word} " * int((freq / max_freq) * scale_factor) for word, freq in difference_freq.items()])
-            
             # フォント設定
             font_key = config.get('font', 'default')
-            font_info = self.base_generator.available_fonts.get(font_key, {})
-            font_path = font_info.get('path')
-            
-            if font_path and not Path(font_path).is_absolute():
-                font_path = str(project_root / font_path)
-            
-            # カラーマップ選択
+            font_path = self.base_generator.font_registry.resolve_path(font_key)
+            preview = self.base_generator.preview_options(config)
             colormap_name = config.get('difference_colormap', 'difference_standard')
-            colormap = self.difference_colormaps.get(colormap_name, self.difference_colormaps['difference_standard'])
-            
-            # ワードクラウド設定（固定パラメータ準拠）
-            fixed_params = self.base_generator.FIXED_PARAMS
-            wordcloud_config = {
-                'width': config.get('width', 1000),
-                'height': config.get('height', 600),
-                'background_color': fixed_params['background_color'],  # 固定パラメータ
-                'max_words': fixed_params['max_words'],                # 固定パラメータ
-                'color_func': color_func,                              # カスタム色分け関数
-                'relative_scaling': fixed_params['relative_scaling'],  # 固定パラメータ
-                'min_font_size': fixed_params['min_font_size'],        # 固定パラメータ
-                'max_font_size': fixed_params['max_font_size'],        # 固定パラメータ
-                'prefer_horizontal': fixed_params['prefer_horizontal'], # 固定パラメータ
-                'collocations': False,
-                'stopwords': set()
-            }
-            
-            if font_path:
-                wordcloud_config['font_path'] = font_path
-            
-            # ワードクラウド生成
-            wordcloud = WordCloud(**wordcloud_config).generate(freq_text)
-            
-            # 画像データ生成
-            plt.figure(figsize=(12, 8))
-            
-            # matplotlib全体の日本語フォント設定
-            font_props = self.get_matplotlib_font_props(font_path)
-            if font_props:
-                # タイトル専用でフォントプロパティを使用（rcParamsは使わない）
-                pass  # font_propsをタイトルで直接使用
-            
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
             
-            # 日本語タイトル設定（フォント指定）
-            title_props = {'fontsize': 16, 'pad': 20}
-            if font_props:
-                title_props['fontproperties'] = font_props
-            plt.title(f'差分分析: {base_source} → {compare_source}', **title_props)
-            
-            # Base64エンコード
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150)
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-            plt.close()
-            
-            return img_base64, None, statistics
+            layout_cache = self.layout_cache
+            layout_key = self.layout_key(config, excluded_words)
+            cached = layout_cache.get(layout_key)
+            if cached is not None:
+                wordcloud, statistics, word_analysis = cached
+            else:
+                # 単語頻度計算
+                base_freq = self.calculate_word_frequencies(base_source, excluded_words)
+                compare_freq = self.calculate_word_frequencies(compare_source, excluded_words)
+                
+                # 差分統計計算
+                statistics = self.calculate_difference_statistics(base_freq, compare_freq)
+                
+                # 差分頻度辞書生成
+                difference_freq, word_analysis = self.generate_difference_frequencies(base_freq, compare_freq, config)
+                
+                if not difference_freq:
+                    return None, "有意な差分が見つかりませんでした", statistics
+                
+                # ワードクラウド設定（固定パラメータ準拠）
+                fixed_params = self.base_generator.FIXED_PARAMS
+                wordcloud_config = {
+                    'width': config.get('width', 1000),
+                    'height': config.get('height', 600),
+                    'background_color': fixed_params['background_color'],  # 固定パラメータ
+                    'max_words': fixed_params['max_words'],                # 固定パラメータ
+                    'color_func': self.difference_color_func(word_analysis, colormap_name), # カスタム色分け関数
+                    'relative_scaling': fixed_params['relative_scaling'],  # 固定パラメータ
+                    'min_font_size': fixed_params['min_font_size'],        # 固定パラメータ
+                    'max_font_size': fixed_params['max_font_size'],        # 固定パラメータ
+                    'prefer_horizontal': fixed_params['prefer_horizontal'], # 固定パラメータ
+                    'random_state': self.base_generator.RANDOM_STATE       # プレビューと最終描画で同じ配置
+                }
+                
+                if font_path:
+                    wordcloud_config['font_path'] = font_path
+                
+                # ワードクラウド生成（差分の重みをそのまま使用、プレビューは時間予算内で配置）
+                raise_if_cancelled()
+                layout_engine = self.base_generator.layout_engine(config)
+                wordcloud = create_wordcloud(layout_engine,
+                                             time_budget=preview['time_budget'] if preview else None,
+                                             **wordcloud_config)
+                wordcloud.generate_from_frequencies(difference_freq)
+                if preview is None:
+                    # 時間予算で打ち切ったプレビューの配置は再利用しない
+                    layout_cache.put(layout_key, (wordcloud, statistics, word_analysis))
+            
+            # 着色（キャッシュ共有の配置は変更せず、複製を着色する）
+            colored = copy.copy(wordcloud).recolor(
+                color_func=self.difference_color_func(word_analysis, colormap_name))
+            
+            # 画像エンコード（タイトルは PIL で描画、matplotlib を経由しない）
+            encode_options = {}
+            if preview:
+                encode_options = dict(preview['encode'], scale=preview['scale'],
+                                      title_size=round(28 * preview['scale']))
+            image = encode_wordcloud(
+                colored,
+                image_format=config.get('image_format'),
+                title=f'差分分析: {base_source} → {compare_source}',
+                font_path=self.base_generator.font_registry.japanese_font(font_path),
+                font_key=font_key,
+                **encode_options
+            )
+            
+            return image, None, statistics
             
         except Exception as e:
             logger.error(f"差分ワードクラウド生成エラー: {e}")
@@ -431,37 +488,40 @@ class WordTreeGenerator:
             'action': ['見る', '観察', 'やる', '知る']
         }
     
-    def tokenize_sentences(self, text):
-        """テキストを文単位に分割"""
-        # 句点で分割（。！？で区切る）
-        import re
-        sentences = re.split(r'[。！？]+', text)
-        return [s.strip() for s in sentences if s.strip()]
-    
-    def extract_word_contexts(self, text, root_word, excluded_words=None):
-        """ルート語の文脈を抽出"""
-        sentences = self.tokenize_sentences(text)
+    def extract_word_contexts(self, corpus, root_word, blocked=None):
+        """ルート語の文脈を抽出（転置インデックスで全出現位置を取得）
+        
+        Args:
+            corpus: テキストソースの EncodedCorpus（除外語適用前）
+            root_word: ルート語
+            blocked: 除外単語の語彙マスク（True の単語は文脈から除く）
+        """
         contexts = []
         
-        for sentence in sentences:
-            if root_word in sentence:
-                # 文を単語に分割（除外語を適用）
-                tokenized = self.base_generator.tokenize_japanese(sentence, excluded_words)
-                words = tokenized.split()
-                
-                # ルート語の位置を見つけて文脈を抽出
-                if root_word in words:
-                    root_index = words.index(root_word)
-                    
-                    # 前後の文脈を取得
-                    context = {
-                        'sentence': sentence,
-                        'words': words,
-                        'root_index': root_index,
-                        'before': words[:root_index],
-                        'after': words[root_index + 1:]
-                    }
-                    contexts.append(context)
+        root_id = corpus.vocabulary.get(root_word)
+        if root_id is None or (blocked is not None and blocked[root_id]):
+            return contexts
+        
+        sentence_indices, positions = corpus.index.postings(root_id)
+        for sentence_index, position in zip(sentence_indices, positions):
+            sentence_ids = corpus.sentence_ids(sentence_index)
+            if blocked is not None:
+                keep = ~blocked[sentence_ids]
+                root_index = int(np.count_nonzero(keep[:position]))
+                words = corpus.vocabulary.decode(sentence_ids[keep])
+            else:
+                root_index = int(position)
+                words = corpus.vocabulary.decode(sentence_ids)
+            
+            # 前後の文脈を取得
+            context = {
+                'sentence': corpus.texts[sentence_index],
+                'words': words,
+                'root_index': root_index,
+                'before': words[:root_index],
+                'after': words[root_index + 1:]
+            }
+            contexts.append(context)
         
         return contexts
     
@@ -526,13 +586,20 @@ class WordTreeGenerator:
                 custom_words = [w.strip() for w in config.get('custom_exclude_words', '').split(',') if w.strip()]
                 excluded_words.update(custom_words)
             
+            # 文単位の単語ID配列と転置インデックス（全ルート語で共有）
+            corpus = self.base_generator.get_source_corpus(config)
+            if corpus is None:
+                return None, "テキストが空です", {}
+            blocked = self.base_generator.excluded_mask(corpus.vocabulary, excluded_words)
+            
             # ルート語選択（自動または手動）
             root_words = []
             if config.get('auto_select_roots', True):
-                # 推奨ルート語から自動選択
+                # 推奨ルート語のうちテキストソースに出現する語を自動選択
                 for category_words in self.recommended_roots.values():
                     for word in category_words:
-                        if word in text:
+                        word_id = corpus.vocabulary.get(word)
+                        if word_id is not None and not blocked[word_id] and corpus.index.frequency(word_id) > 0:
                             root_words.append(word)
                             if len(root_words) >= config.get('max_roots', 3):
                                 break
@@ -550,7 +617,7 @@ class WordTreeGenerator:
             # 各ルート語についてツリー構造を生成
             trees = []
             for root_word in root_words[:config.get('max_roots', 3)]:
-                contexts = self.extract_word_contexts(text, root_word, excluded_words)
+                contexts = self.extract_word_contexts(corpus, root_word, blocked)
                 if contexts:
                     tree = self.build_tree_structure(
                         contexts, 
@@ -576,6 +643,14 @@ class WordTreeGenerator:
 class CooccurrenceNetworkGenerator:
     """共起ネットワーク生成クラス - シンプル版（既存ライブラリ活用）"""
     
+    # ラベル用の日本語フォント候補（はんなり明朝を優先）
+    PREFERRED_FONTS = (
+        "HannariMincho-Regular.otf",
+        "ipaexg.ttf",
+        "ipag.ttf",
+        "NotoSansJP-Regular.otf"
+    )
+    
     def __init__(self, base_generator):
         """ベースジェネレータから機能を継承"""
         self.base_generator = base_generator
@@ -595,49 +670,46 @@ class CooccurrenceNetworkGenerator:
             }
         }
     
-    def _tokenize_sentences(self, text):
-        """テキストを文単位に分割"""
-        import re
-        sentences = re.split(r'[。！？]+', text)
-        return [s.strip() for s in sentences if s.strip()]
-    
-    def calculate_cooccurrence_matrix(self, text, excluded_words=None):
-        """scikit-learn活用で共起行列を効率的に計算"""
-        sentences = self._tokenize_sentences(text)
-        
-        # 各文を単語に分割（除外語適用）
-        processed_sentences = []
-        for sentence in sentences:
-            tokenized = self.base_generator.tokenize_japanese(sentence, excluded_words)
-            if tokenized.strip():
-                processed_sentences.append(tokenized)
-        
-        if not processed_sentences:
+    def calculate_cooccurrence_matrix(self, corpus, min_df=2, max_features=100):
+        """単語ID配列から共起行列を疎行列で計算
+        
+        語彙の選択は CountVectorizer(min_df=2, max_features=100) と同じ
+        （2文字以上・2文以上に出現・総出現回数の上位100語、語順は辞書順）。
+        
+        Args:
+            corpus: 除外語適用済みの EncodedCorpus
+        """
+        X = corpus.document_term_matrix()
+        vocabulary_words = corpus.vocabulary.words
+        
+        # 最低2文に出現する2文字以上の語
+        doc_freq = np.bincount(X.indices, minlength=X.shape[1])
+        candidates = sorted(
+            (vocabulary_words[i] for i in np.flatnonzero(doc_freq >= min_df)
+             if len(vocabulary_words[i]) >= 2)
+        )
+        if not candidates:
+            logger.warning("共起行列計算でエラー: 条件を満たす語がありません")
             return None, None, None
         
-        # CountVectorizerで語彙ベクトル化
-        vectorizer = CountVectorizer(
-            lowercase=False,
-            stop_words=None,  # 既に除外済み
-            min_df=2,         # 最低2回出現
-            max_features=100  # 上位100語まで
-        )
+        candidate_ids = np.array([corpus.vocabulary.get(word) for word in candidates])
+        term_freq = np.asarray(X[:, candidate_ids].sum(axis=0)).ravel()
+        if len(candidate_ids) > max_features:
+            selected = np.sort((-term_freq).argsort()[:max_features])
+            candidate_ids = candidate_ids[selected]
         
-        try:
-            X = vectorizer.fit_transform(processed_sentences)
-            # 共起行列 = X^T * X（効率的な疎行列計算）
-            cooccurrence_matrix = (X.T @ X).toarray()
-            words = vectorizer.get_feature_names_out()
-            word_freq = dict(zip(words, X.sum(axis=0).A1))
-            
-            return cooccurrence_matrix, words, word_freq
-            
-        except ValueError as e:
-            logger.warning(f"共起行列計算でエラー: {e}")
-            return None, None, None
+        X = X[:, candidate_ids]
+        # 共起行列 = X^T * X（効率的な疎行列計算）
+        cooccurrence_matrix = (X.T @ X).toarray()
+        words = np.array(vocabulary_words, dtype=object)[candidate_ids]
+        word_freq = dict(zip(words, np.asarray(X.sum(axis=0)).ravel()))
+        
+        return cooccurrence_matrix, words, word_freq
     
     def build_network_graph(self, cooccurrence_matrix, words, word_freq, config):
         """NetworkXで直接グラフ構築"""
+        import networkx as nx
+        
         # NetworkXで共起行列から直接グラフ作成
         G = nx.from_numpy_array(cooccurrence_matrix)
         
@@ -676,50 +748,29 @@ class CooccurrenceNetworkGenerator:
         
         return G
     
-    def get_matplotlib_font_props(self, font_path):
-        """matplotlib用フォントプロパティを取得"""
-        # フォントパスが指定されている場合
-        if font_path and Path(font_path).exists():
-            try:
-                logger.info(f"指定フォントを使用: {font_path}")
-                return fm.FontProperties(fname=font_path)
-            except Exception as e:
-                logger.warning(f"指定フォント読み込み失敗: {e}")
-        
-        # デフォルトの日本語フォント（はんなり明朝を優先）
-        fonts_dir = self.base_generator.fonts_dir
-        default_fonts = [
-            fonts_dir / "HannariMincho-Regular.otf",  # はんなり明朝を優先
-            fonts_dir / "ipaexg.ttf",
-            fonts_dir / "ipag.ttf", 
-            fonts_dir / "NotoSansJP-Regular.otf"
-        ]
+    def generate_cooccurrence_image(self, config):
+        """共起ネットワーク静的画像生成（wordcloudと同じインターフェース）
         
-        for default_font in default_fonts:
-            if default_font.exists():
-                try:
-                    logger.info(f"デフォルト日本語フォントを使用: {default_font}")
-                    return fm.FontProperties(fname=str(default_font))
-                except Exception as e:
-                    logger.warning(f"デフォルトフォント読み込み失敗: {e}")
-                    continue
+        同じ設定の同時リクエストは1回の描画にまとめ、全員に同じ結果を返す。
+        """
+        from scripts.utils.render_cache import config_key
         
-        logger.warning("利用可能な日本語フォントが見つかりませんでした")
-        return None
+        flight_key = 'cooccurrence:' + config_key({
+            'corpus_version': self.base_generator.corpus_version,
+            'config': config,
+        })
+        return self.base_generator.single_flight.do(
+            flight_key, lambda: self._render_cooccurrence_image(config))
     
-    def generate_cooccurrence_image(self, config):
-        """共起ネットワーク静的画像生成（wordcloudと同じインターフェース）"""
+    def _render_cooccurrence_image(self, config):
+        """共起ネットワーク画像を描画（戻り値は generate_cooccurrence_image と同じ）
+        
+        図はリクエストごとの Figure に描画する（pyplot のグローバル状態を使わない）。
+        """
+        import networkx as nx
+        Figure, FigureCanvasAgg = load_figure_classes()
+        
         try:
-            # データソース取得
-            text_key = config.get('text_source', 'all_responses')
-            if text_key == 'custom':
-                text = config.get('custom_text', '')
-            else:
-                text = self.base_generator.sample_texts.get(text_key, {}).get('text', '')
-            
-            if not text.strip():
-                return None, "テキストが空です", {}
-            
             # 除外単語設定
             excluded_words = set()
             if config.get('exclude_categories'):
@@ -731,8 +782,13 @@ class CooccurrenceNetworkGenerator:
                 custom_words = [w.strip() for w in config.get('custom_exclude_words', '').split(',') if w.strip()]
                 excluded_words.update(custom_words)
             
-            # Step 1: scikit-learn共起行列計算
-            cooccurrence_matrix, words, word_freq = self.calculate_cooccurrence_matrix(text, excluded_words)
+            # データソース取得（文単位の単語ID配列）
+            corpus = self.base_generator.get_source_sentences(config, excluded_words)
+            if corpus is None:
+                return None, "テキストが空です", {}
+            
+            # Step 1: 疎行列で共起行列計算
+            cooccurrence_matrix, words, word_freq = self.calculate_cooccurrence_matrix(corpus)
             
             if cooccurrence_matrix is None:
                 return None, "共起関係が見つかりませんでした", {}
@@ -743,8 +799,8 @@ class CooccurrenceNetworkGenerator:
             if G.number_of_nodes() == 0:
                 return None, "表示可能なネットワークが見つかりませんでした", {}
             
-            # Step 3: matplotlib描画設定
-            plt.figure(figsize=(config.get('width', 800)/100, config.get('height', 600)/100))
+            # 非同期ジョブとして実行中に置き換えられた場合は重いレイアウト計算・描画の前に中断する
+            raise_if_cancelled()
             
             # レイアウト計算
             layout_type = config.get('layout', 'spring')
@@ -756,6 +812,7 @@ class CooccurrenceNetworkGenerator:
                 pos = nx.kamada_kawai_layout(G)
             else:
                 pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
+            raise_if_cancelled()
             
             # ノード色・サイズ設定
             node_colors = []
@@ -800,47 +857,37 @@ class CooccurrenceNetworkGenerator:
             
             # フォント設定（はんなり明朝を優先使用）
             font_key = config.get('font', 'hannari')  # デフォルトをはんなり明朝に
-            
-            # はんなり明朝を優先的に選択
-            if font_key in ['default', 'hannari'] or font_key not in self.base_generator.available_fonts:
-                hannari_path = self.base_generator.fonts_dir / "HannariMincho-Regular.otf"
-                if hannari_path.exists():
-                    font_path = str(hannari_path)
-                    logger.info(f"はんなり明朝を使用します: {font_path}")
-                else:
-                    font_info = self.base_generator.available_fonts.get(font_key, {})
-                    font_path = font_info.get('path')
-                    if font_path and not Path(font_path).is_absolute():
-                        font_path = str(project_root / font_path)
-            else:
-                font_info = self.base_generator.available_fonts.get(font_key, {})
-                font_path = font_info.get('path')
-                if font_path and not Path(font_path).is_absolute():
-                    font_path = str(project_root / font_path)
-            
-            font_props = self.get_matplotlib_font_props(font_path)
+            font_registry = self.base_generator.font_registry
+            font_path = None
+            if font_key not in ['default', 'hannari'] and font_key in font_registry.fonts:
+                font_path = font_registry.resolve_path(font_key)
+            font_path = font_registry.japanese_font(font_path, preferred=self.PREFERRED_FONTS)
+            font_props = font_registry.font_properties(font_path) if font_path else None
             font_family = font_props.get_name() if font_props else 'sans-serif'
             logger.info(f"使用フォントファミリー: {font_family}")
             
-            # ネットワーク描画
-            plt.clf()
-            plt.figure(figsize=(config.get('width', 800)/100, config.get('height', 600)/100))
+            # Step 3: ネットワーク描画（リクエストごとの Figure）
+            figure = Figure(figsize=(config.get('width', 800)/100, config.get('height', 600)/100))
+            FigureCanvasAgg(figure)
+            ax = figure.add_subplot()
             
             # 背景色設定
             background_color = config.get('background_color', '#f8f8f8')
-            plt.gca().set_facecolor(background_color)
+            ax.set_facecolor(background_color)
             
             # エッジ描画
             nx.draw_networkx_edges(G, pos, 
                                  width=edge_widths,
                                  edge_color='#888888',
-                                 alpha=0.6)
+                                 alpha=0.6,
+                                 ax=ax)
             
             # ノード描画
             nx.draw_networkx_nodes(G, pos,
                                  node_color=node_colors,
                                  node_size=node_sizes,
-                                 alpha=0.8)
+                                 alpha=0.8,
+                                 ax=ax)
             
             # ラベル描画（日本語フォント対応）
             # NetworkXのlabels描画は日本語フォントをサポートしないため、個別描画
@@ -859,10 +906,10 @@ class CooccurrenceNetworkGenerator:
                 if font_props:
                     text_props['fontproperties'] = font_props
                 
-                plt.text(x, y, str(node), **text_props)
+                ax.text(x, y, str(node), **text_props)
             
-            plt.axis('off')
-            plt.tight_layout()
+            ax.axis('off')
+            figure.tight_layout()
             
             # 統計情報（JSONシリアライゼーション対応）
             statistics = {
@@ -874,15 +921,12 @@ class CooccurrenceNetworkGenerator:
                 'layout_used': str(layout_type)
             }
             
-            # Base64エンコード（wordcloudと同じ）
+            # PNGエンコード
             img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150,
-                       facecolor=background_color, edgecolor='none')
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-            plt.close()
+            figure.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150,
+                           facecolor=background_color, edgecolor='none')
             
-            return img_base64, None, statistics
+            return img_buffer.getvalue(), None, statistics
             
         except Exception as e:
             logger.error(f"共起ネットワーク画像生成エラー: {e}")
@@ -901,6 +945,19 @@ class WordCloudGeneratorV2:
         'background_color': '#f8f8f8'
     }
     
+    # 描画の乱数シード（同じ設定から常に同じ画像を描画する）
+    RANDOM_STATE = 42
+    # 描画処理の版（描画方法を変えたら更新し、キャッシュ済みの結果・ETagを無効化する）
+    RENDER_VERSION = 4
+    # 単語配置エンジン（'numpy': セル格子の累積和テーブル、'wordcloud': ライブラリ標準）
+    DEFAULT_LAYOUT_ENGINE = 'numpy'
+    # プレビュー描画（最終描画と同じシードで配置し、縮小して高速エンコード）
+    PREVIEW_SCALE = 0.5
+    PREVIEW_TIME_BUDGET = 0.05  # 配置の時間予算（秒）。超えた分の単語は最終描画でのみ配置
+    PREVIEW_ENCODE_OPTIONS = {'compress_level': 1, 'quality': 75}
+    # 一括生成で受け付ける設定の最大件数
+    MAX_BATCH_SIZE = 32
+    
     # アクセシブルカラー（WCAG 2.1 Level AA準拠）
     ACCESSIBLE_COLORS = {
         'orange': '#d06500',  # より濃いオレンジ
@@ -909,30 +966,38 @@ class WordCloudGeneratorV2:
     }
     
     def __init__(self):
+        from scripts.utils.japanese_tokenizer import create_tokenizer
+        from scripts.utils.render_cache import LayoutCache, RenderCache
+        from scripts.utils.sentence_cache import SentenceTokenCache
+        from scripts.utils.single_flight import SingleFlight
+        from scripts.utils.token_filter import TokenFilter
+        
+        config_path = project_root / "config" / "analysis_config.yaml"
+        self.config_path = config_path
         self.fonts_dir = project_root / "fonts"
-        self.load_available_fonts()
-        self.load_sample_texts()
-        self.tokenizer = Tokenizer()
-        self.create_accessible_colormaps()
-        
-        # 除外可能な日本語ストップワード（ユーザーが選択可能）
-        self.default_stop_words = set([
-            'て', 'に', 'を', 'は', 'が', 'で', 'と', 'し', 'れ', 'さ', 'ある', 'いる', 
-            'も', 'する', 'から', 'な', 'こと', 'です', 'だ', 'た', 'した', 'の', 'よう',
-            'れる', 'くる', 'や', 'くれ', 'そう', 'ない', 'か', 'ので', 'よ', 'てる',
-            'もの', 'み', 'また', 'その', 'あり', 'き', 'い', 'う', 'のは', 'ん',
-            'のが', 'もん', 'どう', 'など', 'マス', '。', '、', '（', '）', '(', ')',
-            'より', 'へ', 'まで', 'から', 'また', 'も', 'お', 'みなさん', '今日',
-            'ありがとう', 'ござい', 'ました', 'てくれ', 'くれる', 'てくれる',
-            'くださり', 'ください', 'ませ', 'ありがとうござい',
-            '東京高専', 'みなさん', '本当', '一番', '授業', 'でき', 'いっ',
-            'おもしろ', 'すご', 'よかっ', 'より', 'こと', '今日', 'そう', 'な',
-            'て', 'る', 'よう', 'に', 'で', 'と', 'から', '。', '、', 'が',
-            'ミンチ', 'カルシウム', 'バリウム', 'リチウム', 'ホウ酸',
-            'ユキ', 'スケッチ', 'いう', 'べき', 'だっ', 'つい', 'った',
-            'とっ', 'おもしろい', 'きれい', 'すごい', 'なる', 'みる', 'いく',
-            'れ', 'なり', 'やっ', 'たい', 'いい', 'それ', 'お'
-        ])
+        with boot_phase('fonts'):
+            self.load_available_fonts()
+        with boot_phase('tokenizer'):
+            self.tokenizer = create_tokenizer(config_path=config_path)
+            # 品詞・基本形・語長・ストップワード（設定ファイル token_filters.wordcloud_app）
+            self.token_filter = TokenFilter.from_config('wordcloud_app', config_path)
+            # カスタムテキストは文単位でキャッシュし、変更された文のみ形態素解析する
+            self.sentence_cache = SentenceTokenCache.from_config(self.tokenizer, config_path)
+        with boot_phase('token_store'):
+            self.load_sample_texts()
+        with boot_phase('encode_sources'):
+            self.encode_sources()
+        with boot_phase('colormaps'):
+            self.create_accessible_colormaps()
+        # 描画結果キャッシュ（設定ファイル performance.cache の max_size で上限）
+        self.render_cache = RenderCache.from_config(config_path)
+        # 配置キャッシュ（カラーマップの切り替えは再配置せず再着色のみ）
+        self.layout_cache = LayoutCache.from_config(config_path)
+        # 同じ設定の同時描画の集約（ワードクラウド・共起ネットワークで共有）
+        self.single_flight = SingleFlight()
+        # 一括生成の描画プロセス数（None は設定ファイルの値。gunicorn では AppState.preload で
+        # ワーカー数に応じて CPU コアを分ける）
+        self.batch_n_jobs = None
         
         # カテゴリー別の除外単語（ユーザーが選択可能）
         self.category_stop_words = {
@@ -944,6 +1009,8 @@ class WordCloudGeneratorV2:
     
     def create_accessible_colormaps(self):
         """アクセシブルなカラーマップを作成"""
+        from matplotlib.colors import ListedColormap
+        
         # メインアクセシブル3色カラーマップ
         accessible_colors = [
             self.ACCESSIBLE_COLORS['orange'],
@@ -988,25 +1055,18 @@ class WordCloudGeneratorV2:
         }
         
     def load_available_fonts(self):
-        """利用可能フォント読み込み"""
-        font_list_path = self.fonts_dir / "font_list.json"
-        
-        if font_list_path.exists():
-            with open(font_list_path, 'r', encoding='utf-8') as f:
-                self.available_fonts = json.load(f)
-        else:
-            self.available_fonts = {
-                "default": {
-                    "name": "Default",
-                    "path": None,
-                    "description": "システムデフォルト"
-                }
-            }
+        """利用可能フォント読み込み（プロセス共有のフォントレジストリ）"""
+        from scripts.utils.font_registry import get_font_registry
         
-        logger.info(f"利用可能フォント数: {len(self.available_fonts)}")
+        self.font_registry = get_font_registry(self.fonts_dir)
+        self.available_fonts = self.font_registry.fonts
     
     def load_sample_texts(self):
         """実際のプロジェクトデータを読み込み"""
+        import pandas as pd
+        from scripts.utils.token_artifact import load_token_artifact
+        from scripts.utils.token_store import TokenStore
+        
         try:
             data_path = project_root / "data" / "processed" / "all_text_corpus.csv"
             if data_path.exists():
@@ -1040,6 +1100,19 @@ class WordCloudGeneratorV2:
                         "text": ""
                     }
                 }
+                
+                # 事前作成済みのトークンアーティファクトからトークンストアを作成
+                # （CSVが更新されていればここで一度だけ再作成される）
+                artifact = load_token_artifact(data_path, tokenizer=self.tokenizer)
+                self.token_store = TokenStore.from_artifact(artifact, self.tokenizer)
+                # 描画キャッシュのキーに含めるコーパスの版（CSV内容と解析エンジン）
+                self.corpus_version = f"{artifact.source_sha256}:{artifact.backend}"
+                self.source_categories = {
+                    "all_responses": None,
+                    "comments": ['感想文'],
+                    "q2_before": ['Q2理由_授業前'],
+                    "q2_after": ['Q2理由_授業後']
+                }
                 logger.info("実際のプロジェクトデータを読み込みました")
             else:
                 self._load_default_texts()
@@ -1049,6 +1122,8 @@ class WordCloudGeneratorV2:
     
     def _load_default_texts(self):
         """デフォルトのサンプルテキスト"""
+        from scripts.utils.token_store import TokenStore
+        
         self.sample_texts = {
             "science_education": {
                 "name": "科学教育（サンプル）",
@@ -1060,119 +1135,494 @@ class WordCloudGeneratorV2:
                 "text": ""
             }
         }
+        
+        self.token_store = TokenStore(self.tokenizer)
+        self.token_store.add_document(self.sample_texts['science_education']['text'], 'science_education')
+        self.corpus_version = f"default:{self.tokenizer.name}"
+        self.source_categories = {"science_education": None}
     
-    def tokenize_japanese(self, text, excluded_words=None):
-        """日本語テキストを単語に分割（除外単語を考慮）"""
-        # 除外単語セットを作成
-        stop_words = self.default_stop_words.copy()
-        if excluded_words:
-            stop_words.update(excluded_words)
-        
-        # 単語を抽出（名詞、動詞、形容詞、副詞のみ）
-        words = []
-        for token in self.tokenizer.tokenize(text):
-            part_of_speech = token.part_of_speech.split(',')[0]
-            if part_of_speech in ['名詞', '動詞', '形容詞', '副詞']:
-                # 基本形を取得
-                base_form = token.base_form
-                word = base_form if base_form != '*' else token.surface
-                
-                # 2文字以上かつストップワードでない単語のみを追加
-                if len(word) >= 2 and word not in stop_words:
-                    words.append(word)
-        return ' '.join(words)
+    def content_words(self, tokens):
+        """トークン列から内容語を抽出（ストップワード判定前、token_filter の設定に従う）"""
+        return [word for token in tokens for word in self.token_filter.candidates(token)]
     
-    def generate_wordcloud(self, config):
-        """ワードクラウド生成（固定パラメータ使用）"""
-        try:
-            # テキスト取得
-            text_key = config.get('text_source', 'all_responses')
-            if text_key == 'custom':
-                text = config.get('custom_text', '')
-            else:
-                text = self.sample_texts.get(text_key, {}).get('text', '')
-            
+    def encode_sources(self):
+        """テキストソースごとの内容語を単語ID配列に変換（起動時に一度だけ）"""
+        from scripts.utils.vocabulary import EncodedCorpus, Vocabulary
+        
+        self.vocabulary = Vocabulary()
+        self.encoded_sources = {
+            text_key: EncodedCorpus.from_word_lists(
+                ((sentence.text, self.content_words(sentence.tokens))
+                 for sentence in self.token_store.sentences(categories)),
+                self.vocabulary
+            )
+            for text_key, categories in self.source_categories.items()
+        }
+        # Word Tree 用の転置インデックスも起動時に作成
+        for corpus in self.encoded_sources.values():
+            corpus.index
+        logger.info(f"単語ID配列作成: 語彙数 {len(self.vocabulary)}")
+    
+    def excluded_mask(self, vocabulary, excluded_words=None):
+        """ストップワードと除外単語の語彙マスクを作成（ストップワード部分は語彙ごとにキャッシュ）"""
+        return self.token_filter.stop_mask(vocabulary, excluded_words)
+    
+    def get_source_corpus(self, config):
+        """テキストソースの文単位の単語ID配列を取得（除外語適用前）
+        
+        サンプルテキストは起動時に作成した単語ID配列を使用し、
+        カスタムテキストは前回から変更された文のみリクエスト時に形態素解析する。
+        
+        Returns:
+            EncodedCorpus。テキストが空の場合は None
+        """
+        from scripts.utils.vocabulary import EncodedCorpus
+        
+        text_key = config.get('text_source', 'all_responses')
+        if text_key == 'custom':
+            text = config.get('custom_text', '')
             if not text.strip():
+                return None
+            return EncodedCorpus.from_word_lists(
+                (sentence, self.content_words(tokens))
+                for sentence, tokens in self.sentence_cache.tokenize(text)
+            )
+        
+        text = self.sample_texts.get(text_key, {}).get('text', '')
+        if not text.strip() or text_key not in self.encoded_sources:
+            return None
+        return self.encoded_sources[text_key]
+    
+    def get_source_sentences(self, config, excluded_words=None):
+        """テキストソースを除外単語適用済みの単語ID配列として取得
+        
+        Returns:
+            除外単語を取り除いた EncodedCorpus。テキストが空の場合は None
+        """
+        corpus = self.get_source_corpus(config)
+        if corpus is None:
+            return None
+        return corpus.filtered(self.excluded_mask(corpus.vocabulary, excluded_words))
+    
+    def collect_excluded_words(self, config):
+        """リクエストの除外単語（カテゴリー＋カスタム）を集める"""
+        excluded_words = set()
+        for category in config.get('exclude_categories') or []:
+            if category in self.category_stop_words:
+                excluded_words.update(self.category_stop_words[category])
+        if config.get('custom_exclude_words'):
+            custom_words = [w.strip() for w in config.get('custom_exclude_words', '').split(',') if w.strip()]
+            excluded_words.update(custom_words)
+        return excluded_words
+    
+    def layout_engine(self, config):
+        """リクエストの単語配置エンジン（未対応の指定は既定のエンジン）"""
+        from scripts.utils.wordcloud_layout import LAYOUT_ENGINES
+        
+        engine = config.get('layout_engine', self.DEFAULT_LAYOUT_ENGINE)
+        return engine if engine in LAYOUT_ENGINES else self.DEFAULT_LAYOUT_ENGINE
+    
+    def preview_options(self, config):
+        """プレビュー描画の設定（プレビューでなければ None）"""
+        if not config.get('preview'):
+            return None
+        return {
+            'scale': self.PREVIEW_SCALE,
+            'time_budget': self.PREVIEW_TIME_BUDGET,
+            'encode': self.PREVIEW_ENCODE_OPTIONS,
+        }
+    
+    def layout_plan(self, config, excluded_words=None):
+        """配置に効く設定（色・画像形式を除く）と差分再配置の元にする配置
+        
+        config['incremental_from'] に前回の配置キーがあり、その配置と除外単語以外の設定が同じで
+        除外単語が増えただけの場合は、前回の配置を元に差分再配置する
+        （前回の配置キーを設定に含め、同じ経過をたどった配置は同じキーになる）。
+        
+        Returns:
+            (配置設定, 差分再配置の元にする WordCloud または None)
+        """
+        if excluded_words is None:
+            excluded_words = self.collect_excluded_words(config)
+        text_key = config.get('text_source', 'all_responses')
+        layout_config = {
+            'renderer': self.RENDER_VERSION,
+            'corpus_version': self.corpus_version,
+            'text_source': text_key,
+            'excluded_words': sorted(excluded_words),
+            'font': self.available_fonts.get(config.get('font', 'default'), {}).get('path'),
+            'width': int(config.get('width', 1000)),
+            'height': int(config.get('height', 600)),
+            'layout_engine': self.layout_engine(config),
+            'fixed_params': self.FIXED_PARAMS,
+            'random_state': self.RANDOM_STATE,
+        }
+        if text_key == 'custom':
+            custom_text = config.get('custom_text', '')
+            layout_config['custom_text'] = hashlib.sha256(custom_text.encode('utf-8')).hexdigest()
+        
+        base_key = config.get('incremental_from')
+        base = self.layout_cache.peek(base_key) if isinstance(base_key, str) else None
+        if base is None:
+            return layout_config, None
+        base_wordcloud, base_config = base
+        ignored = ('excluded_words', 'incremental_from')
+        keys = (set(base_config) | set(layout_config)) - set(ignored)
+        if (any(base_config.get(k) != layout_config.get(k) for k in keys)
+                or not set(base_config['excluded_words']) <= set(excluded_words)):
+            return layout_config, None
+        if set(base_config['excluded_words']) == set(excluded_words):
+            # 除外単語が同じなら前回の配置そのもの
+            return dict(base_config), None
+        layout_config['incremental_from'] = base_key
+        return layout_config, base_wordcloud
+    
+    def layout_key(self, config, excluded_words=None):
+        """配置キャッシュのキー（カラーマップだけが違う設定は同じキー）"""
+        from scripts.utils.render_cache import config_key
+        
+        return config_key(self.layout_plan(config, excluded_words)[0])
+    
+    def colormap_name(self, config):
+        """リクエストのカラーマップ名（未対応の指定は accessible_three）"""
+        colormap_name = config.get('colormap', 'accessible_three')
+        return colormap_name if colormap_name in self.custom_colormaps else 'accessible_three'
+    
+    def render_key(self, config, excluded_words=None, preview=False, layout_config=None):
+        """描画結果キャッシュのキー（実際に描画に効く設定のみの正規化ハッシュ）"""
+        from scripts.utils.render_cache import config_key
+        from scripts.utils.wordcloud_renderer import normalize_format
+        
+        if layout_config is None:
+            layout_config = self.layout_plan(config, excluded_words)[0]
+        effective_config = dict(layout_config)
+        effective_config['colormap'] = self.colormap_name(config)
+        effective_config['image_format'] = normalize_format(config.get('image_format'))
+        if effective_config['image_format'] == 'json':
+            # 配置データにはフォントキーが入る（同じフォントファイルでもキーが違えば別の応答）
+            effective_config['font_key'] = config.get('font', 'default')
+        if preview:
+            effective_config['preview'] = [self.PREVIEW_SCALE, self.PREVIEW_TIME_BUDGET,
+                                           self.PREVIEW_ENCODE_OPTIONS]
+        return config_key(effective_config)
+    
+    def render_wordcloud(self, config):
+        """ワードクラウド画像を取得（描画結果キャッシュ・配置キャッシュを使用）
+        
+        描画した画像はキャッシュキーで /api/images/<key> から配信できる。
+        カラーマップだけが違う設定は配置キャッシュの配置を再着色してエンコードする。
+        incremental_from（前回の配置キー）を指定して単語を除外した場合は、
+        残った単語の位置を保ったまま空いた場所だけを埋める。
+        config['preview'] が真の場合は縮小したプレビューを描画する
+        （最終描画・配置がキャッシュ済み、または差分再配置できる場合は最終描画を返す）。
+        
+        Returns:
+            (キャッシュキー, エンコード済み画像, エラーメッセージ, 配置キー)
+            配置キーは次の incremental_from に使える（プレビューの場合は None）
+        """
+        from scripts.utils.render_cache import config_key
+        
+        excluded_words = self.collect_excluded_words(config)
+        layout_config, base_wordcloud = self.layout_plan(config, excluded_words)
+        layout_key = config_key(layout_config)
+        key = self.render_key(config, layout_config=layout_config)
+        cached = self.render_cache.lookup(key)
+        if cached is not None:
+            return key, cached.data, None, layout_key
+        
+        # 同じ設定の同時リクエスト（授業開始時の一斉アクセスなど）は1回の描画にまとめる
+        flight_key = f"wordcloud:{key}:{'preview' if config.get('preview') else 'final'}"
+        return self.single_flight.do(flight_key, lambda: self._render_uncached(
+            config, excluded_words, layout_config, base_wordcloud, key, layout_key))
+    
+    def _render_uncached(self, config, excluded_words, layout_config, base_wordcloud, key, layout_key):
+        """描画結果キャッシュにない画像を配置キャッシュから、または配置して描画（戻り値は render_wordcloud と同じ）"""
+        from scripts.utils.wordcloud_renderer import mime_type
+        
+        image_type = mime_type(config.get('image_format'))
+        entry = self.layout_cache.get(layout_key)
+        if entry is not None:
+            image = self.encode_layout(entry[0], config)
+            self.render_cache.put(key, image, image_type)
+            return key, image, None, layout_key
+        
+        # 差分再配置は十分速いのでプレビューを省略する
+        preview = self.preview_options(config) if base_wordcloud is None else None
+        if preview is not None:
+            key = self.render_key(config, preview=True, layout_config=layout_config)
+            cached = self.render_cache.lookup(key)
+            if cached is not None:
+                return key, cached.data, None, None
+        
+        # 非同期ジョブとして実行中に新しいリクエストで置き換えられた場合はここで中断する
+        raise_if_cancelled()
+        wordcloud, error = self.layout_wordcloud(config, excluded_words, preview, base_wordcloud)
+        if wordcloud is None:
+            return key, None, error, None
+        raise_if_cancelled()
+        if preview is None:
+            # 時間予算で打ち切ったプレビューの配置は再利用しない
+            self.layout_cache.put(layout_key, (wordcloud, layout_config))
+        image = self.encode_layout(wordcloud, config, preview)
+        self.render_cache.put(key, image, image_type)
+        return key, image, None, None if preview else layout_key
+    
+    def layout_wordcloud(self, config, excluded_words, preview=None, base_wordcloud=None):
+        """単語を配置した WordCloud を作成（色は encode_layout で付ける）
+        
+        preview（preview_options の戻り値）を指定すると、同じシードで時間予算内に配置できた
+        上位の単語のみを配置する（最終描画の同じ単語と同じ位置・向き・大きさ）。
+        base_wordcloud を指定すると、その配置に残る単語を固定して空いた場所だけを埋める
+        （配置エンジンの指定によらずセル格子の配置エンジンで埋める）。
+        
+        Returns:
+            (WordCloud, エラーメッセージ)
+        """
+        from scripts.utils.wordcloud_layout import create_wordcloud
+        
+        try:
+            frequencies = self.layout_frequencies(config, excluded_words)
+            if frequencies is None:
                 return None, "テキストが空です"
-            
-            # 除外単語の収集
-            excluded_words = set()
-            if config.get('exclude_categories'):
-                for category in config.get('exclude_categories', []):
-                    if category in self.category_stop_words:
-                        excluded_words.update(self.category_stop_words[category])
-            
-            # カスタム除外単語を追加
-            if config.get('custom_exclude_words'):
-                custom_words = [w.strip() for w in config.get('custom_exclude_words', '').split(',') if w.strip()]
-                excluded_words.update(custom_words)
-            
-            # 日本語テキストを単語に分割（除外単語を適用）
-            tokenized_text = self.tokenize_japanese(text, excluded_words)
-            
-            # フォント設定
-            font_key = config.get('font', 'default')
-            font_info = self.available_fonts.get(font_key, {})
-            font_path = font_info.get('path')
-            
-            # 相対パスを絶対パスに変換
-            if font_path and not Path(font_path).is_absolute():
-                font_path = str(project_root / font_path)
-            
-            # カラーマップを選択（アクセシブルカラーマップのみ）
-            colormap_name = config.get('colormap', 'accessible_three')
-            colormap = self.custom_colormaps.get(colormap_name, self.accessible_colormap)
-            
-            # 固定パラメータを使用したワードクラウド設定
-            wordcloud_config = {
-                'width': config.get('width', 1000),
-                'height': config.get('height', 600),
-                'background_color': self.FIXED_PARAMS['background_color'],
-                'max_words': self.FIXED_PARAMS['max_words'],
-                'colormap': colormap,
-                'relative_scaling': self.FIXED_PARAMS['relative_scaling'],
-                'min_font_size': self.FIXED_PARAMS['min_font_size'],
-                'max_font_size': self.FIXED_PARAMS['max_font_size'],
-                'prefer_horizontal': self.FIXED_PARAMS['prefer_horizontal'],
-                'collocations': False,
-                'regexp': r'[\w]+',
-                'include_numbers': False,
-                'normalize_plurals': False,
-                'stopwords': set()  # 既に除外処理済みなので空セット
-            }
-            
-            if font_path:
-                wordcloud_config['font_path'] = font_path
+            wordcloud_config = self.wordcloud_params(config)
             
             # ワードクラウド生成
-            wordcloud = WordCloud(**wordcloud_config).generate(tokenized_text)
-            
-            # 画像変換
-            plt.figure(figsize=(12, 6))
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
-            plt.tight_layout(pad=0)
-            
-            # Base64エンコード
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
-            img_buffer.seek(0)
-            plt.close()
-            
-            img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-            
-            return img_base64, None
+            if base_wordcloud is not None:
+                wordcloud = create_wordcloud('numpy', **wordcloud_config)
+                return wordcloud.generate_incremental(frequencies, base_wordcloud), None
+            time_budget = preview['time_budget'] if preview else None
+            wordcloud = create_wordcloud(self.layout_engine(config), time_budget=time_budget,
+                                         **wordcloud_config)
+            return wordcloud.generate_from_frequencies(frequencies), None
             
         except Exception as e:
             logger.error(f"ワードクラウド生成エラー: {e}")
             return None, str(e)
+    
+    def layout_frequencies(self, config, excluded_words):
+        """単語ID配列から頻度を集計（除外単語を適用、数字のみの語は除く。テキストが空なら None）"""
+        corpus = self.get_source_sentences(config, excluded_words)
+        if corpus is None:
+            return None
+        return {word: count for word, count in corpus.frequencies().items()
+                if not word.isdigit()}
+    
+    def wordcloud_params(self, config):
+        """固定パラメータを使用したワードクラウド設定
+        
+        random_state 固定で同じ設定から同じ配置を作り、キャッシュ結果を有効に保つ。
+        フォントオブジェクト・文字列寸法はレジストリでキャッシュする。
+        """
+        wordcloud_config = {
+            'width': int(config.get('width', 1000)),
+            'height': int(config.get('height', 600)),
+            'background_color': self.FIXED_PARAMS['background_color'],
+            'max_words': self.FIXED_PARAMS['max_words'],
+            'relative_scaling': self.FIXED_PARAMS['relative_scaling'],
+            'min_font_size': self.FIXED_PARAMS['min_font_size'],
+            'max_font_size': self.FIXED_PARAMS['max_font_size'],
+            'prefer_horizontal': self.FIXED_PARAMS['prefer_horizontal'],
+            'random_state': self.RANDOM_STATE
+        }
+        
+        font_path = self.font_registry.resolve_path(config.get('font', 'default'))
+        if font_path:
+            wordcloud_config['font_path'] = font_path
+        return wordcloud_config
+    
+    def encode_layout(self, wordcloud, config, preview=None):
+        """配置済み WordCloud をリクエストのカラーマップで着色してエンコード
+        
+        色は配置とは別の乱数列（RANDOM_STATE）で付けるため、配置を作り直した場合も
+        キャッシュした配置を再着色した場合も同じ画像になる。
+        """
+        from scripts.utils.wordcloud_renderer import encode_wordcloud
+        
+        colormap = self.custom_colormaps[self.colormap_name(config)]
+        # キャッシュ共有の配置は変更せず、複製を着色する
+        colored = copy.copy(wordcloud).recolor(random_state=self.RANDOM_STATE, colormap=colormap)
+        
+        # 画像エンコード（matplotlib を経由せず直接エンコード、json は配置データのみ）
+        font_key = config.get('font', 'default')
+        if preview:
+            return encode_wordcloud(colored, image_format=config.get('image_format'),
+                                    scale=preview['scale'], font_key=font_key, **preview['encode'])
+        return encode_wordcloud(colored, image_format=config.get('image_format'), font_key=font_key)
+    
+    def prepare_batch(self, configs):
+        """一括生成の準備（描画済み・配置済みの設定は画像に、それ以外は描画ジョブにする）
+        
+        同じテキストソース・除外単語の設定は単語頻度を一度だけ集計する。
+        描画ジョブはワーカープロセスで render_wordcloud と同じ画像を描画する
+        （プレビュー・差分再配置の指定は無視して最終描画のみ）。
+        
+        Returns:
+            設定ごとの項目（name, key と image / job / error のいずれか）のリスト
+        """
+        from scripts.utils.batch_renderer import RenderJob
+        from scripts.utils.render_cache import config_key
+        from scripts.utils.wordcloud_renderer import mime_type, normalize_format
+        
+        entries = []
+        frequencies_by_source = {}
+        names = set()
+        for index, config in enumerate(configs):
+            config = {k: v for k, v in config.items() if k not in ('preview', 'incremental_from')}
+            image_format = normalize_format(config.get('image_format'))
+            name = self.batch_entry_name(config.get('name'), index, image_format, names)
+            excluded_words = self.collect_excluded_words(config)
+            layout_config, _ = self.layout_plan(config, excluded_words)
+            key = self.render_key(config, layout_config=layout_config)
+            entry = {'name': name, 'key': key}
+            entries.append(entry)
+            
+            cached = self.render_cache.lookup(key)
+            if cached is not None:
+                entry['image'] = cached.data
+                continue
+            layout = self.layout_cache.get(config_key(layout_config))
+            if layout is not None:
+                entry['image'] = self.encode_layout(layout[0], config)
+                self.render_cache.put(key, entry['image'], mime_type(image_format))
+                continue
+            
+            source = (layout_config['text_source'], layout_config.get('custom_text'),
+                      tuple(layout_config['excluded_words']))
+            if source not in frequencies_by_source:
+                frequencies_by_source[source] = self.layout_frequencies(config, excluded_words)
+            frequencies = frequencies_by_source[source]
+            if frequencies is None:
+                entry['error'] = "テキストが空です"
+                continue
+            entry['job'] = RenderJob(name, frequencies, self.wordcloud_params(config),
+                                     layout_engine=self.layout_engine(config),
+                                     colormap=self.custom_colormaps[self.colormap_name(config)],
+                                     color_seed=self.RANDOM_STATE,
+                                     encode={'font_key': config.get('font', 'default')})
+        return entries
+    
+    def batch_entry_name(self, name, index, image_format, used_names):
+        """一括生成の出力ファイル名（パスは除き、拡張子は画像形式に合わせ、重複には連番を付ける）"""
+        stem = Path(str(name)).stem if name else ''
+        stem = stem or f'wordcloud_{index + 1:02d}'
+        candidate = f'{stem}.{image_format}'
+        number = 2
+        while candidate in used_names:
+            candidate = f'{stem}_{number}.{image_format}'
+            number += 1
+        used_names.add(candidate)
+        return candidate
+    
+    def render_batch(self, entries):
+        """prepare_batch の項目を描画し、(項目, 画像) を完了した順に返す（描画結果はキャッシュに登録）"""
+        from scripts.utils.batch_renderer import render_batch
+        from scripts.utils.wordcloud_renderer import mime_type
+        
+        for entry in entries:
+            if 'image' in entry:
+                yield entry, entry['image']
+        
+        pending = {entry['job'].name: entry for entry in entries if 'job' in entry}
+        jobs = [entry['job'] for entry in pending.values()]
+        for job, image in render_batch(jobs, n_jobs=self.batch_n_jobs, config_path=self.config_path):
+            entry = pending[job.name]
+            self.render_cache.put(entry['key'], image, mime_type(job.image_format))
+            yield entry, image
 
-# グローバルインスタンス
-generator = WordCloudGeneratorV2()
-difference_generator = DifferenceWordCloudGenerator(generator)
-word_tree_generator = WordTreeGenerator(generator)
-cooccurrence_generator = CooccurrenceNetworkGenerator(generator)
+class AppState:
+    """ジェネレータ群の初期化状態
+    
+    トークナイザ・トークンストアを含むジェネレータ群をバックグラウンドスレッドで作成し、
+    完了するまで生成APIは待機する（準備状況は /api/ready で確認）。
+    """
+    
+    def __init__(self):
+        self.ready = threading.Event()
+        self.error = None
+        self.generator = None
+        self.difference_generator = None
+        self.word_tree_generator = None
+        self.cooccurrence_generator = None
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """バックグラウンド初期化を開始（2回目以降は何もしない）"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._initialize, name='app-v2-init', daemon=True)
+                self._thread.start()
+        return self
+    
+    def _initialize(self):
+        """ジェネレータ群を作成"""
+        try:
+            with boot_phase('generators'):
+                generator = WordCloudGeneratorV2()
+                self.difference_generator = DifferenceWordCloudGenerator(generator)
+                self.word_tree_generator = WordTreeGenerator(generator)
+                self.cooccurrence_generator = CooccurrenceNetworkGenerator(generator)
+                self.generator = generator
+            boot_timings['ready'] = round(time.perf_counter() - _boot_started, 3)
+            logger.info(f"初期化完了: 起動から {boot_timings['ready']:.3f}秒")
+        except Exception as e:
+            logger.error(f"初期化エラー: {e}")
+            self.error = e
+        finally:
+            self.ready.set()
+        
+        # 初回リクエストの待ち時間を減らすため描画系モジュールを先読み
+        if self.error is None:
+            with boot_phase('warm_imports'):
+                load_figure_classes()
+                import wordcloud  # noqa: F401
+                import networkx  # noqa: F401
+    
+    def wait(self, timeout=None):
+        """初期化完了まで待機して自身を返す"""
+        self.start()
+        if not self.ready.wait(timeout):
+            raise TimeoutError("初期化が完了していません")
+        if self.error is not None:
+            raise RuntimeError(f"初期化に失敗しました: {self.error}")
+        return self
+
+    def preload(self, server_workers=1):
+        """ワーカープロセスを fork する前に初期化・モジュール先読みまで完了させる
+
+        初期化スレッドの終了まで待ち（fork 後の子プロセスにはスレッドが引き継がれないため）、
+        読み込んだコーパス・辞書・フォント等を gc.freeze で GC の追跡対象から外して、
+        ワーカー間で copy-on-write のまま共有されるようにする。
+        一括生成の描画プロセス数は CPU コアを server_workers で分けた数に制限する。
+        """
+        import gc
+        from scripts.utils.batch_renderer import batch_n_jobs
+
+        self.wait()
+        self._thread.join()
+        self.generator.batch_n_jobs = batch_n_jobs(server_workers, self.generator.config_path)
+        gc.collect()
+        gc.freeze()
+        logger.info(f"事前読み込み完了: 共有オブジェクト数 {gc.get_freeze_count()}")
+        return self
+
+
+# グローバル状態（インポート時にバックグラウンド初期化を開始。一括描画のワーカープロセスが
+# __mp_main__ として読み込む場合は初期化しない）
+app_state = AppState()
+if __name__ != '__mp_main__':
+    app_state.start()
+# 描画ジョブキュー（設定ファイル performance.jobs）
+job_queue = JobQueue.from_config(project_root / "config" / "analysis_config.yaml")
+
+@app.route('/api/ready')
+def get_ready():
+    """準備状況（初期化完了まで 503）と起動フェーズごとの所要時間"""
+    if not app_state.ready.is_set():
+        return jsonify({'ready': False, 'timings': boot_timings}), 503
+    if app_state.error is not None:
+        return jsonify({'ready': False, 'error': str(app_state.error), 'timings': boot_timings}), 500
+    return jsonify({'ready': True, 'timings': boot_timings})
 
 @app.route('/')
 def index():
@@ -1182,57 +1632,249 @@ def index():
 @app.route('/api/fonts')
 def get_fonts():
     """利用可能フォント一覧取得"""
+    generator = app_state.wait().generator
     return jsonify({
         'fonts': generator.available_fonts,
         'count': len(generator.available_fonts)
     })
 
+@app.route('/api/fonts/<font_key>/file')
+def get_font_file(font_key):
+    """フォントファイルの配信（配置データ形式の応答をブラウザ側で描画するため）
+    
+    フォントキーの指定がない・パスのないフォントは WordCloud 既定のフォントを返す
+    （配置時と同じフォント）。
+    """
+    from wordcloud.wordcloud import FONT_PATH
+    
+    generator = app_state.wait().generator
+    if font_key != 'default' and font_key not in generator.available_fonts:
+        return jsonify({
+            'success': False,
+            'error': 'フォントが見つかりません'
+        }), 404
+    
+    font_path = generator.font_registry.resolve_path(font_key) or FONT_PATH
+    if not Path(font_path).exists():
+        return jsonify({
+            'success': False,
+            'error': 'フォントファイルがありません'
+        }), 404
+    mimetype = FONT_MIME_TYPES.get(Path(font_path).suffix.lower(), 'application/octet-stream')
+    return send_file(font_path, mimetype=mimetype, max_age=IMAGE_MAX_AGE, conditional=True)
+
 @app.route('/api/sample-texts')
 def get_sample_texts():
     """サンプルテキスト一覧取得"""
+    generator = app_state.wait().generator
     return jsonify({
         'texts': generator.sample_texts
     })
 
+def wordcloud_etags(generator, config):
+    """ワードクラウド設定の ETag（プレビュー指定時は最終描画・プレビューの両方）"""
+    etags = [generator.render_key(config)]
+    if config.get('preview'):
+        etags.append(generator.render_key(config, preview=True))
+    return etags
+
+def stored_render_key(kind, config):
+    """差分ワードクラウド・共起ネットワークの描画結果キャッシュキー（設定・コーパス・描画処理の版のハッシュ）"""
+    from scripts.utils.render_cache import config_key
+    
+    generator = app_state.wait().generator
+    return config_key({
+        'type': kind,
+        'renderer': generator.RENDER_VERSION,
+        'corpus_version': generator.corpus_version,
+        'config': config,
+    })
+
+def request_etags(kind, config):
+    """描画の種類・設定に対応する ETag（画像のない word_tree は空）"""
+    if kind == 'wordcloud':
+        return wordcloud_etags(app_state.wait().generator, config)
+    if kind in ('difference', 'cooccurrence'):
+        return [stored_render_key(kind, config)]
+    return []
+
+def not_modified_response(kind, config):
+    """If-None-Match が描画済みの ETag と一致すれば 304 応答（なければ None）"""
+    for etag in request_etags(kind, config):
+        if etag in request.if_none_match:
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+    return None
+
+def layout_fields(image, image_format):
+    """配置データ形式（image_format: json）の場合に応答へ含める配置（画像形式なら空）"""
+    from scripts.utils.wordcloud_renderer import normalize_format
+    
+    if normalize_format(image_format) != 'json':
+        return {}
+    return {'layout': json.loads(image)}
+
+def public_payload(payload):
+    """描画結果の応答内容（画像キーを画像URLに、配置データのフォントをフォントURLに置き換え）
+    
+    Returns:
+        (応答内容, 画像キー)
+    """
+    payload = dict(payload)
+    key = payload.pop('image_key', None)
+    if key is not None:
+        payload['image_url'] = url_for('get_image', key=key)
+    if 'layout' in payload:
+        payload['font_url'] = url_for('get_font_file', font_key=payload['layout']['font'] or 'default')
+    return payload, key
+
+def image_response(payload, status):
+    """描画結果の JSON 応答（画像キーを画像URLに置き換え、ETag に設定）"""
+    payload, key = public_payload(payload)
+    response = jsonify(payload)
+    response.status_code = status
+    if key is not None:
+        response.set_etag(key)
+    return response
+
+def wordcloud_payload(config):
+    """ワードクラウドを描画して (応答内容, ステータスコード) を返す（画像は image_key で参照）"""
+    from scripts.utils.wordcloud_renderer import mime_type
+    
+    generator = app_state.wait().generator
+    key, image, error, layout_key = generator.render_wordcloud(config)
+    
+    if error:
+        return {
+            'success': False,
+            'error': error
+        }, 400
+    
+    return {
+        'success': True,
+        'image_key': key,
+        'mime_type': mime_type(config.get('image_format')),
+        'preview': layout_key is None,
+        'layout_key': layout_key,
+        **layout_fields(image, config.get('image_format')),
+        'config': config,
+        'fixed_params': generator.FIXED_PARAMS
+    }, 200
+
 @app.route('/api/generate', methods=['POST'])
 def generate_wordcloud():
-    """ワードクラウド生成API"""
+    """ワードクラウド生成API
+    
+    画像は /api/images/<key> で配信し、JSON には画像URLのみを含める。
+    同じ設定の再描画は描画結果キャッシュから返し、If-None-Match が一致すれば 304 を返す。
+    preview: true の場合は縮小プレビューを返す（最終描画済みならその画像、JSON の preview で区別）。
+    incremental_from に前回の layout_key を指定すると、除外で消えた単語の場所だけを埋め直す。
+    image_format: 'json' の場合は画像を描画せず、配置データ（単語・文字サイズ・位置・向き・色）を
+    layout に、単語のフォントを font_url に含めて返す（ブラウザ側で canvas に描画）。
+    """
     try:
         config = request.json
         
-        img_base64, error = generator.generate_wordcloud(config)
+        not_modified = not_modified_response('wordcloud', config)
+        if not_modified is not None:
+            return not_modified
+        
+        return image_response(*wordcloud_payload(config))
         
-        if error:
+    except Exception as e:
+        logger.error(f"API エラー: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/generate-batch', methods=['POST'])
+def generate_wordcloud_batch():
+    """ワードクラウド一括生成API（ZIP をストリーミングで返す）
+    
+    configs に /api/generate と同じ形式の設定を並べる（name で ZIP 内のファイル名を指定可能）。
+    単語頻度の集計は同じテキストソース・除外単語ごとに一度だけ行い、配置・描画はプロセス並列で
+    実行して完了した順に ZIP に追加する。最後に各設定のキャッシュキー・エラーを manifest.json に書く。
+    """
+    from scripts.utils.batch_renderer import iter_zip
+    
+    try:
+        configs = (request.json or {}).get('configs')
+        generator = app_state.wait().generator
+        if (not isinstance(configs, list) or not configs
+                or not all(isinstance(config, dict) for config in configs)):
             return jsonify({
                 'success': False,
-                'error': error
+                'error': 'configs に設定のリストを指定してください'
+            }), 400
+        if len(configs) > generator.MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'一度に生成できるのは{generator.MAX_BATCH_SIZE}件までです'
             }), 400
         
-        return jsonify({
-            'success': True,
-            'image': img_base64,
-            'config': config,
-            'fixed_params': generator.FIXED_PARAMS
-        })
+        entries = generator.prepare_batch(configs)
         
     except Exception as e:
-        logger.error(f"API エラー: {e}")
+        logger.error(f"一括生成 API エラー: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+    
+    def archive_entries():
+        for entry, image in generator.render_batch(entries):
+            yield entry['name'], image
+        manifest = [{'name': entry['name'], 'key': entry['key'], 'error': entry.get('error')}
+                    for entry in entries]
+        yield 'manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    response = app.response_class(iter_zip(archive_entries()), mimetype='application/zip')
+    response.headers['Content-Disposition'] = 'attachment; filename=wordclouds.zip'
+    return response
+
+@app.route('/api/stats')
+def get_stats():
+    """キャッシュ・同時リクエスト集約・ジョブキューの利用状況"""
+    generator = app_state.wait().generator
+    return jsonify({
+        'render_cache': generator.render_cache.stats(),
+        'layout_cache': generator.layout_cache.stats(),
+        'single_flight': generator.single_flight.stats(),
+        'jobs': job_queue.stats(),
+        'fonts': generator.font_registry.cache_info(),
+    })
+
+@app.route('/api/images/<key>')
+def get_image(key):
+    """描画済み画像の配信（キーは設定または画像内容のハッシュなので内容は不変）"""
+    image = app_state.wait().generator.render_cache.get(key)
+    if image is None:
+        return jsonify({
+            'success': False,
+            'error': '画像が見つかりません（再生成してください）'
+        }), 404
+    
+    response = app.response_class(image.data, mimetype=image.mime_type)
+    response.set_etag(key)
+    response.cache_control.public = True
+    response.cache_control.max_age = IMAGE_MAX_AGE
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
 
 @app.route('/api/fixed-params')
 def get_fixed_params():
     """固定パラメータ取得"""
     return jsonify({
-        'fixed_params': generator.FIXED_PARAMS,
-        'accessible_colors': generator.ACCESSIBLE_COLORS
+        'fixed_params': WordCloudGeneratorV2.FIXED_PARAMS,
+        'accessible_colors': WordCloudGeneratorV2.ACCESSIBLE_COLORS
     })
 
 @app.route('/api/stop-words')
 def get_stop_words():
     """除外可能な単語カテゴリー取得"""
+    generator = app_state.wait().generator
     return jsonify({
         'categories': {
             'general': {
@@ -1274,7 +1916,7 @@ def export_config():
         
         # 固定パラメータも含めてエクスポート
         full_config = config.copy()
-        full_config['fixed_params'] = generator.FIXED_PARAMS
+        full_config['fixed_params'] = WordCloudGeneratorV2.FIXED_PARAMS
         full_config['version'] = 'v2_accessible'
         
         # 設定をJSONファイルとして保存
@@ -1302,28 +1944,80 @@ def export_config():
             'error': str(e)
         }), 500
 
+def stored_render(kind, config, render, image_type):
+    """設定キーで描画結果キャッシュを検索し、なければ描画して保存
+    
+    画像は設定キー、統計情報は設定キーから導いたキーで保存する（同じ設定の再リクエストは
+    集計・配置・描画を省略し、他のワーカープロセスが描画した結果も使う）。
+    
+    Args:
+        kind: 描画の種類（difference / cooccurrence）
+        config: リクエストの設定
+        render: render(config) → (エンコード済み画像, エラーメッセージ, 統計情報)
+        image_type: 画像の Content-Type
+    
+    Returns:
+        (画像キー, エンコード済み画像, エラーメッセージ, 統計情報)
+    """
+    from scripts.utils.render_cache import config_key
+    
+    render_cache = app_state.wait().generator.render_cache
+    key = stored_render_key(kind, config)
+    statistics_key = config_key({'statistics': key})
+    cached = render_cache.lookup(key)
+    cached_statistics = render_cache.get(statistics_key) if cached is not None else None
+    if cached_statistics is not None:
+        return key, cached.data, None, json.loads(cached_statistics.data)
+    
+    image, error, statistics = render(config)
+    if error:
+        return None, None, error, statistics
+    render_cache.put(key, image, image_type)
+    render_cache.put(statistics_key, json.dumps(statistics, ensure_ascii=False).encode('utf-8'),
+                     'application/json')
+    return key, image, None, statistics
+
+def difference_payload(config):
+    """差分ワードクラウドを描画して (応答内容, ステータスコード) を返す（同じ設定は描画結果キャッシュから）"""
+    from scripts.utils.wordcloud_renderer import mime_type
+    
+    state = app_state.wait()
+    image_type = mime_type(config.get('image_format'))
+    key, image, error, statistics = stored_render(
+        'difference', config, state.difference_generator.generate_difference_wordcloud, image_type)
+    
+    if error:
+        return {
+            'success': False,
+            'error': error,
+            'statistics': statistics
+        }, 400
+    
+    return {
+        'success': True,
+        'image_key': key,
+        'mime_type': image_type,
+        'preview': bool(config.get('preview')),
+        **layout_fields(image, config.get('image_format')),
+        'config': config,
+        'statistics': statistics,
+        'type': 'difference'
+    }, 200
+
 @app.route('/api/difference-generate', methods=['POST'])
 def generate_difference_wordcloud():
-    """差分ワードクラウド生成API"""
+    """差分ワードクラウド生成API（image_format: 'json' の場合は /api/generate と同じく配置データを返す）
+    
+    If-None-Match が同じ設定の描画済み画像の ETag と一致すれば 304 を返す。
+    """
     try:
         config = request.json
         
-        img_base64, error, statistics = difference_generator.generate_difference_wordcloud(config)
+        not_modified = not_modified_response('difference', config)
+        if not_modified is not None:
+            return not_modified
         
-        if error:
-            return jsonify({
-                'success': False,
-                'error': error,
-                'statistics': statistics
-            }), 400
-        
-        return jsonify({
-            'success': True,
-            'image': img_base64,
-            'config': config,
-            'statistics': statistics,
-            'type': 'difference'
-        })
+        return image_response(*difference_payload(config))
         
     except Exception as e:
         logger.error(f"差分API エラー: {e}")
@@ -1336,6 +2030,7 @@ def generate_difference_wordcloud():
 @app.route('/api/difference-colormaps')
 def get_difference_colormaps():
     """差分用カラーマップ取得"""
+    difference_generator = app_state.wait().difference_generator
     return jsonify({
         'colormaps': list(difference_generator.difference_colormaps.keys()),
         'colors': difference_generator.difference_colors
@@ -1344,31 +2039,36 @@ def get_difference_colormaps():
 @app.route('/api/science-terms')
 def get_science_terms():
     """科学用語リスト取得"""
+    difference_generator = app_state.wait().difference_generator
     return jsonify({
         'science_terms': difference_generator.science_terms
     })
 
+def word_tree_payload(config):
+    """Word Tree を作成して (応答内容, ステータスコード) を返す"""
+    word_tree_generator = app_state.wait().word_tree_generator
+    trees, error, statistics = word_tree_generator.generate_word_tree_data(config)
+    
+    if error:
+        return {
+            'success': False,
+            'error': error,
+            'statistics': statistics
+        }, 400
+    
+    return {
+        'success': True,
+        'trees': trees,
+        'statistics': statistics,
+        'type': 'word_tree'
+    }, 200
+
 @app.route('/api/word-tree-generate', methods=['POST'])
 def generate_word_tree():
     """Word Tree生成API"""
     try:
-        config = request.json
-        
-        trees, error, statistics = word_tree_generator.generate_word_tree_data(config)
-        
-        if error:
-            return jsonify({
-                'success': False,
-                'error': error,
-                'statistics': statistics
-            }), 400
-        
-        return jsonify({
-            'success': True,
-            'trees': trees,
-            'statistics': statistics,
-            'type': 'word_tree'
-        })
+        payload, status = word_tree_payload(request.json)
+        return jsonify(payload), status
         
     except Exception as e:
         logger.error(f"Word Tree API エラー: {e}")
@@ -1381,6 +2081,7 @@ def generate_word_tree():
 @app.route('/api/recommended-roots')
 def get_recommended_roots():
     """推奨ルート語取得"""
+    word_tree_generator = app_state.wait().word_tree_generator
     return jsonify({
         'recommended_roots': word_tree_generator.recommended_roots
     })
@@ -1414,37 +2115,133 @@ def get_network_layouts():
         }
     })
 
+def cooccurrence_payload(config):
+    """共起ネットワーク画像を描画して (応答内容, ステータスコード) を返す（同じ設定は描画結果キャッシュから）"""
+    state = app_state.wait()
+    key, image, error, statistics = stored_render(
+        'cooccurrence', config, state.cooccurrence_generator.generate_cooccurrence_image, 'image/png')
+    
+    if error:
+        return {
+            'success': False,
+            'error': error,
+            'statistics': statistics
+        }, 400
+    
+    return {
+        'success': True,
+        'image_key': key,
+        'mime_type': 'image/png',  # wordcloudと同じフォーマット
+        'statistics': statistics,
+        'config': config,
+        'type': 'cooccurrence_network'
+    }, 200
+
 @app.route('/api/cooccurrence-generate', methods=['POST'])
 def generate_cooccurrence_network():
-    """共起ネットワーク画像生成API（wordcloudと同じインターフェース）"""
+    """共起ネットワーク画像生成API（wordcloudと同じインターフェース、If-None-Match が一致すれば 304）"""
     try:
         config = request.json
         
-        img_base64, error, statistics = cooccurrence_generator.generate_cooccurrence_image(config)
+        not_modified = not_modified_response('cooccurrence', config)
+        if not_modified is not None:
+            return not_modified
         
-        if error:
+        return image_response(*cooccurrence_payload(config))
+        
+    except Exception as e:
+        logger.error(f"共起ネットワーク API エラー: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'statistics': {}
+        }), 500
+
+# 非同期ジョブで実行できる描画（種類 → (応答内容, ステータスコード) を返す関数）
+JOB_HANDLERS = {
+    'wordcloud': wordcloud_payload,
+    'difference': difference_payload,
+    'word_tree': word_tree_payload,
+    'cooccurrence': cooccurrence_payload,
+}
+
+def job_response(job):
+    """ジョブの状態の JSON 応答（終了していれば描画結果を result に含める）"""
+    info = job.to_dict()
+    info['success'] = job.status != 'failed'
+    info['status_url'] = url_for('get_job', job_id=job.id)
+    if job.status == 'done':
+        payload, key = public_payload(job.result[0])
+        if key is not None:
+            info['etag'] = key
+        info['result'] = payload
+    return jsonify(info)
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """描画ジョブ投入API（202 とジョブIDを返し、描画はワーカースレッドで実行）
+    
+    kind に描画の種類（wordcloud / difference / word_tree / cooccurrence）、config に各生成APIと
+    同じ設定を指定する。client_id と view（省略時は kind）が同じ未終了のジョブは取り消され、
+    スライダー操作の連続したリクエストでも最新のジョブだけが描画される。
+    画像を描画する種類は If-None-Match が描画済みの ETag と一致すれば 304 を返す。
+    """
+    try:
+        body = request.json or {}
+        kind = body.get('kind')
+        config = body.get('config')
+        if kind not in JOB_HANDLERS or not isinstance(config, dict):
             return jsonify({
                 'success': False,
-                'error': error,
-                'statistics': statistics
+                'error': f'kind は {", ".join(JOB_HANDLERS)} のいずれか、config は設定オブジェクトを指定してください'
             }), 400
         
-        return jsonify({
-            'success': True,
-            'image': img_base64,  # wordcloudと同じフォーマット
-            'statistics': statistics,
-            'config': config,
-            'type': 'cooccurrence_network'
-        })
+        not_modified = not_modified_response(kind, config)
+        if not_modified is not None:
+            return not_modified
+        
+        client_id = body.get('client_id')
+        view = body.get('view')
+        job = job_queue.submit(JOB_HANDLERS[kind], config, kind=kind,
+                               client_id=str(client_id) if client_id else None,
+                               view=str(view) if view else None)
+        response = job_response(job)
+        response.status_code = 202
+        return response
         
     except Exception as e:
-        logger.error(f"共起ネットワーク API エラー: {e}")
+        logger.error(f"ジョブ投入 API エラー: {e}")
         return jsonify({
             'success': False,
-            'error': str(e),
-            'statistics': {}
+            'error': str(e)
         }), 500
 
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """ジョブの状態取得（wait 秒まで終了を待つロングポーリング）"""
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_JOB_WAIT)
+    job = job_queue.wait(job_id, wait) if wait else job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'ジョブが見つかりません'
+        }), 404
+    return job_response(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """ジョブの取り消し（実行中のジョブは次の区切りで中断）"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'ジョブが見つかりません'
+        }), 404
+    return job_response(job)
+
+boot_timings['import'] = round(time.perf_counter() - _boot_started, 3)
+logger.info(f"起動フェーズ import: {boot_timings['import']:.3f}秒（ジェネレータはバックグラウンドで初期化中）")
+
 if __name__ == '__main__':
     # ログディレクトリ確保
     logs_dir = project_root / "logs"
@@ -1454,11 +2251,12 @@ if __name__ == '__main__':
     print("=" * 60)
     print("🎯 単語除外テスト版（固定ビジュアルパラメータ）")
     print(f"🌐 アクセスURL: http://localhost:5002")
-    print(f"📁 フォントディレクトリ: {generator.fonts_dir}")
-    print(f"📊 利用可能フォント数: {len(generator.available_fonts)}")
+    print(f"📁 フォントディレクトリ: {project_root / 'fonts'}")
+    print("⏱ トークナイザ・データはバックグラウンドで読み込み中（準備状況: /api/ready）")
+    print("🏭 本番運用（複数ワーカー）: gunicorn -c wordcloud_app/gunicorn.conf.py")
     print("♿ アクセシブルカラー: オレンジ(#d06500)・ブルー(#0066cc)・ブラウン(#331a00)")
     print("🔧 固定パラメータ:")
-    for key, value in generator.FIXED_PARAMS.items():
+    for key, value in WordCloudGeneratorV2.FIXED_PARAMS.items():
         print(f"   - {key}: {value}")
     print("🔍 新機能: 共起ネットワーク静的画像生成（scikit-learn + NetworkX活用）")
     print("=" * 60)
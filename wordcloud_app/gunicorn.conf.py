@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+ワードクラウドツール Ver.2 本番サーバー設定（gunicorn）
+東京高専出前授業テキストマイニング分析プロジェクト
+
+主要機能:
+1. マスタープロセスでコーパス・形態素解析辞書・フォント・カラーマップを読み込んでから
+   ワーカーを fork し、読み込んだデータを copy-on-write で共有（preload_app）
+2. ワーカー数・スレッド数・タイムアウトは設定ファイルの performance.server から読み込み
+3. 処理中のリクエストを待ってからのワーカー入れ替え（graceful_timeout）
+4. 描画済み画像とジョブの状態は performance.cache.directory に書き出してワーカー間で共有
+   （画像URL・ジョブIDをどのワーカーが受けても応答できる。
+   画像のメモリ上のキャッシュ・配置キャッシュはワーカーごとで、別のワーカーでは配置から再計算）
+
+実行方法（プロジェクトルートで）:
+    gunicorn -c wordcloud_app/gunicorn.conf.py
+
+再読み込み:
+    kill -HUP <マスターPID>    設定ファイルを読み直してワーカーを順に入れ替え
+                               （事前読み込みしたコーパス・コードはそのまま）
+    kill -USR2 <マスターPID>   新しいマスターを起動（コーパス・コードも読み直し）。
+                               新しいワーカーの起動を確認したら旧マスターに kill -TERM
+"""
+
+import sys
+from pathlib import Path
+
+import yaml
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.utils.japanese_tokenizer import resolve_n_jobs
+
+
+def _load_server_config() -> dict:
+    """設定ファイルの performance.server セクション"""
+    config_path = project_root / "config" / "analysis_config.yaml"
+    if not config_path.exists():
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    return config.get('performance', {}).get('server', {}) or {}
+
+
+_server = _load_server_config()
+
+wsgi_app = 'app_v2:app'
+pythonpath = str(Path(__file__).parent)
+chdir = str(project_root)
+preload_app = True
+
+bind = _server.get('bind', '0.0.0.0:5002')
+workers = resolve_n_jobs(int(_server.get('workers', -1)))
+worker_class = 'gthread'
+threads = int(_server.get('threads', 4))
+timeout = int(_server.get('timeout', 120))
+graceful_timeout = int(_server.get('graceful_timeout', 30))
+keepalive = int(_server.get('keepalive', 5))
+max_requests = int(_server.get('max_requests', 0))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    """ワーカーを fork する前に初期化を完了させる（失敗した場合は起動を中止）"""
+    from app_v2 import app_state, job_queue
+
+    app_state.preload(server_workers=server.cfg.workers)
+    # 前回の起動で残ったジョブの状態を整理（USR2 の入れ替え中は旧ワーカーのジョブを残す）
+    job_queue.prune_shared()
+    server.log.info(f"ワーカー数 {server.cfg.workers} × スレッド数 {server.cfg.threads} で待ち受け: "
+                    f"{', '.join(server.cfg.bind)}")
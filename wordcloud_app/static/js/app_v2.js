@@ -9,6 +9,23 @@ class WordCloudAppV2 {
         this.accessibleColors = {};
         this.stopWordCategories = {};
         this.generateTimeout = null;
+        this.previewTimeout = null;
+        this.generateRequestId = 0;  // 最新の生成リクエスト（古い応答は表示しない）
+        // 描画ジョブのクライアントID（同じビューの新しいジョブが来たらサーバーが古いジョブを取り消す）
+        this.clientId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+        this.jobPollWait = 20;  // ジョブ状態のロングポーリングの待ち時間（秒）
+        
+        // 生成済み画像（ETag → 画像URL）。同じ設定に戻したときはサーバーが 304 を返す
+        this.renderedImages = new Map();
+        this.maxRenderedImages = 8;
+        this.lastImageType = 'image/png';
+        this.lastLayoutKey = null;  // 直前の最終描画の配置（除外時はこの配置を保ったまま埋め直す）
+        
+        // クライアント描画（?render=client）: サーバーからは配置データのみ受け取りキャンバスに描画
+        this.clientRendering = new URLSearchParams(window.location.search).get('render') === 'client';
+        this.layoutFonts = new Map();  // フォントキー → 読み込み済みフォントファミリー名（Promise）
+        this.currentLayout = null;
+        this.layoutZoom = 1;
         
         // 差分機能関連
         this.currentMode = 'standard'; // 'standard', 'difference', 'wordtree', 'cooccurrence'
@@ -143,6 +160,7 @@ class WordCloudAppV2 {
         document.getElementById('downloadImage').addEventListener('click', () => {
             this.downloadImage();
         });
+        this.setupLayoutCanvas();
         
         // === 差分機能のイベントリスナー ===
         
@@ -332,6 +350,12 @@ class WordCloudAppV2 {
         });
         config.exclude_categories = excludeCategories;
         
+        // 配置の保持（サーバーは除外単語が増えただけの場合のみ前回の配置を使う）
+        const keepLayout = document.getElementById('keepLayout');
+        if (keepLayout && keepLayout.checked && this.lastLayoutKey) {
+            config.incremental_from = this.lastLayoutKey;
+        }
+        
         // 固定パラメータを含める
         config.fixed_params = this.fixedParams;
         
@@ -360,36 +384,85 @@ class WordCloudAppV2 {
     }
     
     scheduleGeneration() {
-        // デバウンス: 800ms後に生成（Ver.2では少し長めに）
+        // 操作直後は縮小プレビュー（同じシード・同じ配置）、操作が止まったら800ms後に最終描画
+        clearTimeout(this.previewTimeout);
         clearTimeout(this.generateTimeout);
+        this.previewTimeout = setTimeout(() => {
+            this.generateWordCloud({ preview: true });
+        }, 150);
         this.generateTimeout = setTimeout(() => {
             this.generateWordCloud();
         }, 800);
     }
     
-    async generateWordCloud() {
+    async generateWordCloud(options = {}) {
+        const preview = Boolean(options.preview);
         const config = this.getCurrentConfig();
         this.currentConfig = config;
+        const requestId = ++this.generateRequestId;
         
-        this.showLoading();
-        this.announceToScreenReader('ワードクラウドを生成しています');
+        if (!preview) {
+            clearTimeout(this.previewTimeout);
+            clearTimeout(this.generateTimeout);
+        }
+        
+        // 表示中の画像（プレビューを含む）は最終描画が届くまでそのまま表示しておく
+        if (document.getElementById('previewImage').style.display !== 'block') {
+            this.showLoading();
+        }
+        if (!preview) {
+            this.announceToScreenReader('ワードクラウドを生成しています');
+        }
         
         try {
-            const response = await fetch('/api/generate', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(config)
-            });
+            const headers = {
+                'Content-Type': 'application/json'
+            };
+            if (this.renderedImages.size > 0) {
+                headers['If-None-Match'] = [...this.renderedImages.keys()].join(', ');
+            }
             
-            const result = await response.json();
+            const requestConfig = { ...config, preview: preview };
+            if (this.clientRendering) {
+                requestConfig.image_format = 'json';
+            }
+            const job = await this.runJob('wordcloud', requestConfig, headers);
             
-            if (result.success) {
-                this.showImage(result.image);
+            // 後から出したリクエスト（最終描画など）があれば古い応答は捨てる
+            if (requestId !== this.generateRequestId || job.status === 'cancelled') {
+                return;
+            }
+            
+            const etag = job.etag;
+            let result;
+            if (job.status === 'not_modified') {
+                // If-None-Match は手元の描画結果のキーなので通常は見つかる（見つからなければエラー表示）
+                result = this.renderedImages.get(etag) || { success: false, error: '描画結果が見つかりません（再生成してください）' };
+            } else {
+                result = this.jobResult(job);
+            }
+            
+            // クライアント描画はフォントを読み込んでから表示（その間に新しいリクエストがあれば表示しない）
+            if (result.success && result.layout) {
+                await this.loadLayoutFont(result.layout.font, result.font_url);
+                if (requestId !== this.generateRequestId) {
+                    return;
+                }
+            }
+            
+            if (result.success && result.preview) {
+                this.rememberImage(etag, result);
+                await this.showResult(result);
+            } else if (result.success) {
+                this.rememberImage(etag, result);
+                this.lastImageType = result.mime_type;
+                this.lastLayoutKey = result.layout_key || null;
+                await this.showResult(result);
                 this.updateMetaInfo(config);
-                this.showToast('ワードクラウドを生成しました', 'success');
-                this.announceToScreenReader('ワードクラウドの生成が完了しました');
+                if (!preview) {
+                    this.showToast('ワードクラウドを生成しました', 'success');
+                    this.announceToScreenReader('ワードクラウドの生成が完了しました');
+                }
             } else {
                 this.showError(result.error);
                 this.showToast(`エラー: ${result.error}`, 'error');
@@ -397,6 +470,9 @@ class WordCloudAppV2 {
             }
             
         } catch (error) {
+            if (requestId !== this.generateRequestId) {
+                return;
+            }
             console.error('生成エラー:', error);
             this.showError('ネットワークエラーが発生しました');
             this.showToast('ネットワークエラーが発生しました', 'error');
@@ -404,6 +480,58 @@ class WordCloudAppV2 {
         }
     }
     
+    async runJob(kind, config, headers = {}) {
+        // 描画ジョブを投入し、終了するまでロングポーリングで待つ
+        // （同じビューの古いジョブはサーバー側で取り消され、status: 'cancelled' で返る）
+        const response = await fetch('/api/jobs', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', ...headers },
+            body: JSON.stringify({ kind: kind, config: config, client_id: this.clientId })
+        });
+        if (response.status === 304) {
+            return { status: 'not_modified', etag: this.etagValue(response.headers.get('ETag')) };
+        }
+        
+        let job = await response.json();
+        while (job.status === 'queued' || job.status === 'running') {
+            const poll = await fetch(`${job.status_url}?wait=${this.jobPollWait}`);
+            job = await poll.json();
+        }
+        return job;
+    }
+    
+    etagValue(header) {
+        // ETag ヘッダーの値（"<キー>" または W/"<キー>"）から、応答 JSON の etag と同じキーを取り出す
+        if (!header) return null;
+        return header.replace(/^W\//, '').replace(/^"(.*)"$/, '$1');
+    }
+    
+    jobResult(job) {
+        // 終了したジョブの結果（生成APIと同じ形式）
+        if (job.status === 'done') {
+            return job.result;
+        }
+        return { success: false, error: job.error || '生成に失敗しました' };
+    }
+    
+    rememberImage(etag, result) {
+        // 最近使った順に保持（古いものから破棄）
+        if (!etag) return;
+        this.renderedImages.delete(etag);
+        this.renderedImages.set(etag, {
+            success: true,
+            image_url: result.image_url,
+            mime_type: result.mime_type,
+            preview: Boolean(result.preview),
+            layout_key: result.layout_key,
+            layout: result.layout,
+            font_url: result.font_url
+        });
+        while (this.renderedImages.size > this.maxRenderedImages) {
+            this.renderedImages.delete(this.renderedImages.keys().next().value);
+        }
+    }
+    
     showLoading() {
         document.getElementById('loadingIndicator').style.display = 'block';
         document.getElementById('errorMessage').style.display = 'none';
@@ -412,11 +540,136 @@ class WordCloudAppV2 {
         document.getElementById('metaInfo').style.display = 'none';
     }
     
-    showImage(imageBase64) {
+    async showResult(result) {
+        // 配置データ（クライアント描画）はキャンバスに、それ以外は画像として表示
+        if (result.layout) {
+            await this.showLayout(result.layout, result.font_url);
+        } else {
+            this.showImage(result.image_url);
+        }
+    }
+    
+    showImage(imageUrl) {
         const img = document.getElementById('wordcloudImg');
-        img.src = 'data:image/png;base64,' + imageBase64;
+        img.src = imageUrl;
         img.alt = '生成されたワードクラウド - ' + this.getImageDescription();
+        img.style.display = '';
+        this.currentLayout = null;
+        document.getElementById('wordcloudCanvas').style.display = 'none';
+        
+        this.showPreviewArea();
+    }
+    
+    async showLayout(layout, fontUrl) {
+        const fontFamily = await this.loadLayoutFont(layout.font, fontUrl);
+        this.currentLayout = { ...layout, fontFamily: fontFamily };
+        this.drawLayout();
         
+        const canvas = document.getElementById('wordcloudCanvas');
+        canvas.setAttribute('aria-label', '生成されたワードクラウド - ' + this.getImageDescription());
+        canvas.style.display = '';
+        document.getElementById('wordcloudImg').style.display = 'none';
+        
+        this.showPreviewArea();
+    }
+    
+    loadLayoutFont(fontKey, fontUrl) {
+        // 配置時と同じフォントを読み込む（読み込めなければ sans-serif）
+        const key = fontKey || 'default';
+        if (!this.layoutFonts.has(key)) {
+            const family = `wordcloud-${key}`;
+            const face = new FontFace(family, `url(${fontUrl})`);
+            this.layoutFonts.set(key, face.load()
+                .then(loaded => {
+                    document.fonts.add(loaded);
+                    return `"${family}"`;
+                })
+                .catch(error => {
+                    console.warn('フォント読み込み失敗:', error);
+                    return 'sans-serif';
+                }));
+        }
+        return this.layoutFonts.get(key);
+    }
+    
+    drawLayout() {
+        // 配置データをキャンバスに描画（画面の解像度・拡大率に合わせて描き直すため常に鮮明）
+        const layout = this.currentLayout;
+        const canvas = document.getElementById('wordcloudCanvas');
+        const ratio = (window.devicePixelRatio || 1) * this.layoutZoom;
+        const titleHeight = layout.title ? Math.round(layout.title_size * 1.2) + 40 : 0;
+        const height = layout.height + titleHeight;
+        
+        canvas.width = Math.round(layout.width * ratio);
+        canvas.height = Math.round(height * ratio);
+        canvas.style.width = `${layout.width * this.layoutZoom}px`;
+        
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.fillStyle = 'white';
+        ctx.fillRect(0, 0, layout.width, titleHeight);
+        ctx.fillStyle = layout.background_color;
+        ctx.fillRect(0, titleHeight, layout.width, layout.height);
+        
+        if (layout.title) {
+            ctx.font = `${layout.title_size}px ${layout.fontFamily}`;
+            ctx.fillStyle = '#222222';
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'top';
+            ctx.fillText(layout.title, layout.width / 2, 20);
+        }
+        
+        // 座標は単語の外接矩形の左上（フォントのアセンダ基準）、縦向きは反時計回りに90度回転
+        ctx.translate(0, titleHeight);
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'alphabetic';
+        layout.boxes = layout.words.map(word => {
+            ctx.font = `${word.font_size}px ${layout.fontFamily}`;
+            ctx.fillStyle = word.color;
+            const metrics = ctx.measureText(word.word);
+            const ascent = metrics.fontBoundingBoxAscent ?? word.font_size * 0.88;
+            const length = metrics.width;
+            if (word.orientation === 90) {
+                ctx.save();
+                ctx.translate(word.x, word.y + length);
+                ctx.rotate(-Math.PI / 2);
+                ctx.fillText(word.word, 0, ascent);
+                ctx.restore();
+                return { word: word, x: word.x, y: word.y + titleHeight, width: word.font_size, height: length };
+            }
+            ctx.fillText(word.word, word.x, word.y + ascent);
+            return { word: word, x: word.x, y: word.y + titleHeight, width: length, height: word.font_size };
+        });
+    }
+    
+    layoutWordAt(event) {
+        // キャンバス上の位置にある単語（なければ null）
+        const layout = this.currentLayout;
+        if (!layout || !layout.boxes) return null;
+        const canvas = event.currentTarget;
+        const scale = layout.width / canvas.clientWidth;
+        const x = event.offsetX * scale;
+        const y = event.offsetY * scale;
+        const box = layout.boxes.find(b => x >= b.x && x <= b.x + b.width && y >= b.y && y <= b.y + b.height);
+        return box ? box.word : null;
+    }
+    
+    setupLayoutCanvas() {
+        // クライアント描画のホバー（単語と重み）・ダブルクリック拡大（サーバーへの再リクエストなし）
+        const canvas = document.getElementById('wordcloudCanvas');
+        canvas.addEventListener('mousemove', (event) => {
+            const word = this.layoutWordAt(event);
+            canvas.title = word ? `${word.word}（重み ${word.frequency}）` : '';
+        });
+        canvas.addEventListener('dblclick', () => {
+            if (!this.currentLayout) return;
+            this.layoutZoom = this.layoutZoom >= 3 ? 1 : this.layoutZoom + 1;
+            document.getElementById('previewImage').classList.toggle('zoomed', this.layoutZoom > 1);
+            this.drawLayout();
+        });
+    }
+    
+    showPreviewArea() {
         document.getElementById('loadingIndicator').style.display = 'none';
         document.getElementById('errorMessage').style.display = 'none';
         document.getElementById('previewImage').style.display = 'block';
@@ -482,6 +735,7 @@ class WordCloudAppV2 {
     async exportConfig() {
         try {
             const config = this.getCurrentConfig();
+            delete config.incremental_from;  // サーバー内の配置キャッシュのキーは保存しない
             
             const response = await fetch('/api/export-config', {
                 method: 'POST',
@@ -507,10 +761,22 @@ class WordCloudAppV2 {
     
     downloadImage() {
         const img = document.getElementById('wordcloudImg');
-        if (img.src) {
+        if (this.currentLayout) {
+            // クライアント描画はキャンバスの内容を PNG で保存
             const link = document.createElement('a');
             const timestamp = new Date().toISOString().slice(0, 19).replace(/:/g, '-');
             link.download = `wordcloud_v2_${timestamp}.png`;
+            link.href = document.getElementById('wordcloudCanvas').toDataURL('image/png');
+            link.click();
+            
+            this.showToast('画像をダウンロードしました', 'success');
+            this.announceToScreenReader('画像のダウンロードが完了しました');
+        } else if (img.src) {
+            const link = document.createElement('a');
+            const timestamp = new Date().toISOString().slice(0, 19).replace(/:/g, '-');
+            const mimeType = (this.lastImageType || 'image/png').split('/')[1];
+            const extension = mimeType.replace('jpeg', 'jpg');
+            link.download = `wordcloud_v2_${timestamp}.${extension}`;
             link.href = img.src;
             link.click();
             
@@ -668,6 +934,9 @@ class WordCloudAppV2 {
             
             // 差分設定の収集
             const config = this.collectDifferenceConfig();
+            if (this.clientRendering) {
+                config.image_format = 'json';
+            }
             
             // 歓迎メッセージを非表示
             const welcomeMessage = document.getElementById('welcomeMessage');
@@ -688,7 +957,8 @@ class WordCloudAppV2 {
             
             if (result.success) {
                 // ワードクラウド表示
-                this.displayDifferenceResult(result.image, result.statistics);
+                this.lastImageType = result.mime_type;
+                await this.displayDifferenceResult(result);
                 this.showToast('差分ワードクラウド生成完了', 'success');
             } else {
                 this.showToast(result.error || '差分生成に失敗しました', 'error');
@@ -732,12 +1002,20 @@ class WordCloudAppV2 {
         };
     }
     
-    displayDifferenceResult(imageBase64, statistics) {
-        // ワードクラウド画像表示
-        const imgElement = document.getElementById('wordcloudImg');
-        if (imgElement) {
-            imgElement.src = `data:image/png;base64,${imageBase64}`;
-            imgElement.style.display = 'block';
+    async displayDifferenceResult(result) {
+        const statistics = result.statistics;
+        
+        // ワードクラウド表示（配置データはキャンバスに描画）
+        if (result.layout) {
+            await this.showLayout(result.layout, result.font_url);
+        } else {
+            const imgElement = document.getElementById('wordcloudImg');
+            if (imgElement) {
+                imgElement.src = result.image_url;
+                imgElement.style.display = 'block';
+                this.currentLayout = null;
+                document.getElementById('wordcloudCanvas').style.display = 'none';
+            }
         }
         
         // 統計情報の保存と表示
@@ -1158,15 +1436,17 @@ class WordCloudAppV2 {
         this.showLoading();
         
         try {
-            const response = await fetch('/api/cooccurrence-generate', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(config)
-            });
+            const job = await this.runJob('cooccurrence', config);
+            if (job.status === 'cancelled') {
+                return;  // 後から出した生成に置き換えられた
+            }
             
-            const data = await response.json();
+            const data = this.jobResult(job);
             
-            if (data.success) {
+            if (data.success && data.image_url) {
+                this.displayCooccurrenceImage(data.image_url, data.statistics);
+                this.showToast('共起ネットワークを生成しました', 'success');
+            } else if (data.success) {
                 this.displayCooccurrenceNetwork(data.network, data.statistics);
                 this.showToast('共起ネットワークを生成しました', 'success');
             } else {
@@ -1203,6 +1483,38 @@ class WordCloudAppV2 {
         return config;
     }
     
+    displayCooccurrenceImage(imageUrl, statistics) {
+        // サーバーで描画した共起ネットワーク画像を表示
+        const container = document.getElementById('cooccurrenceContainer');
+        container.innerHTML = '';
+        container.style.display = 'block';
+        
+        const statsDiv = document.createElement('div');
+        statsDiv.className = 'network-stats';
+        statsDiv.innerHTML = `
+            <div class="network-stat-item">
+                <span class="network-stat-value">${statistics.total_nodes}</span>
+                <span class="network-stat-label">ノード数</span>
+            </div>
+            <div class="network-stat-item">
+                <span class="network-stat-value">${statistics.total_edges}</span>
+                <span class="network-stat-label">エッジ数</span>
+            </div>
+            <div class="network-stat-item">
+                <span class="network-stat-value">${(statistics.density * 100).toFixed(1)}%</span>
+                <span class="network-stat-label">密度</span>
+            </div>
+        `;
+        container.appendChild(statsDiv);
+        
+        const img = document.createElement('img');
+        img.src = imageUrl;
+        img.alt = `共起ネットワーク（ノード数 ${statistics.total_nodes}、エッジ数 ${statistics.total_edges}）`;
+        img.style.maxWidth = '100%';
+        img.style.marginTop = '20px';
+        container.appendChild(img);
+    }
+    
     displayCooccurrenceNetwork(networkData, statistics) {
         const container = document.getElementById('cooccurrenceContainer');
         container.innerHTML = '';
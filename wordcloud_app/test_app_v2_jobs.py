@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ワードクラウドツール Ver.2 描画ジョブAPIのテスト
+東京高専出前授業テキストマイニング分析プロジェクト
+
+描画済みの設定をもう一度投入したときの 304 応答と、ブラウザ側（app_v2.js）が
+ETag ヘッダーから取り出すキーが、ジョブ結果の etag と一致することを確認する。
+
+実行方法: python -m pytest wordcloud_app/test_app_v2_jobs.py
+"""
+
+import sys
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートと wordcloud_app をパスに追加
+app_dir = Path(__file__).parent
+sys.path.append(str(app_dir.parent))
+sys.path.append(str(app_dir))
+
+APP_JS = app_dir / 'static' / 'js' / 'app_v2.js'
+CONFIG = {'text_source': 'comments', 'width': 480, 'height': 320}
+
+
+@pytest.fixture(scope='module')
+def client():
+    from app_v2 import app, app_state
+
+    app_state.wait()
+    return app.test_client()
+
+
+def run_job(client, headers=None):
+    """ジョブを投入して終了まで待ち、(投入時の応答, 終了時のジョブ) を返す"""
+    response = client.post('/api/jobs', json={'kind': 'wordcloud', 'config': CONFIG}, headers=headers or {})
+    if response.status_code != 202:
+        return response, None
+    job = response.get_json()
+    while job['status'] in ('queued', 'running'):
+        job = client.get(job['status_url'] + '?wait=10').get_json()
+    return response, job
+
+
+def js_etag_value(header):
+    """app_v2.js の etagValue で ETag ヘッダーからキーを取り出す"""
+    source = APP_JS.read_text(encoding='utf-8')
+    script = (
+        "const source = require('fs').readFileSync(process.argv[1], 'utf8');"
+        "const body = source.match(/etagValue\\(header\\) \\{([\\s\\S]*?)\\n    \\}/)[1];"
+        "console.log(JSON.stringify(new Function('header', body)(process.argv[2])));"
+    )
+    assert 'etag: this.etagValue(response.headers.get(' in source, 'runJob が 304 の ETag をキーに直していません'
+    output = subprocess.run(['node', '-e', script, str(APP_JS), header],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_rerender_returns_not_modified_with_matching_etag(client):
+    """描画済みの設定の再投入は 304 で、ETag ヘッダーのキーがジョブ結果の etag と一致"""
+    response, job = run_job(client)
+    assert response.status_code == 202
+    assert job['status'] == 'done'
+    etag = job['etag']
+    assert client.get(job['result']['image_url']).status_code == 200
+
+    response, _ = run_job(client, {'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    header = response.headers['ETag']
+    assert header == f'"{etag}"'
+
+    if shutil.which('node') is None:
+        pytest.skip('node がないため app_v2.js の ETag 解釈は確認しない')
+    assert js_etag_value(header) == etag
+    assert js_etag_value(f'W/{header}') == etag
@@ -6,28 +6,24 @@
 """
 
 import pandas as pd
-import re
 from collections import Counter
-from janome.tokenizer import Tokenizer
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib import font_manager
+from scripts.utils.token_artifact import load_token_artifact
+from scripts.utils.token_filter import TokenFilter
 
 # 日本語フォント設定
 plt.rcParams['font.family'] = ['DejaVu Sans', 'Hiragino Sans', 'Yu Gothic', 'Meiryo', 'Takao', 'IPAexGothic', 'IPAGothic', 'VL Gothic', 'Noto Sans CJK JP']
 
 class WordCloudOptimizer:
     def __init__(self):
-        self.tokenizer = Tokenizer()
+        # ノイズ語除外・数字記号除去・表記ゆれ統一（設定ファイル token_filters.optimizer）
+        self.token_filter = TokenFilter.from_config('optimizer')
         
-        # 高頻度ノイズ語（分析結果に基づく）
-        self.noise_words = {
-            'から', 'です', 'ありがとう', '東京高専', 'へ', 'みなさん', 
-            '今日', 'より', 'こと', '一番', 'ます', 'でし', 'まし',
-            'が', 'て', 'いる', 'た', 'の', 'に', 'は', 'を', 'で',
-            '入っ', 'し', 'なっ', 'っ', 'い', 'ん', 'る', 'れ'
-        }
+        # 形態素解析済みトークン（all_text_corpus.csv から事前作成、数字・記号を除去してから解析）
+        self.artifact = load_token_artifact(preprocess_pattern=self.token_filter.preprocess_pattern)
         
         # 科学用語（優先表示・重み増加）
         self.science_terms = {
@@ -57,74 +53,17 @@ class WordCloudOptimizer:
             'びっくり': 2.0,
             'すごい': 2.0
         }
-        
-        # 表記ゆれ統一ルール
-        self.normalization_rules = {
-            # みそ系統一
-            'みそ汁': 'みそ',
-            'みそしる': 'みそ',
-            '味噌': 'みそ',
-            '味噌汁': 'みそ',
-            
-            # 面白い系統一
-            'おもしろい': '面白い',
-            'おもしろく': '面白い',
-            'おもしろかっ': '面白い',
-            
-            # 楽しい系統一
-            'たのしい': '楽しい',
-            'たのしく': '楽しい',
-            'たのしかっ': '楽しい',
-            
-            # 塩系統一（最重要）
-            'えん分': '塩分',
-            'エン分': '塩分',
-            
-            # 溶ける系統一
-            'とける': '溶ける',
-            'とけ': '溶ける',
-            'とかし': '溶ける',
-            '溶かし': '溶ける'
-        }
-        
-        # 最小語長（1文字語除外）
-        self.min_word_length = 2
-        
-    def preprocess_text(self, text):
-        """テキスト前処理"""
-        text = str(text)
-        # 数字・記号除去
-        text = re.sub(r'[0-9０-９]', '', text)
-        text = re.sub(r'[，。！？・「」『』（）()]', '', text)
-        return text
     
     def extract_and_filter_words(self, df):
         """語彙抽出・フィルタリング・正規化"""
         filtered_words = []
         
-        for idx, row in df.iterrows():
-            text = self.preprocess_text(row['text'])
-            category = row['category']
-            
-            # 形態素解析
-            tokens = self.tokenizer.tokenize(text)
-            for token in tokens:
-                try:
-                    word = token.surface
-                    
-                    # 基本フィルタリング
-                    if (len(word) >= self.min_word_length and 
-                        word not in self.noise_words and
-                        not re.match(r'^[ぁ-ん]{1}$', word)):  # ひらがな1文字除外
-                        
-                        # 表記ゆれ統一
-                        if word in self.normalization_rules:
-                            word = self.normalization_rules[word]
-                        
-                        filtered_words.append((word, category))
-                        
-                except (AttributeError, IndexError):
-                    continue
+        # 形態素解析（アーティファクトから取得、未収録テキストのみ解析）
+        token_lists = self.artifact.lookup_tokens(df['text'])
+        for tokens, category in zip(token_lists, df['category']):
+            # フィルタリング・表記ゆれ統一（1パス）
+            for word in self.token_filter.filter(tokens):
+                filtered_words.append((word, category))
         
         return filtered_words
     
@@ -196,8 +135,7 @@ class WordCloudOptimizer:
         
         # 原文分析
         original_words = []
-        for text in df['text']:
-            tokens = self.tokenizer.tokenize(str(text))
+        for tokens in self.artifact.lookup_tokens(df['text']):
             for token in tokens:
                 try:
                     word = token.surface